@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class MyProjectConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'myproject'  # Updated to reflect your actual app name
\ No newline at end of file
+    name = 'myproject'  # Updated to reflect your actual app name
+
+    def ready(self):
+        # Register model signal handlers (cache invalidation)
+        from myproject import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2-SHA256 hasher with its work factor taken from PASSWORD_PBKDF2_ITERATIONS
+    (Django's default when 0). Hashes stored with another count are re-encoded on the
+    user's next successful login.
+    """
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations
@@ -0,0 +1,102 @@
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from myproject.views.json_stream import iter_json_array, STREAM_CHUNK_SIZE
+from myproject.views.location_utils import parse_country_record
+
+
+def write_payload(path, count, seed):
+    """Write a RestCountries-shaped JSON array of `count` synthetic countries to `path`."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as payload:
+        payload.write("[")
+        for i in range(count):
+            name = f"Country {i}"
+            record = {
+                "name": {"common": name, "official": f"Republic of {name}", "nativeName": {"eng": {"common": name}}},
+                "cca2": f"{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}",
+                "idd": {"root": f"+{rng.randint(1, 9)}", "suffixes": [str(rng.randint(0, 99))]},
+                "region": rng.choice(["Africa", "Americas", "Asia", "Europe", "Oceania"]),
+                "subregion": "Synthetic",
+                "population": rng.randint(1000, 10 ** 9),
+                "flags": {"png": f"https://flags.example/{i}.png"},
+                "translations": {code: {"common": f"{name} ({code})"} for code in ("deu", "fra", "jpn", "spa", "zho")},
+                "latlng": [rng.uniform(-90, 90), rng.uniform(-180, 180)],
+            }
+            if i:
+                payload.write(",")
+            payload.write(json.dumps(record))
+        payload.write("]")
+
+
+def _read_chunks(path):
+    with open(path, "rb") as payload:
+        while True:
+            chunk = payload.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _current_rss_kb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(path, streaming, results):
+    """Runs in a fresh child process so that peak RSS belongs to this parse only."""
+    baseline = _current_rss_kb()
+    started = time.perf_counter()
+    if streaming:
+        countries = iter_json_array(_read_chunks(path))
+    else:
+        # What `response.json()` does: the whole body, then every parsed dict, held at once
+        with open(path, "rb") as payload:
+            countries = json.loads(payload.read())
+    records = sum(1 for record in map(parse_country_record, countries) if record)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((records, elapsed, max(peak - baseline, 0)))
+
+
+class Command(BaseCommand):
+    help = "Compare peak memory of streaming vs whole-document parsing of RestCountries-shaped payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="1000,10000,50000,100000",
+            help="Comma-separated record counts to benchmark.",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic payload.")
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context("fork")
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        self.stdout.write(f"{'records':>9} {'payload':>10} {'mode':>10} {'parse':>9} {'peak RSS growth':>16}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            for size in sizes:
+                path = os.path.join(directory, f"countries-{size}.json")
+                write_payload(path, size, options["seed"])
+                payload_mb = os.path.getsize(path) / 2 ** 20
+
+                for mode, streaming in (("json()", False), ("streaming", True)):
+                    results = context.Queue()
+                    process = context.Process(target=_measure, args=(path, streaming, results))
+                    process.start()
+                    records, elapsed, growth_kb = results.get()
+                    process.join()
+                    self.stdout.write(
+                        f"{records:>9} {payload_mb:>8.1f}MB {mode:>10} {elapsed:>8.2f}s {growth_kb / 1024:>14.1f}MB"
+                    )
+                os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
@@ -0,0 +1,86 @@
+import math
+import random
+import time
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import ExpressionWrapper, F, FloatField
+from myproject.models import City
+from myproject.views.spatial_index import CitySpatialIndex, haversine_km
+
+
+def sql_nearest(latitude, longitude, k):
+    """Brute-force baseline: scan every city in SQL ordered by an equirectangular distance."""
+    scale = math.cos(math.radians(latitude)) ** 2
+    distance = ExpressionWrapper(
+        (F("latitude") - latitude) * (F("latitude") - latitude)
+        + (F("longitude") - longitude) * (F("longitude") - longitude) * scale,
+        output_field=FloatField(),
+    )
+    # Over-fetch, then re-rank the candidates by true great-circle distance
+    candidates = list(
+        City.objects.filter(latitude__isnull=False, longitude__isnull=False)
+        .annotate(distance=distance)
+        .order_by("distance")
+        .values_list("id", "latitude", "longitude")[: k * 4]
+    )
+    ranked = sorted(candidates, key=lambda row: float(haversine_km(latitude, longitude, row[1], row[2])))
+    return [row[0] for row in ranked[:k]]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the in-memory nearest-city index against a brute-force SQL scan of the City table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=1000, help="Random lookups against the index.")
+        parser.add_argument("--sql-queries", type=int, default=20, help="Random lookups against the SQL scan.")
+        parser.add_argument("--k", type=int, default=5, help="Neighbours per lookup.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for query points.")
+
+    def handle(self, *args, **options):
+        k = options["k"]
+        rng = random.Random(options["seed"])
+
+        started = time.perf_counter()
+        rows = np.array(
+            City.objects.filter(latitude__isnull=False, longitude__isnull=False).values_list(
+                "id", "latitude", "longitude"
+            ),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        loaded = time.perf_counter()
+        if not len(rows):
+            raise CommandError("No cities with coordinates. Import some with import_gazetteer first.")
+        index = CitySpatialIndex(rows[:, 0], rows[:, 1], rows[:, 2])
+        built = time.perf_counter()
+        self.stdout.write(
+            f"{len(index)} cities: loaded in {loaded - started:.2f}s, index built in {built - loaded:.2f}s"
+        )
+        if len(index) < 1000000:
+            self.stdout.write("Note: fewer than 1M cities; results will understate the gap at production scale.")
+
+        # Query near existing cities so both methods see realistic, dense neighbourhoods
+        samples = rows[rng.sample(range(len(rows)), min(len(rows), max(options["queries"], options["sql_queries"])))]
+        points = [(lat + rng.uniform(-0.5, 0.5), lon + rng.uniform(-0.5, 0.5)) for _, lat, lon in samples]
+        points = [(max(-90.0, min(90.0, lat)), max(-180.0, min(180.0, lon))) for lat, lon in points]
+
+        index_points = points[: options["queries"]]
+        started = time.perf_counter()
+        index_results = [index.nearest(lat, lon, k) for lat, lon in index_points]
+        index_avg = (time.perf_counter() - started) / len(index_points)
+
+        sql_points = points[: options["sql_queries"]]
+        started = time.perf_counter()
+        sql_results = [sql_nearest(lat, lon, k) for lat, lon in sql_points]
+        sql_avg = (time.perf_counter() - started) / len(sql_points)
+
+        # Agreement between the two methods on the shared query points
+        matches = sum(
+            len({city_id for city_id, _ in index_results[i]} & set(sql_results[i]))
+            for i in range(min(len(index_results), len(sql_results)))
+        )
+        compared = sum(len(result) for result in sql_results[: len(index_results)])
+
+        self.stdout.write(f"Index:    {index_avg * 1e6:10.1f} us/query over {len(index_points)} queries")
+        self.stdout.write(f"SQL scan: {sql_avg * 1e6:10.1f} us/query over {len(sql_points)} queries")
+        self.stdout.write(f"Speed-up: {sql_avg / index_avg:.0f}x, agreement {matches}/{compared}")
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand
+from myproject.views.password_hashing import PasswordHashingBusy, PasswordHashingExecutor
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark password verification (logins) per second and per core, inline and on "
+        "the hashing pool, and how the pool's backpressure sheds a login storm"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200, help="Password checks per measurement.")
+        parser.add_argument(
+            "--iterations", type=int, action="append",
+            help="PBKDF2 iteration count to measure (repeatable); defaults to the configured one.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=settings.PASSWORD_HASHING_WORKERS or os.cpu_count(),
+            help="Hashing pool processes (default PASSWORD_HASHING_WORKERS).",
+        )
+        parser.add_argument(
+            "--clients", type=int, default=32,
+            help="Concurrent request threads submitting checks to the pool.",
+        )
+
+    def _rate(self, count, started):
+        return count / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        hasher = get_hasher("default")
+        workers, logins = options["workers"], options["logins"]
+        # The pool cannot use more cores than it has processes
+        cores = min(workers, os.cpu_count() or 1)
+        executor = PasswordHashingExecutor(
+            workers=workers,
+            max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+            # Throughput runs wait for a queue slot however long it takes
+            queue_timeout=None,
+        )
+        # Start the pool's processes outside the measurements
+        executor.map(make_password, ["warm-up"] * workers)
+
+        self.stdout.write(
+            f"Hasher {hasher.algorithm}; pool of {workers} processes, {options['clients']} client threads, "
+            f"{os.cpu_count()} CPUs"
+        )
+        for iterations in options["iterations"] or [hasher.iterations]:
+            encoded = hasher.encode("Correct-Horse-9!", hasher.salt(), iterations)
+            count = max(logins // 10, 10)
+
+            started = time.perf_counter()
+            for _ in range(count):
+                check_password("Correct-Horse-9!", encoded)
+            inline = self._rate(count, started)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options["clients"]) as clients:
+                results = list(clients.map(
+                    lambda _: executor.run(check_password, "Correct-Horse-9!", encoded), range(logins)
+                ))
+            pooled = self._rate(logins, started)
+            assert all(results)
+
+            self.stdout.write(
+                f"{iterations:>9} iterations: inline {inline:7.1f} logins/s on one core; "
+                f"pool {pooled:7.1f} logins/s = {pooled / cores:6.1f} per core"
+            )
+
+        # Backpressure: a storm of instant submissions with no patience for a queue slot
+        executor.queue_timeout = 0
+        accepted, rejected = [], 0
+        for _ in range(executor.max_pending * 4):
+            try:
+                accepted.append(executor.submit(check_password, "Correct-Horse-9!", encoded))
+            except PasswordHashingBusy:
+                rejected += 1
+        for future in accepted:
+            future.result()
+        self.stdout.write(
+            f"Storm of {executor.max_pending * 4} checks: {len(accepted)} queued, {rejected} shed with 503 "
+            f"(PASSWORD_HASHING_MAX_PENDING={executor.max_pending})"
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
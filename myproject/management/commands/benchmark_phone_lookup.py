@@ -0,0 +1,66 @@
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from myproject.models import Country
+from myproject.views.phone_prefix import PhonePrefixTrie, normalize_phone_number
+
+
+def db_scan_lookup(phone_number):
+    """Baseline: read every country's calling code and keep the longest one the number starts with."""
+    best = None
+    for country_id, phone_code in Country.objects.exclude(phone_code__isnull=True).values_list("id", "phone_code"):
+        code = normalize_phone_number(phone_code)
+        if len(code) > 1 and phone_number.startswith(code) and (best is None or len(code) > len(best[0])):
+            best = (code, country_id)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Benchmark calling-code detection with the in-memory prefix trie against a per-request database scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=100000, help="Random lookups against the trie.")
+        parser.add_argument("--db-queries", type=int, default=200, help="Random lookups against the database scan.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for generated numbers.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        countries = list(
+            Country.objects.exclude(phone_code__isnull=True).exclude(phone_code="").values(
+                "id", "name", "code", "phone_code", "population"
+            )
+        )
+        if not countries:
+            raise CommandError("No countries with phone codes. Run update_countries_and_cities first.")
+
+        started = time.perf_counter()
+        trie = PhonePrefixTrie(countries)
+        self.stdout.write(f"Trie built over {trie.size} calling codes in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+        # Realistic numbers: a known calling code followed by a random subscriber number
+        numbers = [
+            normalize_phone_number(rng.choice(countries)["phone_code"])
+            + "".join(rng.choice("0123456789") for _ in range(rng.randint(7, 10)))
+            for _ in range(max(options["queries"], options["db_queries"]))
+        ]
+
+        trie_numbers = numbers[: options["queries"]]
+        started = time.perf_counter()
+        trie_results = [trie.lookup(number) for number in trie_numbers]
+        trie_avg = (time.perf_counter() - started) / len(trie_numbers)
+
+        db_numbers = numbers[: options["db_queries"]]
+        started = time.perf_counter()
+        db_results = [db_scan_lookup(number) for number in db_numbers]
+        db_avg = (time.perf_counter() - started) / len(db_numbers)
+
+        # Both methods must agree on the matched prefix
+        agreement = sum(
+            (trie_result[0] if trie_result else None) == (db_result[0] if db_result else None)
+            for trie_result, db_result in zip(trie_results, db_results)
+        )
+
+        self.stdout.write(f"Trie:    {trie_avg * 1e6:10.2f} us/lookup over {len(trie_numbers)} lookups")
+        self.stdout.write(f"DB scan: {db_avg * 1e6:10.2f} us/lookup over {len(db_numbers)} lookups")
+        self.stdout.write(f"Speed-up: {db_avg / trie_avg:.0f}x, agreement {agreement}/{min(len(trie_results), len(db_results))}")
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from myproject.models import AccountCreation
+
+ENDPOINTS = {
+    "check-email": "/api/check-email/",
+    "progress": "/api/user/registration-progress/",
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(host, port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server on port {port} did not start within {timeout}s")
+
+
+async def _fetch(reader, writer, host, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(status_line.split()[1]), headers.get("connection", "").lower() == "close"
+
+
+async def _run_load(base_url, paths, concurrency):
+    """
+    Send every path in `paths` over `concurrency` keep-alive connections. Returns
+    (elapsed seconds, [(status, latency)]).
+    """
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    results = []
+
+    async def connection_worker():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while not queue.empty():
+                path = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    status, closed = await _fetch(reader, writer, host, path)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    status, closed = 0, True
+                results.append((status, time.perf_counter() - started))
+                if closed:
+                    writer.close()
+                    reader, writer = await asyncio.open_connection(host, port)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection_worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, results
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark concurrent throughput of the registration endpoints: DRF views under a "
+        "WSGI server (gunicorn) against the native async views under uvicorn"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000, help="Requests sent to each stack.")
+        parser.add_argument("--concurrency", type=int, default=64, help="Concurrent client connections.")
+        parser.add_argument("--workers", type=int, default=1, help="Server processes for each stack.")
+        parser.add_argument("--threads", type=int, default=8, help="Threads per gunicorn worker (WSGI stack).")
+        parser.add_argument(
+            "--endpoint", choices=[*ENDPOINTS, "mixed"], default="mixed",
+            help="Endpoint under load; 'mixed' alternates email checks and progress reads.",
+        )
+        parser.add_argument("--wsgi-url", help="Benchmark an already running WSGI server instead of starting gunicorn.")
+        parser.add_argument(
+            "--asgi-url",
+            help="Benchmark an already running ASGI server (with ASYNC_REGISTRATION_VIEWS on) instead of starting uvicorn.",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the request mix.")
+
+    def _paths(self, options):
+        rng = random.Random(options["seed"])
+        emails = list(AccountCreation.objects.values_list("email", flat=True)[:1000])
+        if not emails and options["endpoint"] != "check-email":
+            raise CommandError("No users to read progress for. Run generate_load_data first.")
+
+        paths = []
+        for n in range(options["requests"]):
+            endpoint = options["endpoint"]
+            if endpoint == "mixed":
+                endpoint = "check-email" if n % 2 else "progress"
+            if endpoint == "check-email":
+                # Mostly unregistered addresses, as typed during signup
+                email = rng.choice(emails) if emails and rng.random() < 0.1 else f"user{rng.randrange(10 ** 9)}@bench.invalid"
+            else:
+                email = rng.choice(emails)
+            paths.append(f"{ENDPOINTS[endpoint]}?{urlencode({'email': email})}")
+        return paths
+
+    def _start_server(self, stack, options):
+        port = _free_port()
+        env = dict(os.environ)
+        if stack == "wsgi":
+            if not shutil.which("gunicorn"):
+                raise CommandError("gunicorn is not installed; pass --wsgi-url to use a running WSGI server.")
+            env["ASYNC_REGISTRATION_VIEWS"] = "False"
+            command = [
+                "gunicorn", "myproject.wsgi:application", "--bind", f"127.0.0.1:{port}",
+                "--workers", str(options["workers"]), "--worker-class", "gthread",
+                "--threads", str(options["threads"]), "--log-level", "warning",
+            ]
+        else:
+            try:
+                import uvicorn  # noqa: F401
+            except ImportError:
+                raise CommandError("uvicorn is not installed; pass --asgi-url to use a running ASGI server.")
+            env["ASYNC_REGISTRATION_VIEWS"] = "True"
+            command = [
+                sys.executable, "-m", "uvicorn", "myproject.asgi:application", "--host", "127.0.0.1",
+                "--port", str(port), "--workers", str(options["workers"]), "--log-level", "warning",
+                "--no-access-log",
+            ]
+        process = subprocess.Popen(command, env=env)
+        _wait_for_port("127.0.0.1", port, process)
+        return process, f"http://127.0.0.1:{port}"
+
+    def _benchmark(self, label, base_url, paths, concurrency):
+        # Warm up: first requests pay for imports, connections and in-process caches
+        asyncio.run(_run_load(base_url, paths[: concurrency * 2], concurrency))
+        elapsed, results = asyncio.run(_run_load(base_url, paths, concurrency))
+        latencies = sorted(latency for _, latency in results)
+        errors = sum(1 for status, _ in results if status != 200)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        self.stdout.write(
+            f"{label}: {len(results) / elapsed:8.1f} req/s, p50 {statistics.median(latencies) * 1000:7.1f}ms, "
+            f"p95 {p95 * 1000:7.1f}ms, {errors} non-200 responses"
+        )
+        return len(results) / elapsed
+
+    def handle(self, *args, **options):
+        paths = self._paths(options)
+        self.stdout.write(
+            f"{len(paths)} '{options['endpoint']}' requests per stack over {options['concurrency']} connections, "
+            f"{options['workers']} server worker(s)"
+        )
+
+        throughput = {}
+        for stack, label in (("wsgi", "WSGI (gunicorn, DRF views)"), ("asgi", "ASGI (uvicorn, async views)")):
+            base_url = options[f"{stack}_url"]
+            process = None
+            if not base_url:
+                process, base_url = self._start_server(stack, options)
+            try:
+                throughput[stack] = self._benchmark(label, base_url, paths, options["concurrency"])
+            finally:
+                if process:
+                    process.terminate()
+                    process.wait(timeout=30)
+
+        self.stdout.write(f"ASGI/WSGI throughput ratio: {throughput['asgi'] / throughput['wsgi']:.2f}x")
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
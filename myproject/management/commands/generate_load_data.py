@@ -0,0 +1,321 @@
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from myproject.views import snapshots
+from myproject.views.email_filter import email_filter
+from myproject.models import (
+    AccountCreation, PersonalInformation, AddressDetails, EducationalBackground,
+    CourseSelection, Course, Payment, RegistrationStep, Country, City,
+)
+
+# Share of users that get past each registration step (the rest abandon before it)
+FUNNEL = [
+    (2, 0.90),  # Personal information
+    (3, 0.80),  # Address details
+    (4, 0.70),  # Educational background
+    (5, 0.55),  # Course selection
+    (6, 0.45),  # Payment
+]
+
+GENDERS = [("Male", 49), ("Female", 49), ("Other", 2)]
+DEGREES = [("High School", 30), ("Bachelor's", 40), ("Master's", 20), ("Ph.D.", 5), ("Other", 5)]
+FIELDS_OF_STUDY = [
+    "Computer Science", "Business", "Engineering", "Medicine", "Law", "Economics",
+    "Mathematics", "Physics", "Biology", "Psychology", "Design", "Literature",
+]
+PAYMENT_METHODS = [("Credit Card", 60), ("PayPal", 30), ("Google Pay", 10)]
+PAYMENT_OUTCOMES = [("Completed", 85), ("Failed", 10), ("Pending", 4), ("Refunded", 1)]
+FIRST_NAMES = [
+    "James", "Maria", "Wei", "Aisha", "Carlos", "Olga", "Ravi", "Fatima", "John", "Yuki",
+    "Ahmed", "Sofia", "Liam", "Chen", "Noah", "Amara", "Ivan", "Priya", "Lucas", "Zara",
+]
+LAST_NAMES = [
+    "Smith", "Garcia", "Wang", "Khan", "Silva", "Ivanova", "Patel", "Ali", "Brown", "Tanaka",
+    "Hassan", "Rossi", "Murphy", "Li", "Muller", "Okafor", "Petrov", "Sharma", "Costa", "Nguyen",
+]
+STREETS = ["Main St", "Oak Ave", "Park Rd", "High St", "Station Rd", "Church Ln", "Mill Rd", "Lake Dr"]
+
+# Users registered over this many days before --as-of, more of them recently
+SIGNUP_WINDOW_DAYS = 730
+
+# Cities per country kept for sampling (most populous first)
+CITIES_PER_COUNTRY = 200
+
+# Courses created when the table is empty
+SYNTHETIC_COURSES = 40
+
+
+class WeightedChoice:
+    """O(log n) weighted sampling from a fixed population."""
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        self.cumulative = list(itertools.accumulate(max(weight, 1) for weight in weights))
+
+    def pick(self, rng):
+        return self.items[bisect.bisect_right(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+def _choice(pairs):
+    return WeightedChoice([value for value, _ in pairs], [weight for _, weight in pairs])
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset of registered students for load testing; "
+        "re-running with a larger --users continues where the last run stopped"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000, help="Total number of synthetic users wanted.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed always yields the same data.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Users written per transaction.")
+        parser.add_argument(
+            "--domain", default="loadtest.example",
+            help="Email domain of generated users; used to find where a previous run stopped.",
+        )
+        parser.add_argument("--password", default="LoadTest123!", help="Password set for every generated user.")
+        parser.add_argument(
+            "--as-of", default="2025-01-01",
+            help="Date (YYYY-MM-DD) the dataset ends on; fixed so that repeated runs produce identical rows.",
+        )
+
+    def handle(self, *args, **options):
+        self.seed = options["seed"]
+        self.domain = options["domain"]
+        self.load_reference_data()
+        # Hashing is deliberately slow; every generated user shares one hash
+        self.password_hash = make_password(options["password"])
+        try:
+            self.as_of = datetime.strptime(options["as_of"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            raise CommandError("--as-of must be a date in YYYY-MM-DD format.")
+
+        start = self.resume_index()
+        target = options["users"]
+        if start >= target:
+            self.stdout.write(self.style.SUCCESS(f"{start} synthetic users already exist; nothing to do."))
+            return
+        self.stdout.write(f"Generating users {start} to {target - 1} (seed {self.seed})...")
+
+        started = time.monotonic()
+        try:
+            for batch_start in range(start, target, options["batch_size"]):
+                batch_end = min(batch_start + options["batch_size"], target)
+                rows = self.write_batch(batch_start, batch_end)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"Users {batch_start}-{batch_end - 1}: {rows} rows written; "
+                    f"{(batch_end - start) / elapsed:.0f} users/s overall"
+                )
+        finally:
+            # Bulk inserts skip the signup signal; one rebuild covers every user written
+            email_filter.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(f"Generated {target - start} users in {time.monotonic() - started:.1f}s."))
+
+    def email(self, index):
+        return f"user{index:09d}@{self.domain}"
+
+    def resume_index(self):
+        """Index after the last user written; batches are atomic, so that user is complete."""
+        last = (
+            AccountCreation.objects.filter(email__endswith=f"@{self.domain}", email__startswith="user")
+            .order_by("-email").values_list("email", flat=True).first()
+        )
+        return int(last[len("user"):].split("@")[0]) + 1 if last else 0
+
+    def load_reference_data(self):
+        countries = list(Country.objects.filter(is_active=True).values("id", "phone_code", "population").order_by("id"))
+        if not countries:
+            raise CommandError("No countries found. Run update_countries_and_cities or import_gazetteer first.")
+        self.phone_codes = {
+            country["id"]: (country["phone_code"] or "").replace(" ", "").replace("-", "") or "+1"
+            for country in countries
+        }
+
+        self.cities = {}
+        for country in countries:
+            cities = list(
+                City.objects.filter(country_id=country["id"])
+                .order_by("-population", "id").values_list("id", "population")[:CITIES_PER_COUNTRY]
+            )
+            if cities:
+                self.cities[country["id"]] = WeightedChoice(
+                    [city_id for city_id, _ in cities], [population or 1 for _, population in cities]
+                )
+        if not self.cities:
+            raise CommandError("No cities found. Run update_countries_and_cities or import_gazetteer first.")
+
+        self.countries = WeightedChoice(
+            [country["id"] for country in countries], [country["population"] or 1 for country in countries]
+        )
+        # Addresses need a city, so they are only placed in countries that have some
+        self.address_countries = WeightedChoice(
+            [country["id"] for country in countries if country["id"] in self.cities],
+            [country["population"] or 1 for country in countries if country["id"] in self.cities],
+        )
+
+        if not Course.objects.exists():
+            rng = random.Random(self.seed)
+            Course.objects.bulk_create([
+                Course(
+                    name=f"Synthetic Course {i + 1:03d}",
+                    description="Generated for load testing.",
+                    fee=Decimal(rng.randrange(200, 5000)),
+                    duration=rng.choice(["3 Months", "6 Months", "1 Year", "2 Years"]),
+                    discount_percentage=rng.choice([0, 0, 0, 5, 10, 20]),
+                )
+                for i in range(SYNTHETIC_COURSES)
+            ])
+            # Bulk inserts skip the signal that would do this
+            snapshots.invalidate("courses")
+        self.courses = list(Course.objects.filter(is_active=True).order_by("id"))
+        if not self.courses:
+            raise CommandError("No active courses found. Activate at least one course (or empty the table to generate some).")
+        self.course_choice = WeightedChoice(range(len(self.courses)), [len(self.courses) - i for i in range(len(self.courses))])
+
+        self.genders = _choice(GENDERS)
+        self.degrees = _choice(DEGREES)
+        self.payment_methods = _choice(PAYMENT_METHODS)
+        self.payment_outcomes = _choice(PAYMENT_OUTCOMES)
+
+    def phone_number(self, rng, country_id):
+        code = self.phone_codes.get(country_id, "+1")
+        return code + "".join(str(rng.randrange(10)) for _ in range(min(9, 15 - len(code) + 1)))
+
+    def generate_user(self, index):
+        """Everything about one user, derived only from the seed and the user's index."""
+        rng = random.Random((self.seed << 32) | index)
+        joined = self.as_of - timedelta(
+            days=SIGNUP_WINDOW_DAYS * (1 - rng.random() ** 0.5), seconds=rng.randrange(86400)
+        )
+        verified = rng.random() < 0.75
+        user = {
+            "email": self.email(index),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "date_joined": joined,
+            "email_verified": verified,
+            "is_active": verified,
+        }
+
+        draw = rng.random()
+        step = 1
+        for next_step, share in FUNNEL:
+            if draw < share:
+                step = next_step
+        user["step"] = step
+
+        nationality = self.countries.pick(rng)
+        if step >= 2:
+            age = int(rng.triangular(18, 60, 22))
+            user["personal"] = {
+                "date_of_birth": (joined - timedelta(days=age * 365 + rng.randrange(365))).date(),
+                "gender": self.genders.pick(rng),
+                "phone_number": self.phone_number(rng, nationality),
+                "nationality_id": nationality,
+            }
+        if step >= 3:
+            country_id = nationality if nationality in self.cities and rng.random() < 0.85 else self.address_countries.pick(rng)
+            user["address"] = {
+                "street_address": f"{rng.randrange(1, 999)} {rng.choice(STREETS)}",
+                "city_id": self.cities[country_id].pick(rng),
+                "country_id": country_id,
+                "postal_code": f"{rng.randrange(10000, 999999)}",
+                "phone_number": self.phone_number(rng, country_id)[:15],
+            }
+        if step >= 4:
+            user["education"] = [
+                {
+                    "degree": self.degrees.pick(rng),
+                    "institution": f"University of {rng.choice(LAST_NAMES)}",
+                    "field_of_study": rng.choice(FIELDS_OF_STUDY),
+                    "graduation_year": joined.year - rng.randrange(0, 15),
+                }
+                for _ in range(1 if rng.random() < 0.7 else 2)
+            ]
+        if step >= 5:
+            courses = {self.course_choice.pick(rng) for _ in range(rng.choice([1, 1, 1, 2, 2, 3]))}
+            user["courses"] = sorted(courses)
+            user["total_fee"] = sum(Decimal(self.courses[i].discounted_fee) for i in courses).quantize(Decimal("0.01"))
+            user["study_duration"] = rng.choice([3, 6, 12, 24])
+        if step >= 6:
+            user["payment"] = {
+                "payment_method": self.payment_methods.pick(rng),
+                "payment_status": self.payment_outcomes.pick(rng),
+                "payment_date": joined + timedelta(minutes=rng.randrange(10, 60 * 24 * 7)),
+            }
+        return user
+
+    def _user_ids(self, users):
+        if connection.features.can_return_rows_from_bulk_insert:
+            return {user.email: user.id for user in users}
+        # Backends such as MySQL don't return primary keys from bulk inserts
+        return dict(AccountCreation.objects.filter(email__in=[user.email for user in users]).values_list("email", "id"))
+
+    def write_batch(self, batch_start, batch_end):
+        """Insert one batch of users and all their related rows in a single transaction."""
+        generated = [self.generate_user(index) for index in range(batch_start, batch_end)]
+        with transaction.atomic():
+            users = AccountCreation.objects.bulk_create([
+                AccountCreation(
+                    email=user["email"], first_name=user["first_name"], last_name=user["last_name"],
+                    password=self.password_hash, date_joined=user["date_joined"],
+                    email_verified=user["email_verified"], is_active=user["is_active"],
+                )
+                for user in generated
+            ])
+            ids = self._user_ids(users)
+
+            steps, personal, addresses, education, selections, payments = [], [], [], [], [], []
+            for user in generated:
+                user_id = ids[user["email"]]
+                steps.append(RegistrationStep(
+                    user_id=user_id, current_step=user["step"], last_visited=user["date_joined"],
+                    progress_percentage=round(Decimal(user["step"]) / 8 * 100, 2),
+                ))
+                if "personal" in user:
+                    personal.append(PersonalInformation(user_id=user_id, **user["personal"]))
+                if "address" in user:
+                    addresses.append(AddressDetails(user_id=user_id, **user["address"]))
+                for row in user.get("education", []):
+                    education.append(EducationalBackground(user_id=user_id, **row))
+                if "courses" in user:
+                    status = user.get("payment", {}).get("payment_status")
+                    selections.append(CourseSelection(
+                        user_id=user_id, study_duration=user["study_duration"], total_fee=user["total_fee"],
+                        payment_status={"Completed": "Paid", "Failed": "Failed"}.get(status, "Pending"),
+                    ))
+                if "payment" in user:
+                    payments.append(Payment(
+                        user_id=user_id, amount=user["total_fee"],
+                        transaction_id=f"LOAD-{self.seed}-{user['email'].split('@')[0]}", **user["payment"],
+                    ))
+
+            RegistrationStep.objects.bulk_create(steps)
+            PersonalInformation.objects.bulk_create(personal)
+            AddressDetails.objects.bulk_create(addresses)
+            EducationalBackground.objects.bulk_create(education)
+            Payment.objects.bulk_create(payments)
+            CourseSelection.objects.bulk_create(selections)
+
+            # Course selections are one per user here, so map them back through the user
+            selection_ids = dict(
+                CourseSelection.objects.filter(user_id__in=[selection.user_id for selection in selections])
+                .values_list("user_id", "id")
+            )
+            through = CourseSelection.courses.through
+            through.objects.bulk_create([
+                through(courseselection_id=selection_ids[ids[user["email"]]], course_id=self.courses[i].id)
+                for user in generated if "courses" in user
+                for i in user["courses"]
+            ])
+
+        return len(users) + len(steps) + len(personal) + len(addresses) + len(education) + len(selections) + len(payments)
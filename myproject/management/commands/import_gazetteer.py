@@ -0,0 +1,250 @@
+import csv
+import gzip
+import io
+import json
+import os
+import zipfile
+from django.core.management.base import BaseCommand, CommandError
+from myproject.models import Country
+from myproject.views.location_utils import (
+    BULK_BATCH_SIZE, SyncStats, chunked, bulk_upsert_countries, bulk_upsert_cities,
+)
+
+# GeoNames "geoname" table column positions (cities500.txt, allCountries.txt, ...)
+GEONAMES_NAME = 1
+GEONAMES_LATITUDE = 4
+GEONAMES_LONGITUDE = 5
+GEONAMES_FEATURE_CLASS = 6
+GEONAMES_FEATURE_CODE = 7
+GEONAMES_COUNTRY_CODE = 8
+GEONAMES_POPULATION = 14
+
+# GeoNames countryInfo.txt continent codes
+CONTINENTS = {
+    "AF": "Africa", "AN": "Antarctica", "AS": "Asia", "EU": "Europe",
+    "NA": "North America", "OC": "Oceania", "SA": "South America",
+}
+
+# Fields an offline import is allowed to set
+CITY_IMPORT_FIELDS = ["latitude", "longitude", "population", "is_capital"]
+COUNTRY_IMPORT_FIELDS = ["name", "phone_code", "region", "population", "currency_code", "currency_name"]
+
+# Rows between progress lines
+PROGRESS_EVERY = 100000
+
+
+def open_dump(path):
+    """Open a plain, .gz or .zip dump as a text stream (for .zip, the first .txt/.csv/.jsonl member)."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.endswith(".zip"):
+        archive = zipfile.ZipFile(path)
+        members = [name for name in archive.namelist() if name.endswith((".txt", ".csv", ".jsonl"))]
+        if not members:
+            raise CommandError(f"No data file found in {path}.")
+        return io.TextIOWrapper(archive.open(members[0]), encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def detect_format(path):
+    """Guess the dump format from the file name."""
+    name = path.lower()
+    for suffix in (".gz", ".zip"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "geonames"
+
+
+def read_geonames(stream):
+    """Yield city rows from a GeoNames tab-separated dump, keeping populated places only."""
+    for line in stream:
+        if line.startswith("#"):
+            continue
+        columns = line.rstrip("\r\n").split("\t")
+        if len(columns) <= GEONAMES_POPULATION or columns[GEONAMES_FEATURE_CLASS] != "P":
+            continue
+        yield {
+            "name": columns[GEONAMES_NAME],
+            "country_code": columns[GEONAMES_COUNTRY_CODE],
+            "latitude": columns[GEONAMES_LATITUDE],
+            "longitude": columns[GEONAMES_LONGITUDE],
+            "population": columns[GEONAMES_POPULATION],
+            "is_capital": columns[GEONAMES_FEATURE_CODE] == "PPLC",
+        }
+
+
+def read_csv(stream):
+    """Yield city rows from a CSV dump with a header row (name, country_code, latitude, ...)."""
+    yield from csv.DictReader(stream)
+
+
+def read_jsonl(stream):
+    """Yield city rows from a JSON-lines dump."""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+READERS = {"geonames": read_geonames, "csv": read_csv, "jsonl": read_jsonl}
+
+
+def read_country_info(stream):
+    """Yield `Country` records from a GeoNames countryInfo.txt file."""
+    for line in stream:
+        if line.startswith("#") or not line.strip():
+            continue
+        columns = line.rstrip("\r\n").split("\t")
+        if len(columns) < 13 or len(columns[0]) != 2:
+            continue
+        phone = columns[12].strip()
+        yield {
+            "code": columns[0].upper(),
+            "name": columns[4].strip(),
+            "phone_code": (phone if phone.startswith("+") else f"+{phone}")[:20] if phone else "",
+            "region": CONTINENTS.get(columns[8], columns[8]),
+            "population": _to_int(columns[7]) or 0,
+            "currency_code": columns[10][:3] or None,
+            "currency_name": columns[11][:50] or None,
+        }
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def _prefer_larger(city, record):
+    """When the dump repeats a name in a country, keep the most populous place."""
+    return (record["population"] or 0) >= (city.population or 0)
+
+
+class Command(BaseCommand):
+    help = "Import countries and cities from a local GeoNames, CSV or JSON-lines dump without any network access"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="City dump to import (.txt/.csv/.jsonl, optionally .gz or .zip).")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Dump format. Detected from the file name when omitted.",
+        )
+        parser.add_argument(
+            "--country-info",
+            help="GeoNames countryInfo.txt to create/update countries from before importing cities.",
+        )
+        parser.add_argument(
+            "--countries",
+            help="Comma-separated ISO codes; import cities for these countries only.",
+        )
+        parser.add_argument(
+            "--min-population",
+            type=int,
+            default=0,
+            help="Skip cities with a smaller population.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BULK_BATCH_SIZE,
+            help=f"Rows per bulk upsert transaction (default: {BULK_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+
+        if options["country_info"]:
+            with open_dump(options["country_info"]) as stream:
+                country_stats = bulk_upsert_countries(
+                    read_country_info(stream), batch_size=options["batch_size"], fields=COUNTRY_IMPORT_FIELDS
+                )
+            self.stdout.write(f"Countries: {country_stats.summary()}")
+
+        # Country codes resolve from one in-memory map instead of a query per row
+        country_ids = dict(Country.objects.values_list("code", "id"))
+        if options["countries"]:
+            wanted = {code.strip().upper() for code in options["countries"].split(",") if code.strip()}
+            country_ids = {code: pk for code, pk in country_ids.items() if code in wanted}
+        if not country_ids:
+            raise CommandError("No matching countries in the database. Import them first with --country-info.")
+
+        self.counters = {"read": 0, "skipped": 0, "duplicates": 0}
+        stats = SyncStats()
+        reader = READERS[options["format"] or detect_format(path)]
+
+        next_report = PROGRESS_EVERY
+        with open_dump(path) as stream:
+            records = self.filter_rows(reader(stream), country_ids, options["min_population"])
+            for batch in chunked(records, options["batch_size"]):
+                bulk_upsert_cities(
+                    self.dedupe(batch),
+                    batch_size=options["batch_size"],
+                    stats=stats,
+                    fields=CITY_IMPORT_FIELDS,
+                    should_replace=_prefer_larger,
+                )
+                if self.counters["read"] >= next_report:
+                    self.report(stats)
+                    next_report = self.counters["read"] + PROGRESS_EVERY
+
+        self.report(stats)
+        self.stdout.write(self.style.SUCCESS("Gazetteer import completed."))
+
+    def filter_rows(self, rows, country_ids, min_population):
+        """Normalize raw rows into `City` records, dropping unknown countries and small places."""
+        for row in rows:
+            self.counters["read"] += 1
+            country_id = country_ids.get((row.get("country_code") or row.get("country") or "").upper())
+            name = (row.get("name") or "").strip()[:255]
+            population = _to_int(row.get("population"))
+            if not country_id or not name or (population or 0) < min_population:
+                self.counters["skipped"] += 1
+                continue
+            yield {
+                "name": name,
+                "country_id": country_id,
+                "latitude": _to_float(row.get("latitude")),
+                "longitude": _to_float(row.get("longitude")),
+                "population": population,
+                "is_capital": _to_bool(row.get("is_capital", False)),
+            }
+
+    def dedupe(self, batch):
+        """Collapse repeated `(name, country)` keys within a batch, keeping the most populous place."""
+        best = {}
+        for record in batch:
+            key = (record["name"], record["country_id"])
+            current = best.get(key)
+            if current is not None:
+                self.counters["duplicates"] += 1
+                if (record["population"] or 0) < (current["population"] or 0):
+                    continue
+            best[key] = record
+        return list(best.values())
+
+    def report(self, stats):
+        self.stdout.write(
+            f"Read {self.counters['read']} rows, skipped {self.counters['skipped']}, "
+            f"merged {self.counters['duplicates']} duplicates. Cities: {stats.summary()}"
+        )
@@ -0,0 +1,129 @@
+import csv
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from myproject.models import AccountCreation
+from myproject.views.email_filter import filter_key
+from myproject.views.location_utils import chunked
+from myproject.views.registration_batch import _text
+from myproject.views.student_import import (
+    IMPORT_BATCH_SIZE, READERS, ImportReferences, StudentImportBatch, detect_format, open_import,
+    row_to_student,
+)
+
+# Rows between progress lines
+PROGRESS_EVERY = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-register students from a partner school's CSV or JSON-lines file: rows are validated "
+        "with the registration rules and written in chunked transactions, and rejected rows go to "
+        "an error report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help=(
+                "Student file (.csv or .jsonl, optionally .gz). CSV columns: email, password, first_name, "
+                "last_name, date_of_birth, gender, phone_number, nationality, street_address, city, country, "
+                "state, postal_code, address_phone_number, degree, institution, field_of_study, "
+                "graduation_year, honors, courses (IDs or names separated by ';'), study_duration. "
+                "JSON lines may also use the batch registration format."
+            ),
+        )
+        parser.add_argument("--format", choices=sorted(READERS), help="File format. Detected from the file name when omitted.")
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+            help=f"Students validated and written per transaction (default: {IMPORT_BATCH_SIZE}).",
+        )
+        parser.add_argument("--errors", help="Where to write the error report (default: <path>.errors.csv).")
+        parser.add_argument("--dry-run", action="store_true", help="Validate every row without writing anything.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        errors_path = options["errors"] or f"{path}.errors.csv"
+
+        # Countries and courses resolve from in-memory maps for the whole file
+        references = ImportReferences()
+        reader = READERS[options["format"] or detect_format(path)]
+        self.counters = {"read": 0, "imported": 0, "rejected": 0}
+        self.action = "validated" if options["dry_run"] else "imported"
+        started = time.perf_counter()
+
+        next_report = PROGRESS_EVERY
+        with open_import(path) as stream, open(errors_path, "w", newline="", encoding="utf-8") as report:
+            self.report = csv.writer(report)
+            self.report.writerow(["line", "email", "step", "error"])
+            for chunk in chunked(reader(stream), options["batch_size"]):
+                self.import_chunk(chunk, references, options["dry_run"])
+                if self.counters["read"] >= next_report:
+                    self.progress(started)
+                    next_report = self.counters["read"] + PROGRESS_EVERY
+
+        self.progress(started)
+        if self.counters["rejected"]:
+            self.stdout.write(self.style.WARNING(f"{self.counters['rejected']} rows rejected; see {errors_path}"))
+        self.stdout.write(self.style.SUCCESS(f"Student import completed: {self.counters['imported']} {self.action}."))
+
+    def import_chunk(self, chunk, references, dry_run):
+        """Validate one chunk of `(line, row)` and write its valid students in one transaction."""
+        self.counters["read"] += len(chunk)
+        lines, students = [], []
+        for line, row in chunk:
+            if row is None:
+                self.reject(line, {}, {"row": "Not a JSON object."})
+                continue
+            student = row_to_student(row)
+            unresolved = references.resolve(student)
+            if unresolved:
+                self.reject(line, student, unresolved)
+                continue
+            lines.append(line)
+            students.append(student)
+        if not students:
+            return
+
+        batch = StudentImportBatch(students, references)
+        batch.validate()
+        dropped = batch.drop_invalid()
+        for index, errors in dropped:
+            self.reject(lines[index], students[index], errors)
+        dropped = {index for index, _ in dropped}
+        lines = [line for index, line in enumerate(lines) if index not in dropped]
+        if not batch.students:
+            return
+        emails = {filter_key(self.email(student)) for student in batch.students}
+
+        if not dry_run:
+            try:
+                batch.save()
+            except IntegrityError as e:
+                # Another writer took one of these emails after validation; cities created in
+                # the rolled-back transaction are gone too
+                references.cities.clear()
+                for line, student in zip(lines, batch.students):
+                    self.reject(line, student, {"account": f"Not saved: {e}"})
+                return
+        references.emails |= emails
+        self.counters["imported"] += len(batch.students)
+
+    def email(self, student):
+        return AccountCreation.objects.normalize_email(_text(student.get("account") or {}, "email"))
+
+    def reject(self, line, student, errors):
+        self.counters["rejected"] += 1
+        email = self.email(student) if isinstance(student.get("account"), dict) else ""
+        for step, message in errors.items():
+            self.report.writerow([line, email, step, message])
+
+    def progress(self, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Read {self.counters['read']} rows: {self.counters['imported']} {self.action}, "
+            f"{self.counters['rejected']} rejected ({self.counters['read'] / max(elapsed, 1e-9):.0f} rows/s)"
+        )
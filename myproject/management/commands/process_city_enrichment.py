@@ -0,0 +1,40 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from myproject.views.enrichment_utils import run_enrichment_batch
+from myproject.views.location_helpers import ConcurrentFetcher, get_http_transport
+
+
+class Command(BaseCommand):
+    help = "Process queued city enrichment jobs (coordinates lookups) in batches, off the request path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Jobs claimed per batch.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit instead of polling.")
+        parser.add_argument("--poll-interval", type=float, default=10.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        fetcher = ConcurrentFetcher(
+            transport=get_http_transport(),
+            max_workers=settings.GEO_FETCH_WORKERS,
+            rate=settings.GEO_FETCH_RATE,
+            burst=settings.GEO_FETCH_BURST,
+            per_host=settings.GEO_FETCH_PER_HOST,
+            max_retries=settings.GEO_FETCH_MAX_RETRIES,
+            backoff_max=settings.GEO_FETCH_BACKOFF_MAX,
+        )
+        self.stdout.write("Processing city enrichment jobs...")
+
+        total_done = total_failed = 0
+        while True:
+            done, failed = run_enrichment_batch(fetcher, options["batch_size"])
+            total_done += done
+            total_failed += failed
+            if done or failed:
+                self.stdout.write(f"Batch: {done} done, {failed} to retry.")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"City enrichment completed: {total_done} done, {total_failed} to retry."))
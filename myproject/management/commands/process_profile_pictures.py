@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from myproject.views.profile_pictures import run_picture_batch
+
+
+class Command(BaseCommand):
+    help = "Render uploaded profile pictures into their thumbnail and WebP/JPEG variants in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=settings.PROFILE_PICTURE_WORKERS,
+            help="Rendering processes (default PROFILE_PICTURE_WORKERS; 0 for one per CPU).",
+        )
+        parser.add_argument("--batch-size", type=int, help="Jobs claimed per batch (default: 4 per worker).")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit instead of polling.")
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+
+    def _executor(self, workers):
+        # Children never touch the database: don't let them inherit open connections
+        connections.close_all()
+        # django.setup lets spawned (non-fork) children import the rendering module
+        return ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+
+    def handle(self, *args, **options):
+        workers = options["workers"] or os.cpu_count() or 1
+        batch_size = options["batch_size"] or workers * 4
+        executor = self._executor(workers)
+        self.stdout.write(f"Processing profile pictures with {workers} workers...")
+
+        total_done = total_retry = total_failed = 0
+        try:
+            while True:
+                try:
+                    done, retry, failed = run_picture_batch(executor, batch_size)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory); unfinished jobs are retried when their lease expires
+                    self.stderr.write("A rendering process died; restarting the pool.")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = self._executor(workers)
+                    continue
+                total_done += done
+                total_retry += retry
+                total_failed += failed
+                if done or retry or failed:
+                    self.stdout.write(f"Batch: {done} done, {retry} to retry, {failed} failed.")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        finally:
+            executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Profile pictures completed: {total_done} done, {total_retry} to retry, {total_failed} failed."
+        ))
@@ -0,0 +1,69 @@
+import time
+from django.core.management.base import BaseCommand
+from myproject.models import City
+from myproject.views import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Render precompressed JSON snapshots of countries, courses and every country's cities (e.g. on deploy); "
+        "with --watch, keep republishing the snapshots that changes mark stale"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only", choices=["countries", "courses", "cities"],
+            help="Publish only this kind of snapshot.",
+        )
+        parser.add_argument(
+            "--watch", action="store_true",
+            help="Instead of publishing everything once, poll for stale snapshots and republish them.",
+        )
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to sleep when nothing is stale.")
+
+    def handle(self, *args, **options):
+        if snapshots.brotli is None:
+            self.stdout.write("Brotli is not installed; publishing gzip variants only.")
+        if options["watch"]:
+            self.watch(options["poll_interval"])
+            return
+
+        names = []
+        if options["only"] in (None, "countries"):
+            names.append("countries")
+        if options["only"] in (None, "courses"):
+            names.append("courses")
+        if options["only"] in (None, "cities"):
+            country_ids = City.objects.values_list("country_id", flat=True).distinct().order_by("country_id")
+            names.extend(f"cities/{country_id}" for country_id in country_ids)
+
+        started = time.monotonic()
+        published = skipped = 0
+        for name in names:
+            # Republish even if current, so that a deploy always starts from fresh files
+            if snapshots.publish(name):
+                published += 1
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {published} snapshots ({skipped} empty) in {time.monotonic() - started:.1f}s."
+        ))
+
+    def watch(self, poll_interval):
+        self.stdout.write("Watching for stale snapshots...")
+        while True:
+            published = 0
+            for name in snapshots.stale_names():
+                started = time.monotonic()
+                try:
+                    version = snapshots.publish(name, stale_only=True)
+                except Exception as e:
+                    # Marked stale again; retried on a later pass
+                    self.stderr.write(f"Failed to publish {name}: {e}")
+                    continue
+                if version:
+                    published += 1
+                    self.stdout.write(f"Published {name} version {version} in {time.monotonic() - started:.2f}s.")
+            if not published:
+                time.sleep(poll_interval)
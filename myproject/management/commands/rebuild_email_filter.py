@@ -0,0 +1,39 @@
+import random
+import string
+from django.core.management.base import BaseCommand
+from myproject.models import AccountCreation
+from myproject.views.email_filter import email_filter, filter_key
+
+
+class Command(BaseCommand):
+    help = "Rebuild the registered-email Bloom filter, make every worker reload it and report its false-positive rate"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--probe", type=int, default=10000,
+            help="Random unregistered emails checked to measure the false-positive rate (0 to skip).",
+        )
+
+    def handle(self, *args, **options):
+        # Bump the version first so that the published snapshot carries the new one
+        email_filter.invalidate()
+        bloom = email_filter.build()
+        self.stdout.write(
+            f"Filter: {bloom.count} emails, capacity {bloom.capacity}, {len(bloom.bits) / 2 ** 20:.2f}MB, "
+            f"{bloom.hashes} hashes; expected false-positive rate {bloom.expected_error_rate():.4%}"
+        )
+
+        if options["probe"]:
+            rng = random.Random(0)
+            probes = [
+                f"{''.join(rng.choices(string.ascii_lowercase, k=16))}@probe.invalid" for _ in range(options["probe"])
+            ]
+            hits = [email for email in probes if filter_key(email) in bloom]
+            registered = set(AccountCreation.objects.filter(email__in=hits).values_list("email", flat=True))
+            false_positives = len(hits) - len(registered)
+            self.stdout.write(
+                f"Probe: {false_positives} false positives in {len(probes)} unregistered emails "
+                f"({false_positives / len(probes):.4%})"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Email filter rebuilt; workers reload it on their next check."))
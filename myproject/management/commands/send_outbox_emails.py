@@ -0,0 +1,35 @@
+import smtplib
+import time
+from django.core.management.base import BaseCommand
+from myproject.views.email_outbox import BACKENDS, DeliveryStats, deliver_batch, get_outbox_connection
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails in batches over one reused mail connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Emails claimed per batch.")
+        parser.add_argument("--once", action="store_true", help="Drain the outbox once and exit instead of polling.")
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument(
+            "--backend",
+            help=f"Mail backend ({', '.join(BACKENDS)} or a dotted path); defaults to EMAIL_OUTBOX_BACKEND.",
+        )
+
+    def handle(self, *args, **options):
+        stats = DeliveryStats()
+        self.stdout.write("Delivering outbound emails...")
+
+        while True:
+            # One connection per drain: kept open across batches, closed before idling
+            try:
+                with get_outbox_connection(options["backend"]) as mail_connection:
+                    while deliver_batch(mail_connection, options["batch_size"], stats):
+                        self.stdout.write(f"Progress: {stats.summary()}")
+            except (OSError, smtplib.SMTPException) as e:
+                self.stderr.write(f"Mail server unavailable: {e}")
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox delivery completed: {stats.summary()}"))
@@ -1,12 +1,23 @@
 import requests
 import time
+from datetime import timedelta
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from myproject.models import Country, City
+from django.utils.timezone import now
+from myproject.models import Country, City, CountrySyncState
+from myproject.views.json_stream import iter_response_array
+from myproject.views.location_helpers import (
+    ConcurrentFetcher, get_http_transport, http_cache_summary, city_search_params,
+)
+from myproject.views.location_utils import (
+    BULK_BATCH_SIZE, SyncStats, parse_country_record, parse_city_record,
+    bulk_upsert_countries, bulk_upsert_cities, content_hash, city_batch_hash, save_sync_states,
+)
 
 # RestCountries API URL
-RESTCOUNTRIES_URL = "https://restcountries.com/v3.1/all"
+RESTCOUNTRIES_URL = settings.RESTCOUNTRIES_URL
 # OpenStreetMap (Nominatim API) for cities
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+NOMINATIM_URL = settings.NOMINATIM_URL
 
 # Default timeout and retry settings
 REQUEST_TIMEOUT = 30
@@ -18,7 +29,7 @@ def fetch_cities_with_retry(country_name, retries=MAX_RETRIES, delay=60):
     """Fetch cities with retry logic and exponential backoff to handle rate limits and errors."""
     for attempt in range(retries):
         try:
-            response = requests.get(
+            response = get_http_transport().get(
                 NOMINATIM_URL,
                 params={"country": country_name, "format": "json", "addressdetails": 1},
                 headers={"User-Agent": "YourAppName/1.0"},
@@ -48,17 +59,70 @@ def fetch_cities_with_retry(country_name, retries=MAX_RETRIES, delay=60):
 class Command(BaseCommand):
     help = "Fetch and update country and city data using RestCountries API and OpenStreetMap (Nominatim API)"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Write countries and cities with batched bulk upserts instead of one query per row.",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Like --bulk, but skip countries and city lists whose upstream content hash is unchanged.",
+        )
+        parser.add_argument(
+            "--max-age-days",
+            type=int,
+            default=settings.GEO_SYNC_MAX_AGE_DAYS,
+            help="In incremental mode, re-fetch cities for countries not synced within this many days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BULK_BATCH_SIZE,
+            help=f"Rows per bulk upsert transaction (default: {BULK_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.GEO_FETCH_WORKERS,
+            help="Concurrent city fetches in bulk mode.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=settings.GEO_FETCH_RATE,
+            help="Maximum Nominatim requests per second across all workers in bulk mode.",
+        )
+
     def handle(self, *args, **kwargs):
         self.stdout.write("Fetching countries from RestCountries API...")
 
         try:
-            # Fetch data from RestCountries API with timeout
-            response = requests.get(RESTCOUNTRIES_URL, timeout=REQUEST_TIMEOUT)
+            # Fetch data from RestCountries API with timeout; countries are parsed as they stream in
+            response = get_http_transport().get(RESTCOUNTRIES_URL, timeout=REQUEST_TIMEOUT, stream=True)
             response.raise_for_status()
-            countries = response.json()
+            countries = iter_response_array(response)
 
-            for country in countries:
-                self.process_country(country)
+            if kwargs["bulk"] or kwargs["incremental"]:
+                fetcher = ConcurrentFetcher(
+                    transport=get_http_transport(),
+                    max_workers=kwargs["workers"],
+                    rate=kwargs["rate"],
+                    burst=settings.GEO_FETCH_BURST,
+                    per_host=settings.GEO_FETCH_PER_HOST,
+                    max_retries=settings.GEO_FETCH_MAX_RETRIES,
+                    backoff_max=settings.GEO_FETCH_BACKOFF_MAX,
+                )
+                if kwargs["incremental"]:
+                    self.incremental_sync(countries, kwargs["batch_size"], fetcher, timedelta(days=kwargs["max_age_days"]))
+                else:
+                    self.bulk_sync(countries, kwargs["batch_size"], fetcher)
+            else:
+                # Read the whole list first: each country waits on Nominatim, and the
+                # RestCountries stream would otherwise sit open (and time out) meanwhile
+                for country in list(countries):
+                    self.process_country(country)
 
         except requests.Timeout:
             self.stderr.write("Request to RestCountries API timed out.")
@@ -67,8 +131,96 @@ class Command(BaseCommand):
         except Exception as e:
             self.stderr.write(f"Unexpected error: {e}")
 
+        if http_cache_summary():
+            self.stdout.write(f"Response cache: {http_cache_summary()}")
         self.stdout.write(self.style.SUCCESS("Countries and cities update process completed."))
 
+    def bulk_sync(self, countries, batch_size, fetcher):
+        """Upsert all countries in bulk, then fetch cities concurrently and flush them in batches."""
+        records = [record for record in map(parse_country_record, countries) if record]
+        country_stats = bulk_upsert_countries(records, batch_size=batch_size)
+        self.stdout.write(f"Countries: {country_stats.summary()}")
+
+        country_ids = dict(
+            Country.objects.filter(code__in=[record["code"] for record in records]).values_list("name", "id")
+        )
+        city_stats = SyncStats()
+        pending = []
+        for country_name, cities_data in fetcher.fetch_cities(country_ids):
+            self.stdout.write(f"Fetched {len(cities_data)} cities for {country_name}.")
+            for city_data in cities_data:
+                record = parse_city_record(city_data, country_ids[country_name])
+                if record:
+                    pending.append(record)
+
+            if len(pending) >= batch_size:
+                bulk_upsert_cities(pending, batch_size=batch_size, stats=city_stats)
+                pending = []
+                self.stdout.write(f"Cities so far: {city_stats.summary()}")
+
+        bulk_upsert_cities(pending, batch_size=batch_size, stats=city_stats)
+        self.stdout.write(f"Cities: {city_stats.summary()}")
+
+    def incremental_sync(self, countries, batch_size, fetcher, max_age):
+        """Write only countries whose upstream record changed, and re-fetch cities only where due."""
+        records = {record["code"]: record for record in map(parse_country_record, countries) if record}
+        hashes = {code: content_hash(record) for code, record in records.items()}
+        states = {
+            state.country.code: state
+            for state in CountrySyncState.objects.select_related("country").filter(country__code__in=list(records))
+        }
+        changed = {code for code in records if code not in states or states[code].record_hash != hashes[code]}
+        country_stats = bulk_upsert_countries([records[code] for code in changed], batch_size=batch_size)
+        country_stats.unchanged += len(records) - len(changed)
+        self.stdout.write(f"Countries: {country_stats.summary()}")
+
+        country_objs = {country.code: country for country in Country.objects.filter(code__in=list(records))}
+        for code in changed:
+            if code not in states:
+                states[code] = CountrySyncState(country=country_objs[code])
+            states[code].record_hash = hashes[code]
+
+        # Cities are due when the country changed upstream or its last city sync is too old
+        cutoff = now() - max_age
+        due_codes = {
+            code for code in records
+            if code in changed or states[code].cities_synced_at is None or states[code].cities_synced_at < cutoff
+        }
+        due = {country_objs[code].name: states[code] for code in due_codes}
+        self.stdout.write(f"Fetching cities for {len(due)} of {len(records)} countries...")
+
+        city_stats = SyncStats()
+        pending = []
+        jobs = [(name, NOMINATIM_URL, city_search_params(name)) for name in due]
+        for country_name, cities_data in fetcher.map(jobs):
+            if cities_data is None:
+                # Due again next run, even though its new record hash is saved below
+                due[country_name].cities_synced_at = None
+                self.stderr.write(f"Failed to fetch cities for {country_name}; will retry on the next run.")
+                continue
+            state = due[country_name]
+            city_records = [
+                record for record in (parse_city_record(city_data, state.country_id) for city_data in cities_data)
+                if record
+            ]
+            batch_hash = city_batch_hash(city_records)
+            if batch_hash == state.cities_hash:
+                city_stats.unchanged += len(city_records)
+            else:
+                pending.extend(city_records)
+                state.cities_hash = batch_hash
+            state.cities_synced_at = now()
+
+            if len(pending) >= batch_size:
+                bulk_upsert_cities(pending, batch_size=batch_size, stats=city_stats)
+                pending = []
+
+        bulk_upsert_cities(pending, batch_size=batch_size, stats=city_stats)
+        self.stdout.write(f"Cities: {city_stats.summary()}")
+
+        # Hashes are saved last so an interrupted run is simply redone next time
+        save_sync_states(states[code] for code in changed | due_codes)
+
     def process_country(self, country):
         """Process a single country: validate and update/create country record, and fetch cities."""
         try:
@@ -80,8 +232,8 @@ class Command(BaseCommand):
 
             # Validate and clean phone code
             root = country.get("idd", {}).get("root", "")
-            suffixes = "".join(country.get("idd", {}).get("suffixes", [""]))
-            phone_code = (root + suffixes).strip()
+            suffixes = country.get("idd", {}).get("suffixes") or []
+            phone_code = (root + suffixes[0] if len(suffixes) == 1 else root).strip()
             if len(phone_code) > 20:
                 self.stdout.write(f"Warning: Trimming phone code for {country.get('name', {}).get('common')} to 20 characters.")
                 phone_code = phone_code[:20]
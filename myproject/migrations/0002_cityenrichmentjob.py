@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-17 00:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myproject', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CityEnrichmentJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Done', 'Done'), ('Failed', 'Failed')], default='Pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('city', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='enrichment_job', to='myproject.city')),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrichment_jobs', to='myproject.country')),
+            ],
+            options={
+                'verbose_name': 'City Enrichment Job',
+                'verbose_name_plural': 'City Enrichment Jobs',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='myproject_c_status_cfd794_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-17 00:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myproject', '0002_cityenrichmentjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountrySyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_hash', models.CharField(blank=True, max_length=40, null=True)),
+                ('cities_hash', models.CharField(blank=True, max_length=40, null=True)),
+                ('cities_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('country', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sync_state', to='myproject.country')),
+            ],
+            options={
+                'verbose_name': 'Country Sync State',
+                'verbose_name_plural': 'Country Sync States',
+            },
+        ),
+    ]
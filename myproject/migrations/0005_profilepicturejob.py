@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-17 00:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myproject', '0004_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personalinformation',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='ProfilePictureJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Done', 'Done'), ('Failed', 'Failed')], default='Pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('personal_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='picture_job', to='myproject.personalinformation')),
+            ],
+            options={
+                'verbose_name': 'Profile Picture Job',
+                'verbose_name_plural': 'Profile Picture Jobs',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='myproject_p_status_6099a4_idx')],
+            },
+        ),
+    ]
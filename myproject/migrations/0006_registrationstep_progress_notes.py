@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myproject', '0005_profilepicturejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registrationstep',
+            name='progress_notes',
+            field=models.TextField(blank=True, null=True, verbose_name='Progress Notes'),
+        ),
+    ]
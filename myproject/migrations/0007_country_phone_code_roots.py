@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# Countries RestCountries lists with several idd suffixes under a shared root. The
+# sync used to store the root followed by every suffix ("+1201202..."); it now stores
+# the root alone, which is what these rows are rewritten to.
+MULTI_SUFFIX_ROOTS = {
+    "US": "+1", "CA": "+1", "DO": "+1", "PR": "+1",
+    "RU": "+7", "KZ": "+7",
+    "VA": "+3",
+    "EH": "+2",
+}
+
+# No calling code, even with an area code folded in (e.g. "+35818"), is longer than this
+MAX_CODE_DIGITS = 5
+
+
+def legacy_root(code, phone_code):
+    digits = phone_code.lstrip("+")
+    root = MULTI_SUFFIX_ROOTS.get(code)
+    if root and phone_code.startswith(root) and phone_code != root:
+        return root
+    if digits.isdigit() and len(digits) > MAX_CODE_DIGITS:
+        # Concatenated suffixes of a country not listed above; every shared root is one digit
+        return f"+{digits[0]}"
+    return None
+
+
+def rewrite_phone_codes(apps, schema_editor):
+    Country = apps.get_model("myproject", "Country")
+    changed = []
+    for country in Country.objects.exclude(phone_code__isnull=True).exclude(phone_code=""):
+        root = legacy_root(country.code, country.phone_code.strip())
+        if root:
+            country.phone_code = root
+            changed.append(country)
+    Country.objects.bulk_update(changed, ["phone_code"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myproject', '0006_registrationstep_progress_notes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rewrite_phone_codes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myproject', '0007_country_phone_code_roots'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='addressdetails',
+            name='phone_number',
+            field=models.CharField(max_length=20),
+        ),
+    ]
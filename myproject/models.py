@@ -7,7 +7,6 @@ from django.utils.translation import gettext_lazy as _  # Translation and intern
 
 # Validators and utilities
 from django.core.validators import RegexValidator  # Validate input formats (e.g., phone numbers, email)
-from django.core.mail import send_mail  # For sending emails
 from django.utils.http import urlsafe_base64_encode  # Encode data for email verification
 from django.utils.encoding import force_bytes  # Encoding helper for token generation
 from django.contrib.auth.tokens import default_token_generator  # Default token generator for email/password tokens
@@ -69,25 +68,57 @@ class AccountCreation(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
-    def send_verification_email(self):
+    def set_password(self, raw_password):
+        # Hashed on the shared hashing pool so that signups don't tie up the web worker's CPU
+        from myproject.views.password_hashing import hash_password
+        if raw_password is None:
+            return super().set_password(raw_password)
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """Verify on the hashing pool; re-encodes the hash if the hasher or its work factor changed."""
+        from myproject.views.password_hashing import needs_rehash, verify_password
+        if not verify_password(raw_password, self.password):
+            return False
+        if needs_rehash(self.password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+        return True
+
+    async def acheck_password(self, raw_password):
+        from myproject.views.password_hashing import ahash_password, averify_password, needs_rehash
+        if not await averify_password(raw_password, self.password):
+            return False
+        if needs_rehash(self.password):
+            self.password = await ahash_password(raw_password)
+            await self.asave(update_fields=["password"])
+        return True
+
+    def verification_email(self):
+        """Generate a verification token and return the email announcing it (as `enqueue_email` kwargs)."""
         uid = urlsafe_base64_encode(force_bytes(self.pk))
         token = default_token_generator.make_token(self)
         verification_link = f"{settings.FRONTEND_URL}/verify-email?uid={uid}&token={token}"
+        self.verification_token = token
 
-        send_mail(
-            subject="Verify Your Email Address",
-            message=(
+        return {
+            "subject": "Verify Your Email Address",
+            "message": (
                 f"Hi {self.first_name},\n\n"
                 f"Please verify your email by clicking the link below:\n{verification_link}\n\n"
                 "Thank you for signing up!"
             ),
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[self.email],
-            fail_silently=False,
-        )
+            "from_email": settings.DEFAULT_FROM_EMAIL,
+            "recipient_list": [self.email],
+        }
 
-        self.verification_token = token
-        self.save()
+    def send_verification_email(self):
+        # Queued in the outbox; the `send_outbox_emails` worker delivers it
+        from myproject.views.email_outbox import enqueue_email
+        enqueue_email(**self.verification_email())
+        self.save(update_fields=["verification_token"])
 
     def set_password_reset_token(self):
         from django.contrib.auth.tokens import default_token_generator
@@ -136,6 +167,91 @@ class City(models.Model):
         return f"{self.name}, {self.country.name}"
 
 
+# City Enrichment Job Model
+class CityEnrichmentJob(models.Model):
+    """
+    Durable request to look up missing details (coordinates) for a city,
+    processed off the request path by the `process_city_enrichment` command.
+    """
+    STATUS_CHOICES = [
+        ("Pending", "Pending"),
+        ("Done", "Done"),
+        ("Failed", "Failed"),
+    ]
+
+    city = models.OneToOneField(City, on_delete=models.CASCADE, related_name="enrichment_job")
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name="enrichment_jobs")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="Pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "City Enrichment Job"
+        verbose_name_plural = "City Enrichment Jobs"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.city.name} - {self.status}"
+
+
+# Country Sync State Model
+class CountrySyncState(models.Model):
+    """
+    Content hashes of the last upstream country record and city batch, used by the
+    incremental mode of `update_countries_and_cities` to skip unchanged data.
+    """
+    country = models.OneToOneField(Country, on_delete=models.CASCADE, related_name="sync_state")
+    record_hash = models.CharField(max_length=40, blank=True, null=True)
+    cities_hash = models.CharField(max_length=40, blank=True, null=True)
+    cities_synced_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Country Sync State"
+        verbose_name_plural = "Country Sync States"
+
+    def __str__(self):
+        return f"{self.country.name} - {self.cities_synced_at}"
+
+
+# Outbound Email Model
+class OutboundEmail(models.Model):
+    """
+    Email queued by a request handler (in the same transaction as the data it announces)
+    and delivered by the `send_outbox_emails` command.
+    """
+    STATUS_CHOICES = [
+        ("Pending", "Pending"),
+        ("Sent", "Sent"),
+        ("Failed", "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="Pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
 # Personal Information Model
 class PersonalInformation(models.Model):
     user = models.OneToOneField(
@@ -148,6 +264,8 @@ class PersonalInformation(models.Model):
     )
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     profile_picture = models.ImageField(upload_to="profile_pictures/", blank=True, null=True)
+    # Storage paths of the rendered picture sizes, by variant name; `profile_picture` is the large one
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
     nationality = models.ForeignKey(
         Country, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -167,6 +285,41 @@ class PersonalInformation(models.Model):
         return age >= 18
 
 
+# Profile Picture Job Model
+class ProfilePictureJob(models.Model):
+    """
+    Uploaded profile picture waiting in the staging directory to be rendered into its
+    variants by the `process_profile_pictures` command. A newer upload replaces the source.
+    """
+    STATUS_CHOICES = [
+        ("Pending", "Pending"),
+        ("Done", "Done"),
+        ("Failed", "Failed"),
+    ]
+
+    personal_info = models.OneToOneField(
+        PersonalInformation, on_delete=models.CASCADE, related_name="picture_job"
+    )
+    # File name inside PROFILE_PICTURE_STAGING_DIR
+    source = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="Pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Profile Picture Job"
+        verbose_name_plural = "Profile Picture Jobs"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.personal_info.user.email} - {self.status}"
+
+
 # Address Details Model
 class AddressDetails(models.Model):
     user = models.OneToOneField(
@@ -178,7 +331,7 @@ class AddressDetails(models.Model):
     country = models.ForeignKey(Country, on_delete=models.SET_NULL, null=True, related_name="addresses")
     state = models.CharField(max_length=100, blank=True, null=True)
     postal_code = models.CharField(max_length=12)
-    phone_number = models.CharField(max_length=15)
+    phone_number = models.CharField(max_length=20)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -391,10 +544,17 @@ class RegistrationStep(models.Model):
     progress_percentage = models.DecimalField(
         max_digits=5, decimal_places=2, default=0.0, verbose_name="Progress Percentage"
     )
+    progress_notes = models.TextField(
+        blank=True, null=True, verbose_name="Progress Notes"
+    )
 
-    def save(self, *args, **kwargs):
-        # Auto-update progress percentage based on current_step (assuming 8 steps)
+    def update_progress(self):
+        # Progress percentage based on current_step (assuming 8 steps)
         self.progress_percentage = round((self.current_step / 8) * 100, 2)
+
+    def save(self, *args, **kwargs):
+        # Auto-update progress percentage; bulk inserts call update_progress() themselves
+        self.update_progress()
         super().save(*args, **kwargs)
 
     def __str__(self):
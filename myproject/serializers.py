@@ -25,14 +25,20 @@ class AccountCreationSerializer(serializers.ModelSerializer):
 # Step 1: Personal Information Serializer
 class PersonalInformationSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=AccountCreation.objects.all())
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = PersonalInformation
         fields = [
-            'id', 'user', 'date_of_birth', 'gender',
-            'phone_number', 'profile_picture', 'is_verified'
+            'id', 'user', 'date_of_birth', 'gender', 'phone_number', 'nationality',
+            'profile_picture', 'profile_picture_variants'
         ]
-        read_only_fields = ['id', 'is_verified']
+        # Pictures are set by the `process_profile_pictures` worker once their variants exist
+        read_only_fields = ['id', 'profile_picture']
+
+    def get_profile_picture_variants(self, obj):
+        from myproject.views.profile_pictures import variant_urls
+        return variant_urls(obj.profile_picture_variants)
 
     def validate_date_of_birth(self, value):
         """
@@ -63,6 +69,7 @@ class AddressDetailsSerializer(serializers.ModelSerializer):
 # Step 3: Educational Background Serializer
 class EducationalBackgroundSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=AccountCreation.objects.all())
+    honors = serializers.CharField(source='certifications_honors', read_only=True, allow_null=True)
 
     class Meta:
         model = EducationalBackground
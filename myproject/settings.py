@@ -91,6 +91,26 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Password hashing: PBKDF2 work factor (0 keeps Django's default; existing hashes are
+# upgraded on login), hashing processes per web process (0 hashes inline), hashes allowed in
+# flight at once (queued or running, inline too), and seconds a signup or login waits for a
+# slot before a 503.
+# Workers and the queue are per web process: N web processes with W workers each start N*W
+# hashing processes, so keep N*W at or below the CPU cores left over for hashing (e.g. 8
+# cores and 4 web processes: 1, or 0 when the web processes already use every core).
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=0, cast=int)
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int)
+PASSWORD_HASHING_MAX_PENDING = config('PASSWORD_HASHING_MAX_PENDING', default=16, cast=int)
+PASSWORD_HASHING_QUEUE_TIMEOUT = config('PASSWORD_HASHING_QUEUE_TIMEOUT', default=2.0, cast=float)
+
+PASSWORD_HASHERS = [
+    'myproject.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -111,7 +131,7 @@ AUTH_USER_MODEL = 'myproject.AccountCreation'
 AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
 
 # Email Configuration
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"  # Use SMTP for production
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend")  # Use SMTP for production
 EMAIL_HOST = config("EMAIL_HOST", default="smtp.gmail.com")
 EMAIL_PORT = config("EMAIL_PORT", default=587, cast=int)
 EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=True, cast=bool)
@@ -120,6 +140,11 @@ EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="your-email@example.com")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="your-email-password")
 DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="no-reply@example.com")
 
+# Backend used by the `send_outbox_emails` worker (request handlers only queue emails);
+# "console" or "file" (written to EMAIL_FILE_PATH) are handy for local runs and tests
+EMAIL_OUTBOX_BACKEND = config("EMAIL_OUTBOX_BACKEND", default=EMAIL_BACKEND)
+EMAIL_FILE_PATH = config("EMAIL_FILE_PATH", default=str(BASE_DIR / "logs" / "emails"))
+
 # JWT Authentication Configuration
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -136,6 +161,87 @@ PAYPAL_CLIENT_ID = config('PAYPAL_CLIENT_ID')
 PAYPAL_SECRET = config('PAYPAL_SECRET')
 PAYPAL_API_BASE_URL = config('PAYPAL_API_BASE_URL')
 
+# Geo Data Sync Configuration (Nominatim's usage policy allows about 1 request per second)
+RESTCOUNTRIES_URL = config('RESTCOUNTRIES_URL', default='https://restcountries.com/v3.1/all')
+NOMINATIM_URL = config('NOMINATIM_URL', default='https://nominatim.openstreetmap.org/search')
+GEO_FETCH_WORKERS = config('GEO_FETCH_WORKERS', default=4, cast=int)
+GEO_FETCH_RATE = config('GEO_FETCH_RATE', default=1.0, cast=float)
+GEO_FETCH_BURST = config('GEO_FETCH_BURST', default=1, cast=int)
+GEO_FETCH_PER_HOST = config('GEO_FETCH_PER_HOST', default=2, cast=int)
+GEO_FETCH_MAX_RETRIES = config('GEO_FETCH_MAX_RETRIES', default=3, cast=int)
+GEO_FETCH_BACKOFF_MAX = config('GEO_FETCH_BACKOFF_MAX', default=60.0, cast=float)
+
+# Incremental sync re-fetches a country's cities at least this often, even if unchanged upstream
+GEO_SYNC_MAX_AGE_DAYS = config('GEO_SYNC_MAX_AGE_DAYS', default=30, cast=int)
+
+# On-disk cache for RestCountries/Nominatim responses (set GEO_HTTP_CACHE_DIR empty to disable);
+# entries stay fresh for GEO_HTTP_CACHE_TTL seconds unless the response says otherwise
+GEO_HTTP_CACHE_DIR = config('GEO_HTTP_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'http'))
+GEO_HTTP_CACHE_TTL = config('GEO_HTTP_CACHE_TTL', default=86400, cast=int)
+
+# Precompressed JSON snapshots of countries, per-country cities and courses
+SNAPSHOT_ROOT = config('SNAPSHOT_ROOT', default=str(BASE_DIR / 'snapshots'))
+# Seconds a changed snapshot keeps being served while `publish_snapshots --watch` renders
+# the new one (past this, reads use the live path), and versions kept per snapshot for
+# clients still holding an older versioned URL
+SNAPSHOT_MAX_STALE_SECONDS = config('SNAPSHOT_MAX_STALE_SECONDS', default=300, cast=int)
+SNAPSHOT_KEEP_VERSIONS = config('SNAPSHOT_KEEP_VERSIONS', default=5, cast=int)
+
+# Seconds a resolved user (by email) is shared across workers; 0 disables the shared copy
+USER_CONTEXT_CACHE_TTL = config('USER_CONTEXT_CACHE_TTL', default=30, cast=int)
+
+# Seconds an assembled registration review summary is cached (dropped on any change)
+REVIEW_SUMMARY_CACHE_TTL = config('REVIEW_SUMMARY_CACHE_TTL', default=300, cast=int)
+
+# Largest number of students accepted by one batch registration request
+REGISTRATION_BATCH_MAX_STUDENTS = config('REGISTRATION_BATCH_MAX_STUDENTS', default=50, cast=int)
+
+# Lazy city population in get_cities: how long to remember that upstream had no
+# cities for a country (or failed), and how long one fill may hold its lock
+CITY_EMPTY_CACHE_TTL = config('CITY_EMPTY_CACHE_TTL', default=86400, cast=int)
+CITY_ERROR_CACHE_TTL = config('CITY_ERROR_CACHE_TTL', default=60, cast=int)
+CITY_FILL_LOCK_TIMEOUT = config('CITY_FILL_LOCK_TIMEOUT', default=120, cast=int)
+
+# Cache Configuration (use a shared backend such as Redis in production so that
+# reference data invalidation reaches every worker)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='myproject-default'),
+    }
+}
+
+# Seconds between checks of the shared reference data version stamp
+REFERENCE_CACHE_CHECK_INTERVAL = config('REFERENCE_CACHE_CHECK_INTERVAL', default=5.0, cast=float)
+
+# Bloom filter in front of the email availability check: target false-positive rate, and
+# whether workers share one prebuilt filter through the cache instead of each scanning users
+EMAIL_FILTER_ERROR_RATE = config('EMAIL_FILTER_ERROR_RATE', default=0.001, cast=float)
+EMAIL_FILTER_SHARED = config('EMAIL_FILTER_SHARED', default=False, cast=bool)
+
+# Profile picture uploads: staged here (shared by the web and `process_profile_pictures`
+# workers) until their variants are rendered; size and pixel limits checked from the header
+PROFILE_PICTURE_STAGING_DIR = config('PROFILE_PICTURE_STAGING_DIR', default=str(BASE_DIR / 'uploads'))
+PROFILE_PICTURE_MAX_BYTES = config('PROFILE_PICTURE_MAX_BYTES', default=10 * 1024 * 1024, cast=int)
+PROFILE_PICTURE_MAX_PIXELS = config('PROFILE_PICTURE_MAX_PIXELS', default=40_000_000, cast=int)
+# Processes rendering picture variants (0: one per CPU)
+PROFILE_PICTURE_WORKERS = config('PROFILE_PICTURE_WORKERS', default=0, cast=int)
+
+# Serve the registration endpoints from the native async views (run under ASGI, e.g. uvicorn)
+ASYNC_REGISTRATION_VIEWS = config('ASYNC_REGISTRATION_VIEWS', default=False, cast=bool)
+
+# Idempotency-Key replays for registration and payment POSTs: seconds a completed response
+# (or a running request's claim on its key) is kept, and seconds a duplicate waits for the
+# running request before a 409. Duplicates sent to different workers are only caught with
+# a shared CACHE_BACKEND
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=86400, cast=int)
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=60, cast=int)
+# Larger request bodies skip the replay layer unread (the views refuse them by size);
+# keep it at least the largest accepted upload plus its form fields
+IDEMPOTENCY_MAX_BODY_BYTES = config(
+    'IDEMPOTENCY_MAX_BODY_BYTES', default=PROFILE_PICTURE_MAX_BYTES + 64 * 1024, cast=int
+)
+
 # Default Primary Key Field Type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
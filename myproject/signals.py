@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from myproject.models import (
+    AccountCreation, PersonalInformation, AddressDetails, EducationalBackground, CourseSelection,
+    Payment, RegistrationStep, RegistrationStatus, Country, City, Course
+)
+from myproject.views import snapshots
+from myproject.views.city_index import city_indexes
+from myproject.views.email_filter import email_filter
+from myproject.views.reference_data import bump_reference_version
+from myproject.views.spatial_index import spatial_index
+from myproject.views.review_summary import invalidate_review_summary
+from myproject.views.user_context import invalidate_user
+
+
+# Country list / phone code cache invalidation
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+def country_changed(sender, instance, **kwargs):
+    bump_reference_version()
+    snapshots.invalidate("countries")
+
+
+# City autocomplete and nearest-city index maintenance
+@receiver(post_save, sender=City)
+def city_saved(sender, instance, created, **kwargs):
+    if created:
+        city_indexes.city_added(instance)
+    else:
+        city_indexes.invalidate([instance.country_id])
+    spatial_index.invalidate()
+    snapshots.invalidate(f"cities/{instance.country_id}")
+
+
+@receiver(post_delete, sender=City)
+def city_deleted(sender, instance, **kwargs):
+    city_indexes.invalidate([instance.country_id])
+    spatial_index.invalidate()
+    snapshots.invalidate(f"cities/{instance.country_id}")
+
+
+# Course catalog snapshot invalidation
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    snapshots.invalidate("courses")
+
+
+# Shared user context invalidation
+@receiver(post_save, sender=AccountCreation)
+@receiver(post_delete, sender=AccountCreation)
+def account_changed(sender, instance, **kwargs):
+    # After commit: a read in between would cache the old row again
+    transaction.on_commit(lambda user_id=instance.id, email=instance.email: invalidate_user(user_id, email))
+    invalidate_review_summary(instance.id)
+
+
+# Registered email filter maintenance (deleted emails are left in; they only cost a query)
+@receiver(post_init, sender=AccountCreation)
+def account_loaded(sender, instance, **kwargs):
+    # Read from __dict__ so that a deferred email is not fetched
+    instance._logged_email = instance.__dict__.get("email")
+
+
+@receiver(post_save, sender=AccountCreation)
+def account_saved(sender, instance, created, **kwargs):
+    # Only new accounts and changed emails; every other save would just repeat a log entry
+    email = instance.__dict__.get("email")
+    if created or (email is not None and email != instance._logged_email):
+        email_filter.add(email)
+        instance._logged_email = email
+
+
+@receiver(post_save, sender=PersonalInformation)
+@receiver(post_delete, sender=PersonalInformation)
+@receiver(post_save, sender=AddressDetails)
+@receiver(post_delete, sender=AddressDetails)
+@receiver(post_save, sender=RegistrationStep)
+@receiver(post_delete, sender=RegistrationStep)
+@receiver(post_save, sender=RegistrationStatus)
+@receiver(post_delete, sender=RegistrationStatus)
+def user_relation_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda user_id=instance.user_id: invalidate_user(user_id))
+
+
+# Review summary invalidation
+@receiver(post_save, sender=PersonalInformation)
+@receiver(post_delete, sender=PersonalInformation)
+@receiver(post_save, sender=AddressDetails)
+@receiver(post_delete, sender=AddressDetails)
+@receiver(post_save, sender=EducationalBackground)
+@receiver(post_delete, sender=EducationalBackground)
+@receiver(post_save, sender=CourseSelection)
+@receiver(post_delete, sender=CourseSelection)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def review_data_changed(sender, instance, **kwargs):
+    invalidate_review_summary(instance.user_id)
+
+
+@receiver(m2m_changed, sender=CourseSelection.courses.through)
+def selected_courses_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, CourseSelection):
+        invalidate_review_summary(instance.user_id)
@@ -1,3 +1,283 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from myproject.models import (
+    AccountCreation, PersonalInformation, AddressDetails, EducationalBackground, Course, CourseSelection, Payment,
+    Country, City
+)
+from myproject.views.idempotency import idempotent
+from myproject.views.location_helpers import ConcurrentFetcher, RequestsTransport, TokenBucket
+from myproject.views.password_hashing import PasswordHashingBusy, PasswordHashingExecutor
 
-# Create your tests here.
+
+class ReviewSummaryQueryBudgetTests(TestCase):
+    url = "/api/register/student/review-summary/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = AccountCreation.objects.create_user(
+            email="review@example.com", password="Passw0rd!", first_name="Ada", last_name="Lovelace"
+        )
+        PersonalInformation.objects.create(user=self.user, date_of_birth=date(1990, 1, 1), gender="Female")
+        EducationalBackground.objects.create(user=self.user, degree="Master's", institution="X", graduation_year=2012)
+        self.courses = [
+            Course.objects.create(name=f"Course {i}", description="-", fee=100, duration="3 Months") for i in range(3)
+        ]
+        # CourseSelection.save() reads its courses, which needs a primary key first
+        CourseSelection.objects.bulk_create([CourseSelection(user=self.user, study_duration=6, total_fee=200)])
+        self.selection = CourseSelection.objects.get(user=self.user)
+        self.selection.courses.set(self.courses[:2])
+        Payment.objects.create(user=self.user, payment_method="PayPal", amount=200, transaction_id="T-1")
+
+    def fetch(self):
+        response = self.client.get(self.url, {"email": "review@example.com"})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def test_cold_fetch_is_at_most_two_queries(self):
+        with self.assertNumQueries(2):
+            data = self.fetch()
+        self.assertEqual(data["personal_information"]["gender"], "Female")
+        self.assertEqual(data["educational_background"]["degree"], "Master's")
+        self.assertEqual(sorted(data["selected_courses"][0]["courses"]), sorted(c.id for c in self.courses[:2]))
+        self.assertEqual(data["payment_confirmation"]["amount"], "200.00")
+        self.assertEqual(data["address_details"], {})
+
+    def test_warm_fetch_is_served_from_cache(self):
+        self.fetch()
+        with self.assertNumQueries(0):
+            self.fetch()
+
+    def test_changes_invalidate_the_cached_summary(self):
+        self.fetch()
+        self.selection.courses.add(self.courses[2])
+        self.assertEqual(len(self.fetch()["selected_courses"][0]["courses"]), 3)
+
+        personal_info = PersonalInformation.objects.get(user=self.user)
+        personal_info.gender = "Other"
+        personal_info.save()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.fetch()["personal_information"]["gender"], "Other")
+
+    def test_unknown_email_is_not_found(self):
+        response = self.client.get(self.url, {"email": "nobody@example.com"})
+        self.assertEqual(response.status_code, 404)
+
+
+class BatchRegistrationCaseTests(TestCase):
+    url = "/api/register/student/batch/"
+
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(name="France", code="FR", phone_code="+33")
+        self.paris = City.objects.create(name="Paris", country=self.country)
+
+    def student(self, email, city="Paris"):
+        return {
+            "account": {"email": email, "password": "Passw0rd!", "first_name": "Ada", "last_name": "Lovelace"},
+            "address_details": {
+                "streetAddress": "1 Rue de Rivoli", "city": city, "country": self.country.id,
+                "postalCode": "75001", "phoneNumber": "+33612345678",
+            },
+        }
+
+    def register(self, *students):
+        return self.client.post(self.url, {"students": list(students)}, content_type="application/json")
+
+    def test_case_variant_city_uses_the_existing_city(self):
+        response = self.register(self.student("a@example.com", "paris"), self.student("b@example.com", "PARIS"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(City.objects.filter(country=self.country).count(), 1)
+        self.assertEqual(set(AddressDetails.objects.values_list("city_id", flat=True)), {self.paris.id})
+
+    def test_case_variant_new_city_is_created_once(self):
+        response = self.register(self.student("a@example.com", "Lyon"), self.student("b@example.com", "lyon"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(City.objects.filter(country=self.country, name__iexact="lyon").count(), 1)
+        self.assertEqual(AddressDetails.objects.values("city_id").distinct().count(), 1)
+
+    def test_case_variant_of_a_registered_email_is_rejected(self):
+        AccountCreation.objects.create_user(email="ada@example.com", password="Passw0rd!", first_name="A", last_name="L")
+        response = self.register(self.student("Ada@example.com"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("account", response.json()["errors"][0])
+
+    def test_case_variant_emails_in_one_batch_are_rejected(self):
+        response = self.register(self.student("bob@example.com"), self.student("BOB@example.com"))
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("account", errors[1])
+        self.assertFalse(AccountCreation.objects.exists())
+
+
+@override_settings(IDEMPOTENCY_LOCK_TIMEOUT=5)
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.status = 201
+        self.started, self.release = threading.Event(), threading.Event()
+        self.release.set()
+        self.view = idempotent(self.charge)
+
+    def charge(self, request):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return JsonResponse({"charge": self.calls}, status=self.status)
+
+    def post(self, body=None, key="key-1"):
+        request = RequestFactory().post(
+            "/api/payment/", json.dumps(body or {"user": 1, "amount": "10.00"}),
+            content_type="application/json", HTTP_IDEMPOTENCY_KEY=key,
+        )
+        return self.view(request)
+
+    def test_retry_is_replayed_without_running_the_view(self):
+        first, retry = self.post(), self.post()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((retry.status_code, retry.content), (first.status_code, first.content))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_reused_for_a_different_request_is_refused(self):
+        self.post()
+        response = self.post({"user": 1, "amount": "99.00"})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    def test_same_key_from_another_client_is_independent(self):
+        self.post()
+        response = self.post({"user": 2, "amount": "10.00"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.calls, 2)
+
+    def test_server_error_releases_the_key(self):
+        self.status = 502
+        self.assertEqual(self.post().status_code, 502)
+        self.status = 201
+        response = self.post()
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(self.calls, 2)
+
+    def run_concurrently(self):
+        self.release.clear()
+        responses = {}
+        first = threading.Thread(target=lambda: responses.setdefault("first", self.post()))
+        first.start()
+        self.started.wait(5)
+        duplicate = threading.Thread(target=lambda: responses.setdefault("duplicate", self.post()))
+        duplicate.start()
+        return first, duplicate, responses
+
+    def test_concurrent_duplicate_waits_for_the_first_response(self):
+        first, duplicate, responses = self.run_concurrently()
+        self.release.set()
+        first.join()
+        duplicate.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(responses["duplicate"].content, responses["first"].content)
+        self.assertEqual(responses["duplicate"]["Idempotent-Replayed"], "true")
+
+    @override_settings(IDEMPOTENCY_LOCK_TIMEOUT=0)
+    def test_view_outliving_the_wait_deadline_is_not_run_twice(self):
+        first, duplicate, responses = self.run_concurrently()
+        duplicate.join()
+        self.assertEqual(responses["duplicate"].status_code, 409)
+        self.release.set()
+        first.join()
+        self.assertEqual(self.post()["Idempotent-Replayed"], "true")
+        self.assertEqual(self.calls, 1)
+
+
+class FakeGeoServer(BaseHTTPRequestHandler):
+    """
+    Answers each GET with the next `(status, headers, body)` of the server's script,
+    repeating the last one.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            status, headers, body = server.script[min(server.requests, len(server.script)) - 1]
+        self.send_response(status)
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class ConcurrentFetcherFakeServerTests(SimpleTestCase):
+    def serve(self, *script):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGeoServer)
+        server.script, server.requests, server.lock = script, 0, threading.Lock()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, f"http://127.0.0.1:{server.server_port}/search"
+
+    def fetcher(self, **kwargs):
+        options = {"rate": 1000, "burst": 10, "backoff_base": 0.01, "backoff_max": 0.05, **kwargs}
+        return ConcurrentFetcher(transport=RequestsTransport(), **options)
+
+    def test_retries_rate_limits_and_server_errors(self):
+        server, url = self.serve(
+            (429, {"Retry-After": "0"}, {}), (503, {}, {}), (200, {}, [{"name": "Paris"}]),
+        )
+        self.assertEqual(self.fetcher(max_retries=3).fetch_json(url), [{"name": "Paris"}])
+        self.assertEqual(server.requests, 3)
+
+    def test_gives_up_without_sleeping_after_the_last_server_error(self):
+        server, url = self.serve((503, {}, {}))
+        with mock.patch("myproject.views.location_helpers.time.sleep") as sleep:
+            self.assertIsNone(self.fetcher(max_retries=2).fetch_json(url))
+        self.assertEqual(server.requests, 2)
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_map_runs_jobs_against_the_server(self):
+        server, url = self.serve((200, {}, [{"name": "Lyon"}]))
+        results = dict(self.fetcher(max_workers=3).map([(key, url, {"q": key}) for key in "abc"]))
+        self.assertEqual(results, {key: [{"name": "Lyon"}] for key in "abc"})
+        self.assertEqual(server.requests, 3)
+
+    def test_simultaneous_rate_limits_pause_once(self):
+        bucket = TokenBucket(rate=1000, capacity=10)
+        for _ in range(5):
+            bucket.pause(0.2)
+        started = time.monotonic()
+        bucket.acquire()
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+
+class InlinePasswordHashingTests(SimpleTestCase):
+    def test_inline_hashing_sheds_load_past_the_cap(self):
+        executor = PasswordHashingExecutor(workers=0, max_pending=1, queue_timeout=0.05)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_hash(password):
+            started.set()
+            release.wait(5)
+            return password[::-1]
+
+        holder = threading.Thread(target=executor.run, args=(slow_hash, "held"))
+        holder.start()
+        started.wait(5)
+        with self.assertRaises(PasswordHashingBusy):
+            executor.run(str.upper, "waiting")
+        release.set()
+        holder.join()
+        self.assertEqual(executor.rejected, 1)
+        self.assertEqual(executor.map(str.upper, ["a", "b"]), ["A", "B"])
@@ -10,14 +10,23 @@ from myproject.views.error_views import custom_404_view, custom_500_view
 
 # Student Registration Views
 from myproject.views.student_views import (
-    AccountCreationView, check_email_availability,
+    AccountCreationView, BatchRegistrationView, check_email_availability,
     PersonalInformationView, AddressDetailsView,
     EducationalBackgroundView, CourseSelectionView,
     ReviewSummaryView, ConfirmationView, FinalSubmissionView,
     GetCoursesView, GetRegistrationProgressView,
-    GetRegistrationStatusView, UpdateProgressNotesView,
+    GetRegistrationStatusView, UpdateProgressNotesView, verify_email,
 )
 
+# Native async registration views replace the DRF ones when serving over ASGI
+if settings.ASYNC_REGISTRATION_VIEWS:
+    from myproject.views.async_student_views import (
+        AccountCreationView, check_email_availability,
+        PersonalInformationView, AddressDetailsView,
+        EducationalBackgroundView, CourseSelectionView,
+        GetRegistrationProgressView,
+    )
+
 # Admin Views
 from myproject.views.admin_views import (
     admin_stats, user_growth, revenue_data, admin_notifications,
@@ -25,10 +34,14 @@ from myproject.views.admin_views import (
     deactivate_course, activate_course,
 )
 
+# Retried POSTs with an Idempotency-Key are answered from the first response
+from myproject.views.idempotency import idempotent
+
 # Payment and Utility Views
 from myproject.views.payment_views import ProcessPaymentView
 from myproject.views.utility_views import (
-    get_countries, get_cities, get_phone_code,
+    get_countries, get_cities, get_phone_code, search_cities, lookup_phone_number,
+    get_nearest_cities, get_snapshot,
 )
 
 # URL Patterns
@@ -52,14 +65,16 @@ urlpatterns = [
     path('api/login/', login_user, name='login_user'),
 
     # Student Registration Workflow
+    path('api/register/student/batch/', BatchRegistrationView.as_view(), name='student_batch_registration'),
     path('api/register/student/account-creation/', AccountCreationView.as_view(), name='student_account_creation'),
-    path('api/register/student/personal-information/', PersonalInformationView.as_view(), name='student_personal_information'),
+    path('api/register/student/personal-information/', idempotent(PersonalInformationView.as_view()), name='student_personal_information'),
     path('api/register/student/address-details/', AddressDetailsView.as_view(), name='student_address_details'),
     path('api/register/student/education-background/', EducationalBackgroundView.as_view(), name='student_education_background'),
-    path('api/register/student/course-selection/', CourseSelectionView.as_view(), name='student_course_selection'),
+    path('api/register/student/course-selection/', idempotent(CourseSelectionView.as_view()), name='student_course_selection'),
     path('api/register/student/review-summary/', ReviewSummaryView.as_view(), name='student_review_summary'),
     path('api/register/student/confirmation/', ConfirmationView.as_view(), name='student_confirmation'),
     path('api/register/student/final-submit/', FinalSubmissionView.as_view(), name='final_submission'),
+    path('api/verify-email/', verify_email, name='verify_email'),
 
     # Courses
     path('api/courses/', GetCoursesView.as_view(), name='get_courses'),
@@ -70,12 +85,19 @@ urlpatterns = [
     path('api/user/<int:user_id>/update-progress-notes/', UpdateProgressNotesView.as_view(), name='update_progress_notes'),
 
     # Payments
-    path('api/register/student/payment/', ProcessPaymentView.as_view(), name='student_payment'),
+    path('api/register/student/payment/', idempotent(ProcessPaymentView.as_view()), name='student_payment'),
 
     # Utilities
     path('api/countries/', get_countries, name='get_countries'),
     path('api/countries/<int:country_id>/cities/', get_cities, name='get_cities'),
+    path('api/countries/<int:country_id>/cities/search/', search_cities, name='search_cities'),
     path('api/countries/<int:country_id>/phone-code/', get_phone_code, name='get_phone_code'),
+    path('api/phone/lookup/', lookup_phone_number, name='lookup_phone_number'),
+    path('api/cities/nearest/', get_nearest_cities, name='get_nearest_cities'),
+    re_path(
+        r'^api/snapshots/(?P<name>countries|courses|cities/\d+)\.(?P<version>[0-9a-f]{16})\.json$',
+        get_snapshot, name='get_snapshot',
+    ),
 
     # Email Check
     path('api/check-email/', check_email_availability, name='check_email'),
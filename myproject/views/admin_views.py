@@ -20,6 +20,7 @@ from ..models import (
     RegistrationStep,
     RegistrationStatus,
 )
+from .password_hashing import PasswordHashingBusy
 
 # Initialize Logger
 logger = logging.getLogger(__name__)
@@ -242,8 +243,9 @@ def login_user(request):
             if not email or not password:
                 return JsonResponse({"error": "Email and password are required."}, status=400)
 
+            # Verified on the shared hashing pool (see AccountCreation.check_password)
             user = authenticate(username=email, password=password)
-            if user and user.user_type == "Admin":
+            if user and user.is_staff:
                 refresh = RefreshToken.for_user(user)
                 login(request, user)
                 return JsonResponse({
@@ -257,6 +259,10 @@ def login_user(request):
                     }
                 }, status=200)
             return JsonResponse({"error": "Invalid credentials or access denied."}, status=401)
+        except PasswordHashingBusy as e:
+            response = JsonResponse({"error": str(e)}, status=503)
+            response["Retry-After"] = "1"
+            return response
         except Exception as e:
             logger.error(f"Error during admin login: {e}")
             return JsonResponse({"error": str(e)}, status=500)
@@ -0,0 +1,530 @@
+"""
+Native async implementations of the hot registration endpoints, served instead of the
+DRF views in `student_views` when ASYNC_REGISTRATION_VIEWS is on (under ASGI, e.g.
+uvicorn). Reads and writes go through Django's async ORM and async cache API; work
+that must stay synchronous (password hashing, transactions, serializer validation,
+file staging) runs in a thread via `sync_to_async`. Mail and outbound HTTP never happen
+here: emails go through the outbox and city lookups through the enrichment queue.
+Responses match the DRF views', field for field.
+"""
+
+# Django Imports
+from django.conf import settings
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.decorators import method_decorator
+from django.http import JsonResponse
+from django.utils.timezone import now
+from django.core.validators import validate_email
+from django.core.exceptions import ValidationError
+
+# Logging
+import logging
+
+# Utilities
+import json
+from datetime import datetime
+from asgiref.sync import sync_to_async
+
+# Third-Party Imports
+from rest_framework.utils.encoders import JSONEncoder
+
+# Project Models
+from myproject.models import (
+    AccountCreation, EducationalBackground, CourseSelection, AddressDetails,
+    RegistrationStep, Country, City, Course
+)
+
+# Project Serializers
+from myproject.serializers import (
+    PersonalInformationSerializer, EducationalBackgroundSerializer, CourseSerializer
+)
+
+# Registration Views and Utilities
+from myproject.views.student_views import create_student_account, save_personal_information
+from myproject.views.registration_batch import bundle_discount, validate_password_strength
+from myproject.views.enrichment_utils import enqueue_city_enrichment
+from myproject.views.email_filter import aemail_available
+from myproject.views.password_hashing import PasswordHashingBusy
+from myproject.views.phone_prefix import validate_phone_number
+from myproject.views.reference_data import reference_data
+from myproject.views.profile_pictures import MAX_FORM_OVERHEAD, stage_upload
+from myproject.views.user_context import aresolve_user, related_object
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+
+def _response(data, status):
+    # DRF's encoder, so that decimals and dates render as they do in the DRF views
+    return JsonResponse(data, status=status, encoder=JSONEncoder)
+
+
+def _request_data(request):
+    """
+    Request payload as DRF's `request.data` would parse it: JSON or form fields.
+    """
+    if request.content_type == "application/json":
+        return json.loads(request.body or b"{}")
+    return request.POST
+
+
+# Check Email Availability
+async def check_email_availability(request):
+    """
+    Check if an email is already registered.
+    """
+    try:
+        email = request.GET.get('email', '').strip()
+        if not email:
+            return JsonResponse({"available": False, "error": "Email parameter is missing."}, status=400)
+
+        # Bloom filter first; only emails it cannot rule out reach the database
+        is_available = await aemail_available(email)
+        return JsonResponse({"available": is_available}, status=200)
+
+    except Exception as e:
+        logger.error(f"Error checking email availability: {e}")
+        return JsonResponse(
+            {"available": False, "error": "An unexpected error occurred."}, status=500
+        )
+
+
+# Step 1: Account Creation
+@method_decorator(csrf_exempt, name='dispatch')
+class AccountCreationView(View):
+    """
+    Handles user account creation and triggers email verification.
+    """
+
+    async def post(self, request):
+        try:
+            data = _request_data(request)
+            email = data.get("email", "").strip()
+            first_name = data.get("first_name", "").strip()
+            last_name = data.get("last_name", "").strip()
+            password = data.get("password", "").strip()
+
+            # Validate required fields
+            if not email or not password or not first_name or not last_name:
+                return _response(
+                    {"error": "Email, password, first name, and last name are required."}, 400
+                )
+
+            # Validate email format
+            try:
+                validate_email(email)
+            except ValidationError:
+                return _response({"error": "Invalid email format."}, 400)
+
+            # Check if email already exists
+            if await AccountCreation.objects.filter(email=email).aexists():
+                return _response({"error": "An account with this email already exists."}, 400)
+
+            # Validate password strength
+            if not validate_password_strength(password):
+                return _response(
+                    {"error": (
+                        "Password must be at least 8 characters long, "
+                        "contain one uppercase letter, one lowercase letter, "
+                        "one number, and one special character."
+                    )},
+                    400
+                )
+
+            # Hashing and the account transaction run in a thread, off the event loop
+            await sync_to_async(create_student_account)(email, password, first_name, last_name)
+
+            return _response({"message": "Account created successfully. Verification email sent."}, 201)
+
+        except PasswordHashingBusy as e:
+            response = _response({"error": str(e)}, 503)
+            response["Retry-After"] = "1"
+            return response
+        except Exception as e:
+            logger.error(f"Error during account creation: {e}")
+            return _response({"error": "An unexpected error occurred while creating the account."}, 500)
+
+
+# Step 2: Personal Information
+@method_decorator(csrf_exempt, name='dispatch')
+class PersonalInformationView(View):
+
+    async def post(self, request):
+        try:
+            # Refuse an oversized upload from its declared length, before the body is read
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+            if content_length > settings.PROFILE_PICTURE_MAX_BYTES + MAX_FORM_OVERHEAD:
+                logger.error(f"Personal information request too large: {content_length} bytes")
+                return _response({"error": "Profile picture is too large."}, 413)
+
+            # Extract data from the request
+            data = _request_data(request)
+            email = data.get("email")
+            date_of_birth = data.get("date_of_birth")
+            gender = data.get("gender")
+            nationality_name = data.get("nationality")
+            phone_number = data.get("phone_number", "").strip()
+            profile_picture = request.FILES.get("profile_picture")
+
+            # Validate user existence
+            try:
+                user = await aresolve_user(request, email)
+            except AccountCreation.DoesNotExist:
+                logger.error(f"User with email {email} not found.")
+                return _response({"error": "User not found. Complete account creation first."}, 404)
+
+            # Validate nationality
+            try:
+                nationality = await Country.objects.aget(name__iexact=nationality_name)
+            except Country.DoesNotExist:
+                logger.error(f"Invalid nationality name: {nationality_name}")
+                return _response({"error": "Invalid nationality name."}, 400)
+
+            # Validate phone number format and country calling code
+            try:
+                phone_trie = await sync_to_async(reference_data.phone_trie)()
+                phone_number, _, _ = validate_phone_number(phone_number, phone_trie)
+            except ValidationError as e:
+                logger.error(f"Invalid phone number: {phone_number}")
+                return _response({"error": e.messages[0]}, 400)
+
+            # Validate date of birth (user must be 18+)
+            try:
+                dob = datetime.strptime(date_of_birth, "%Y-%m-%d").date()
+                age = (datetime.now().date() - dob).days // 365
+                if age < 18:
+                    logger.error(f"User is underage: {age} years old.")
+                    return _response({"error": "User must be at least 18 years old."}, 400)
+            except ValueError:
+                logger.error(f"Invalid date of birth format: {date_of_birth}")
+                return _response({"error": "Invalid date of birth format. Use 'YYYY-MM-DD'."}, 400)
+
+            # Stage the picture (checked from its header only); variants are rendered off-request
+            staged_picture = None
+            if profile_picture:
+                try:
+                    staged_picture = await sync_to_async(stage_upload, thread_sensitive=False)(profile_picture)
+                except ValidationError as e:
+                    logger.error(f"Invalid profile picture for {email}: {e.messages[0]}")
+                    return _response({"error": e.messages[0]}, 400)
+
+            errors = await sync_to_async(save_personal_information)(user, {
+                "user": user.id,
+                "date_of_birth": date_of_birth,
+                "gender": gender,
+                "phone_number": phone_number,
+                "nationality": nationality.id,
+            }, staged_picture)
+            if errors:
+                return _response({"error": errors}, 400)
+
+            return _response(
+                {
+                    "message": "Personal information saved successfully.",
+                    "profile_picture_status": "Pending" if staged_picture else None,
+                },
+                201,
+            )
+
+        except Exception as e:
+            logger.exception(f"Unexpected error in PersonalInformationView: {e}")
+            return _response({"error": "An unexpected error occurred. Please contact support."}, 500)
+
+    async def get(self, request):
+        """
+        Retrieve existing personal information for the user (if available).
+        """
+        try:
+            email = request.GET.get("email")
+            if not email:
+                logger.error("Email parameter is missing in the request.")
+                return _response({"error": "Email is required to fetch personal information."}, 400)
+
+            # Validate user existence
+            try:
+                user = await aresolve_user(request, email, related=True)
+            except AccountCreation.DoesNotExist:
+                logger.error(f"User with email {email} not found.")
+                return _response({"error": "User not found."}, 404)
+
+            # Fetched together with the user; reading it needs no query
+            personal_info = related_object(user, "personal_info")
+            if not personal_info:
+                logger.info(f"No personal information found for user: {email}")
+                return _response({"message": "No personal information found."}, 404)
+
+            return _response(PersonalInformationSerializer(personal_info).data, 200)
+
+        except Exception as e:
+            logger.exception(f"Unexpected error fetching personal information: {e}")
+            return _response({"error": "An unexpected error occurred. Please contact support."}, 500)
+
+
+# Step 3: Address Details Step
+@method_decorator(csrf_exempt, name='dispatch')
+class AddressDetailsView(View):
+
+    async def post(self, request):
+        try:
+            data = _request_data(request)
+            email = data.get("email")
+            street_address = data.get("streetAddress", "").strip()
+            country_id = data.get("country")
+            city_name = data.get("city")
+            state = data.get("state", "").strip()
+            postal_code = data.get("postalCode", "").strip()
+            phone_number = data.get("phoneNumber", "").strip()
+
+            # Validate user existence
+            try:
+                user = await aresolve_user(request, email)
+            except AccountCreation.DoesNotExist:
+                return _response({"error": "User not found. Complete account creation first."}, 404)
+
+            # Validate country
+            try:
+                country = await Country.objects.aget(id=country_id)
+            except Country.DoesNotExist:
+                return _response({"error": "Invalid country ID."}, 400)
+
+            # Validate city or create it
+            city, created = await City.objects.aget_or_create(name=city_name.strip(), country=country)
+
+            # If city is newly created, queue a background lookup of its details (e.g., latitude/longitude)
+            if created:
+                logger.info(f"New city created: {city_name} in {country.name}")
+                await sync_to_async(enqueue_city_enrichment)(city)
+
+            # Validate postal code format
+            if not postal_code.isdigit() or len(postal_code) < 4 or len(postal_code) > 10:
+                return _response({"error": "Invalid postal code format."}, 400)
+
+            # Validate phone number format and country calling code
+            try:
+                phone_trie = await sync_to_async(reference_data.phone_trie)()
+                phone_number, _, _ = validate_phone_number(phone_number, phone_trie)
+            except ValidationError as e:
+                return _response({"error": e.messages[0]}, 400)
+
+            # Update or create address details
+            await AddressDetails.objects.aupdate_or_create(
+                user=user,
+                defaults={
+                    "street_address": street_address,
+                    "city": city,
+                    "country": country,
+                    "state": state,
+                    "postal_code": postal_code,
+                    "phone_number": phone_number,
+                },
+            )
+
+            # Update registration step to Step 3
+            await RegistrationStep.objects.aupdate_or_create(
+                user=user, defaults={"current_step": 3, "last_visited": now()}
+            )
+
+            logger.info(f"Address details saved for user: {user.email}")
+            return _response({"message": "Address details saved successfully."}, 201)
+
+        except Exception as e:
+            logger.error(f"Error in AddressDetailsView: {e}")
+            return _response({"error": "An unexpected error occurred while saving address details."}, 500)
+
+
+# Step 4: Educational Background
+@method_decorator(csrf_exempt, name='dispatch')
+class EducationalBackgroundView(View):
+    """
+    Collect and manage user's educational background details.
+    """
+
+    async def post(self, request):
+        try:
+            data = _request_data(request)
+            email = data.get("email")
+            degree = data.get("degree", "").strip()
+            institution = data.get("institution", "").strip()
+            field_of_study = data.get("field_of_study", "").strip()
+            graduation_year = data.get("graduation_year")
+            honors = data.get("honors", "").strip()
+
+            # Validate user existence
+            try:
+                user = await aresolve_user(request, email)
+            except AccountCreation.DoesNotExist:
+                return _response({"error": "User not found. Complete account creation first."}, 404)
+
+            # Validate required fields
+            if not degree or not institution or not graduation_year:
+                return _response({"error": "Degree, Institution, and Graduation Year are required."}, 400)
+
+            # Validate graduation year
+            if not graduation_year.isdigit() or int(graduation_year) < 1900 or int(graduation_year) > now().year:
+                return _response(
+                    {"error": "Graduation year must be a valid year between 1900 and the current year."}, 400
+                )
+
+            # Update or create educational background details
+            await EducationalBackground.objects.aupdate_or_create(
+                user=user,
+                defaults={
+                    "degree": degree,
+                    "institution": institution,
+                    "field_of_study": field_of_study,
+                    "graduation_year": graduation_year,
+                    "certifications_honors": honors or None,
+                },
+            )
+
+            # Update registration step to Step 4
+            await RegistrationStep.objects.aupdate_or_create(
+                user=user, defaults={"current_step": 4, "last_visited": now()}
+            )
+
+            return _response({"message": "Educational background saved successfully."}, 200)
+
+        except Exception as e:
+            logger.error(f"Error in EducationalBackgroundView: {e}")
+            return _response({"error": "An unexpected error occurred while saving educational background."}, 500)
+
+    async def get(self, request):
+        """
+        Fetch educational background details for a user.
+        """
+        try:
+            email = request.GET.get("email")
+            user = await aresolve_user(request, email)
+
+            educational_background = await EducationalBackground.objects.filter(user=user).afirst()
+            if not educational_background:
+                return _response({"message": "No educational background details found."}, 404)
+
+            return _response(EducationalBackgroundSerializer(educational_background).data, 200)
+
+        except AccountCreation.DoesNotExist:
+            return _response({"error": "User not found."}, 404)
+        except Exception as e:
+            logger.error(f"Error in fetching EducationalBackgroundView: {e}")
+            return _response({"error": "An unexpected error occurred while fetching educational background."}, 500)
+
+
+# Step 5: Course Selection View
+@method_decorator(csrf_exempt, name='dispatch')
+class CourseSelectionView(View):
+    """
+    Handles course selection for the registration process, with the bundle discount.
+    """
+
+    async def post(self, request):
+        try:
+            data = _request_data(request)
+            email = data.get("email")
+            selected_course_ids = data.get("courses", [])
+            study_duration = data.get("study_duration", 0)
+
+            # Validate user existence
+            try:
+                user = await aresolve_user(request, email)
+            except AccountCreation.DoesNotExist:
+                return _response({"error": "User not found. Complete account creation first."}, 404)
+
+            # Validate course selection
+            if not selected_course_ids:
+                return _response({"error": "At least one course must be selected."}, 400)
+
+            # Fetch selected courses
+            courses = [course async for course in Course.objects.filter(id__in=selected_course_ids)]
+            if len(courses) != len(selected_course_ids):
+                return _response({"error": "One or more selected courses are invalid."}, 400)
+
+            # Calculate total fee with optional discounts
+            total_fee = sum(course.fee for course in courses)
+            discount = bundle_discount(len(selected_course_ids), total_fee)
+
+            # Create or update course selection
+            course_selection, created = await CourseSelection.objects.aupdate_or_create(
+                user=user,
+                defaults={
+                    "study_duration": study_duration,
+                    "total_fee": total_fee - discount,
+                },
+            )
+            await course_selection.courses.aset(courses)
+
+            # Update registration step to Step 5
+            await RegistrationStep.objects.aupdate_or_create(
+                user=user, defaults={"current_step": 5, "last_visited": now()}
+            )
+
+            return _response(
+                {
+                    "message": "Course selection saved successfully.",
+                    "selected_courses": CourseSerializer(courses, many=True).data,
+                    "study_duration": study_duration,
+                    "total_fee": total_fee - discount,
+                    "discount_applied": discount,
+                },
+                200,
+            )
+
+        except Exception as e:
+            logger.error(f"Error in CourseSelectionView: {e}")
+            return _response({"error": "An unexpected error occurred."}, 500)
+
+
+# Registration Progress
+class GetRegistrationProgressView(View):
+    """
+    Retrieve the user's registration progress.
+    Returns the current step and a summary of the progress.
+    """
+
+    async def get(self, request):
+        try:
+            email = request.GET.get("email")
+
+            # Validate email input
+            if not email:
+                return _response({"error": "Email is required to check registration progress."}, 400)
+
+            # Check if the user exists
+            try:
+                user = await aresolve_user(request, email, related=True)
+            except AccountCreation.DoesNotExist:
+                return _response({"error": "User not found. Complete account creation first."}, 404)
+
+            # Fetch registration progress
+            registration_step = related_object(user, "registration_step")
+            if not registration_step:
+                return _response(
+                    {
+                        "message": "Registration has not started.",
+                        "current_step": 0,
+                        "progress_notes": "No progress yet.",
+                    },
+                    200,
+                )
+
+            # Prepare response with current step and progress notes
+            progress_data = {
+                "email": user.email,
+                "current_step": registration_step.current_step,
+                "last_visited": registration_step.last_visited.strftime("%Y-%m-%d %H:%M:%S")
+                if registration_step.last_visited
+                else None,
+                "progress_notes": registration_step.progress_notes or "In progress...",
+            }
+
+            return _response(
+                {
+                    "message": "Registration progress fetched successfully.",
+                    "registration_progress": progress_data,
+                },
+                200,
+            )
+
+        except Exception as e:
+            logger.error(f"Error fetching registration progress: {e}")
+            return _response({"error": "An unexpected error occurred while fetching progress."}, 500)
@@ -0,0 +1,153 @@
+import bisect
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from django.conf import settings
+from django.core.cache import cache
+from myproject.models import City
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Prefixes matching more cities than this keep their ranked results, so broad
+# queries ("s", "san") are only ranked once per index build
+MEMO_MIN_MATCHES = 500
+MAX_RESULTS = 50
+
+
+def fold(text):
+    """
+    Case- and accent-insensitive search key ("São Paulo" -> "sao paulo").
+    """
+    decomposed = unicodedata.normalize("NFKD", text.strip())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class CountryCityIndex:
+    """
+    Sorted-array prefix index over the cities of one country.
+
+    Entries are `(key, capital_rank, population_rank, name, id)` tuples sorted by key,
+    so a prefix maps to one contiguous slice found with two binary searches.
+    """
+
+    def __init__(self, rows):
+        self.entries = sorted(self._entry(*row) for row in rows)
+        self.keys = [entry[0] for entry in self.entries]
+        self._top = {}
+
+    @staticmethod
+    def _entry(city_id, name, population, is_capital):
+        return (fold(name), 0 if is_capital else 1, -(population or 0), name, city_id)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, city_id, name, population, is_capital):
+        entry = self._entry(city_id, name, population, is_capital)
+        position = bisect.bisect_left(self.entries, entry)
+        self.entries.insert(position, entry)
+        self.keys.insert(position, entry[0])
+        self._top.clear()
+
+    def search(self, query, limit=10):
+        prefix = fold(query)
+        limit = min(limit, MAX_RESULTS)
+        top = self._top.get(prefix)
+        if top is None:
+            lo = bisect.bisect_left(self.keys, prefix)
+            hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+            # Capitals first, then by population, then alphabetically
+            top = heapq.nsmallest(
+                MAX_RESULTS if hi - lo > MEMO_MIN_MATCHES else limit,
+                self.entries[lo:hi],
+                key=lambda entry: (entry[1], entry[2], entry[0]),
+            )
+            if hi - lo > MEMO_MIN_MATCHES:
+                self._top[prefix] = top
+        return [{"id": entry[4], "name": entry[3]} for entry in top[:limit]]
+
+
+class _IndexEntry:
+    def __init__(self, index, version):
+        self.index = index
+        self.version = version
+        self.checked_at = time.monotonic()
+
+
+class CityIndexRegistry:
+    """
+    Lazily built per-country indexes, kept in step across workers by a per-country
+    version stamp in the shared cache (checked at most every `check_interval` seconds).
+    """
+
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version_key(country_id):
+        return f"city_index:version:{country_id}"
+
+    def _current_version(self, country_id):
+        key = self._version_key(country_id)
+        cache.add(key, 1, None)
+        return cache.get(key)
+
+    def _bump(self, country_id):
+        key = self._version_key(country_id)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            version = int(time.time() * 1000)
+            cache.set(key, version, None)
+            return version
+
+    def get(self, country_id):
+        entry = self._indexes.get(country_id)
+        if entry and time.monotonic() - entry.checked_at < self.check_interval:
+            return entry.index
+
+        version = self._current_version(country_id)
+        if entry and entry.version == version:
+            entry.checked_at = time.monotonic()
+            return entry.index
+
+        started = time.monotonic()
+        rows = City.objects.filter(country_id=country_id).values_list("id", "name", "population", "is_capital")
+        index = CountryCityIndex(rows)
+        with self._lock:
+            self._indexes[country_id] = _IndexEntry(index, version)
+        logger.info(f"Built city index for country {country_id}: {len(index)} cities in {time.monotonic() - started:.3f}s")
+        return index
+
+    def city_added(self, city):
+        """
+        Insert a newly created city into the local index and tell other workers to rebuild.
+        """
+        version = self._bump(city.country_id)
+        with self._lock:
+            entry = self._indexes.get(city.country_id)
+            if entry is None:
+                return
+            if entry.version == version - 1:
+                entry.index.add(city.id, city.name, city.population, city.is_capital)
+                entry.version = version
+            else:
+                # Missed another change in between; rebuild on next use
+                del self._indexes[city.country_id]
+
+    def invalidate(self, country_ids):
+        """
+        Drop the indexes of countries changed in bulk (bulk writes send no signals).
+        """
+        for country_id in country_ids:
+            self._bump(country_id)
+            with self._lock:
+                self._indexes.pop(country_id, None)
+
+
+city_indexes = CityIndexRegistry(check_interval=settings.REFERENCE_CACHE_CHECK_INTERVAL)
@@ -0,0 +1,307 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from myproject.models import AccountCreation
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Shared version stamp; workers rebuild their filter when it changes
+EMAIL_FILTER_VERSION_KEY = "email_filter:version"
+# Shared log of emails registered since the last rebuild: a counter plus one key per entry
+EMAIL_FILTER_LOG_KEY = "email_filter:log"
+EMAIL_FILTER_LOG_TTL = 7 * 24 * 3600
+# Prebuilt filter published for other workers when EMAIL_FILTER_SHARED is on
+EMAIL_FILTER_SNAPSHOT_KEY = "email_filter:snapshot"
+
+MIN_CAPACITY = 100_000
+# Capacity is this multiple of the registered emails, leaving room for signups between rebuilds
+CAPACITY_HEADROOM = 2
+BUILD_CHUNK_SIZE = 10_000
+# Log observed false-positive rate every this many checks
+STATS_LOG_INTERVAL = 100_000
+
+
+def filter_key(email):
+    """
+    Normalized form stored in the filter. Case-folded entirely, so that a case-insensitive
+    database collation can never make the filter miss a registered email.
+    """
+    return (email or "").strip().lower()
+
+
+class BloomFilter:
+    """
+    Bit array sized for `capacity` items at `error_rate` false positives, using double
+    hashing over one 128-bit BLAKE2b digest per item.
+    """
+
+    def __init__(self, capacity, error_rate, bits=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def is_full(self):
+        return self.count > self.capacity
+
+    def expected_error_rate(self):
+        """
+        False-positive probability at the current fill.
+        """
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "error_rate": self.error_rate, "bits": bytes(self.bits), "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["capacity"], data["error_rate"], bits=data["bits"], count=data["count"])
+
+
+class FilterStats:
+    """
+    Per-process counters for the availability check.
+    """
+
+    def __init__(self):
+        self.checks = 0
+        self.definitely_available = 0
+        self.database_checks = 0
+        self.false_positives = 0
+
+    @property
+    def observed_error_rate(self):
+        # Of the emails that were in fact available, the share the filter could not rule out
+        available = self.definitely_available + self.false_positives
+        return self.false_positives / available if available else 0.0
+
+    def summary(self):
+        return (
+            f"{self.checks} checks, {self.definitely_available} answered by the filter, "
+            f"{self.database_checks} database checks, {self.false_positives} false positives "
+            f"(observed rate {self.observed_error_rate:.4%})"
+        )
+
+
+class EmailFilterRegistry:
+    """
+    Per-process Bloom filter over registered emails. A negative answer means the email
+    is certainly not registered; a positive one must be confirmed against the database.
+
+    Signups append to a shared log that every worker replays at most `check_interval`
+    seconds later; a bumped version stamp makes workers rebuild from the database.
+    """
+
+    def __init__(self, check_interval, error_rate, shared):
+        self.check_interval = check_interval
+        self.error_rate = error_rate
+        self.shared = shared
+        self.stats = FilterStats()
+        self._lock = threading.Lock()
+        self._filter = None
+        self._version = None
+        self._log_position = 0
+        self._missing = set()
+        self._checked_at = 0.0
+
+    def _current_version(self):
+        cache.add(EMAIL_FILTER_VERSION_KEY, 1, None)
+        return cache.get(EMAIL_FILTER_VERSION_KEY)
+
+    def build(self, version=None, publish=None):
+        """
+        Build a filter from the database and make it current in this process. With
+        `publish` (default: EMAIL_FILTER_SHARED) it is also stored for other workers.
+        """
+        started = time.monotonic()
+        version = self._current_version() if version is None else version
+        # Read the log position first: entries logged during the scan get replayed, at worst twice
+        log_position = cache.get(EMAIL_FILTER_LOG_KEY, 0)
+        count = AccountCreation.objects.count()
+        bloom = BloomFilter(max(MIN_CAPACITY, count * CAPACITY_HEADROOM), self.error_rate)
+        for email in AccountCreation.objects.values_list("email", flat=True).iterator(chunk_size=BUILD_CHUNK_SIZE):
+            bloom.add(filter_key(email))
+
+        if publish if publish is not None else self.shared:
+            cache.set(
+                EMAIL_FILTER_SNAPSHOT_KEY,
+                {"version": version, "log_position": log_position, "filter": bloom.to_dict()},
+                None,
+            )
+        self._install(bloom, version, log_position)
+        logger.info(
+            f"Built email filter: {bloom.count} emails, {len(bloom.bits) / 2 ** 20:.1f}MB, "
+            f"{bloom.hashes} hashes in {time.monotonic() - started:.2f}s"
+        )
+        return bloom
+
+    def _load_snapshot(self, version):
+        snapshot = cache.get(EMAIL_FILTER_SNAPSHOT_KEY) if self.shared else None
+        if not snapshot or snapshot["version"] != version:
+            return None
+        bloom = BloomFilter.from_dict(snapshot["filter"])
+        self._install(bloom, version, snapshot["log_position"])
+        logger.info(f"Loaded shared email filter: {bloom.count} emails")
+        return bloom
+
+    def _install(self, bloom, version, log_position):
+        with self._lock:
+            self._filter, self._version = bloom, version
+            self._log_position, self._missing = log_position, set()
+
+    def _replay_log(self):
+        """
+        Add the emails logged since the last replay. Returns False when an entry is still
+        missing an interval later (evicted, or past its TTL): skipping it would leave a
+        registered email out of the filter, so the caller must rebuild instead.
+        """
+        position = cache.get(EMAIL_FILTER_LOG_KEY, 0)
+        if position <= self._log_position:
+            return True
+        keys = {f"{EMAIL_FILTER_LOG_KEY}:{n}": n for n in range(self._log_position + 1, position + 1)}
+        entries = cache.get_many(list(keys))
+        with self._lock:
+            for key, n in keys.items():
+                if key in entries:
+                    self._filter.add(filter_key(entries[key]))
+                elif n not in self._missing:
+                    # Counter bumped but entry not written yet; give the writer one more interval
+                    self._missing.add(n)
+                    break
+                else:
+                    return False
+                self._log_position = n
+            self._missing = {n for n in self._missing if n > self._log_position}
+        return True
+
+    def is_current(self):
+        """
+        Whether `get()` can answer from memory, without touching the cache or database.
+        """
+        return self._filter is not None and time.monotonic() - self._checked_at < self.check_interval
+
+    def get(self):
+        current = time.monotonic()
+        if self._filter is not None and current - self._checked_at < self.check_interval:
+            return self._filter
+
+        version = self._current_version()
+        self._checked_at = current
+        if self._filter is None or version != self._version:
+            if not self._load_snapshot(version):
+                self.build(version)
+        if not self._replay_log():
+            # Other workers are missing the same entry; make every one of them rebuild
+            logger.warning("Email filter log entry lost before it was replayed; rebuilding the filter.")
+            self.invalidate()
+            self._checked_at = current
+            self.build()
+        if self._filter.is_full:
+            logger.warning("Email filter is over capacity; rebuilding with more room.")
+            self.invalidate()
+        return self._filter
+
+    def add(self, *emails):
+        """
+        Record newly registered emails here and in the shared log for other workers.
+        """
+        if self._filter is not None:
+            with self._lock:
+                for email in emails:
+                    self._filter.add(filter_key(email))
+        for email in emails:
+            cache.add(EMAIL_FILTER_LOG_KEY, 0, None)
+            position = cache.incr(EMAIL_FILTER_LOG_KEY)
+            cache.set(f"{EMAIL_FILTER_LOG_KEY}:{position}", email, EMAIL_FILTER_LOG_TTL)
+
+    def might_exist(self, email, bloom=None):
+        """
+        False when `email` is certainly not registered. `bloom` is a filter already
+        obtained from `get()`.
+        """
+        self.stats.checks += 1
+        if filter_key(email) in (bloom if bloom is not None else self.get()):
+            self.stats.database_checks += 1
+            return True
+        self.stats.definitely_available += 1
+        return False
+
+    def record_false_positive(self):
+        self.stats.false_positives += 1
+
+    def maybe_log_stats(self):
+        if self.stats.checks % STATS_LOG_INTERVAL == 0:
+            bloom = self._filter
+            logger.info(
+                f"Email filter: {self.stats.summary()}; expected rate "
+                f"{bloom.expected_error_rate() if bloom else 0:.4%}"
+            )
+
+    def invalidate(self):
+        try:
+            cache.incr(EMAIL_FILTER_VERSION_KEY)
+        except ValueError:
+            cache.set(EMAIL_FILTER_VERSION_KEY, int(time.time() * 1000), None)
+        self._checked_at = 0.0
+
+
+email_filter = EmailFilterRegistry(
+    check_interval=settings.REFERENCE_CACHE_CHECK_INTERVAL,
+    error_rate=settings.EMAIL_FILTER_ERROR_RATE,
+    shared=settings.EMAIL_FILTER_SHARED,
+)
+
+
+def email_available(email):
+    """
+    Whether `email` can still be registered; only emails the filter cannot rule out
+    cost a database query.
+    """
+    if not email_filter.might_exist(email):
+        available = True
+    else:
+        available = not AccountCreation.objects.filter(email=email).exists()
+        if available:
+            email_filter.record_false_positive()
+    email_filter.maybe_log_stats()
+    return available
+
+
+async def aemail_available(email):
+    """
+    Async `email_available`: the filter is consulted in memory and only refreshed (or
+    the database asked) off the event loop.
+    """
+    bloom = email_filter.get() if email_filter.is_current() else await sync_to_async(email_filter.get)()
+    if not email_filter.might_exist(email, bloom):
+        available = True
+    else:
+        available = not await AccountCreation.objects.filter(email=email).aexists()
+        if available:
+            email_filter.record_false_positive()
+    email_filter.maybe_log_stats()
+    return available
@@ -0,0 +1,183 @@
+import logging
+import smtplib
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+from myproject.models import OutboundEmail
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# A claimed email is invisible to other workers for this long
+CLAIM_LEASE = timedelta(minutes=10)
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = timedelta(minutes=1)
+
+# Short names accepted by `send_outbox_emails --backend`
+BACKENDS = {
+    "smtp": "django.core.mail.backends.smtp.EmailBackend",
+    "console": "django.core.mail.backends.console.EmailBackend",
+    "file": "django.core.mail.backends.filebased.EmailBackend",
+    "locmem": "django.core.mail.backends.locmem.EmailBackend",
+}
+
+# Errors that retrying will not fix
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+class DeliveryStats:
+    """
+    Delivery counters and throughput for an outbox worker run.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def total(self):
+        return self.sent + self.retried + self.failed
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def emails_per_second(self):
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (
+            f"{self.total} emails ({self.sent} sent, {self.retried} to retry, "
+            f"{self.failed} failed) in {self.elapsed:.2f}s, {self.emails_per_second:.1f} sent/s"
+        )
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    """
+    Queue an email for the outbox worker. Only a local insert, so it commits or rolls
+    back together with the caller's transaction; safe to call from request handlers.
+    """
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+    logger.info(f"Queued email '{subject}' to {', '.join(email.recipients)}")
+    return email
+
+
+def enqueue_emails(emails):
+    """
+    Queue many emails (each a dict of `enqueue_email` arguments) with one insert.
+    """
+    OutboundEmail.objects.bulk_create([
+        OutboundEmail(
+            subject=email["subject"],
+            body=email["message"],
+            from_email=email.get("from_email") or settings.DEFAULT_FROM_EMAIL,
+            recipients=list(email["recipient_list"]),
+        )
+        for email in emails
+    ])
+    logger.info(f"Queued {len(emails)} emails")
+
+
+def get_outbox_connection(backend=None):
+    """
+    A mail connection for the worker; `backend` is a short name from BACKENDS or a dotted path.
+    """
+    backend = backend or settings.EMAIL_OUTBOX_BACKEND
+    return get_connection(BACKENDS.get(backend, backend), fail_silently=False)
+
+
+def claim_emails(limit):
+    """
+    Lease up to `limit` due emails so that concurrent workers don't send them twice.
+    """
+    with transaction.atomic():
+        due = OutboundEmail.objects.filter(status="Pending", next_attempt_at__lte=now()).order_by("next_attempt_at")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        emails = list(due[:limit])
+        OutboundEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            next_attempt_at=now() + CLAIM_LEASE, attempts=F("attempts") + 1
+        )
+    return emails
+
+
+def _reconnect(mail_connection):
+    # Reopen explicitly: a connection opened by `send_messages` itself is closed after one send
+    try:
+        mail_connection.close()
+    except Exception:
+        pass
+    mail_connection.open()
+
+
+def deliver_batch(mail_connection, limit=100, stats=None):
+    """
+    Claim a batch of emails and send them over `mail_connection`, which the caller has
+    opened and reuses across batches. Returns the number of emails claimed, or 0 when the
+    mail server went away (the unsent rest of the batch is retried once its lease expires).
+    """
+    emails = claim_emails(limit)
+    sent, retry, failed = [], [], []
+    server_down = False
+    for email in emails:
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=email.recipients,
+            connection=mail_connection,
+        )
+        try:
+            mail_connection.send_messages([message])
+            sent.append(email)
+        except PERMANENT_ERRORS as e:
+            logger.error(f"Email {email.id} rejected: {e}")
+            failed.append((email, str(e)))
+        except Exception as e:
+            logger.warning(f"Email {email.id} not sent (attempt {email.attempts + 1}): {e}")
+            retry.append((email, str(e)))
+            if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                try:
+                    _reconnect(mail_connection)
+                except Exception as reconnect_error:
+                    # The server is down: leave the rest of the batch to its lease
+                    logger.error(f"Could not reconnect to the mail server: {reconnect_error}")
+                    server_down = True
+                    break
+
+    _finish_emails(sent, retry, failed)
+    if stats is not None:
+        stats.sent += len(sent)
+        stats.failed += len(failed) + sum(1 for email, _ in retry if email.attempts + 1 >= MAX_ATTEMPTS)
+        stats.retried += sum(1 for email, _ in retry if email.attempts + 1 < MAX_ATTEMPTS)
+    return 0 if server_down else len(emails)
+
+
+def _finish_emails(sent, retry, failed):
+    OutboundEmail.objects.filter(id__in=[email.id for email in sent]).update(
+        status="Sent", sent_at=now(), last_error=None
+    )
+    for email, error in failed:
+        OutboundEmail.objects.filter(id=email.id).update(status="Failed", last_error=error)
+    for email, error in retry:
+        # `attempts` was already incremented when the email was claimed
+        attempts = email.attempts + 1
+        if attempts >= MAX_ATTEMPTS:
+            OutboundEmail.objects.filter(id=email.id).update(status="Failed", last_error=error)
+        else:
+            OutboundEmail.objects.filter(id=email.id).update(
+                next_attempt_at=now() + RETRY_BACKOFF * 2 ** (attempts - 1), last_error=error
+            )
@@ -0,0 +1,128 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+from myproject.models import CityEnrichmentJob
+from myproject.views.location_helpers import city_search_params
+from myproject.views.location_utils import parse_city_record, bulk_upsert_cities
+from myproject.views.city_index import fold
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# A claimed job is invisible to other workers for this long
+CLAIM_LEASE = timedelta(minutes=10)
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = timedelta(minutes=1)
+
+
+def enqueue_city_enrichment(city):
+    """
+    Record that a city needs its details looked up. Only local DB writes; safe to call
+    from request handlers.
+    """
+    job, created = CityEnrichmentJob.objects.get_or_create(
+        city=city, defaults={"country_id": city.country_id}
+    )
+    if created:
+        logger.info(f"Queued enrichment for city: {city.name}")
+    return job
+
+
+def claim_enrichment_jobs(limit):
+    """
+    Lease up to `limit` due jobs so that concurrent workers don't process them twice.
+    """
+    with transaction.atomic():
+        due = CityEnrichmentJob.objects.filter(status="Pending", next_attempt_at__lte=now()).order_by("next_attempt_at")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        jobs = list(due.select_related("city", "country")[:limit])
+        CityEnrichmentJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            next_attempt_at=now() + CLAIM_LEASE, attempts=F("attempts") + 1
+        )
+    return jobs
+
+
+def _single_city_params(city):
+    return {"city": city.name, "country": city.country.name, "format": "json", "limit": 1}
+
+
+def run_enrichment_batch(fetcher, limit=100):
+    """
+    Claim a batch of jobs, fetch once per country (plus a targeted lookup for cities the
+    country listing misses) and write all coordinates with one bulk upsert.
+    Returns `(done, failed)` job counts.
+    """
+    jobs = claim_enrichment_jobs(limit)
+    if not jobs:
+        return 0, 0
+
+    # Work is deduplicated per country: one listing request covers every queued city in it
+    by_country = {}
+    for job in jobs:
+        by_country.setdefault(job.country_id, []).append(job)
+    countries = {jobs_for_country[0].country.name: country_id for country_id, jobs_for_country in by_country.items()}
+
+    records, resolved, failed_countries = [], set(), set()
+    for country_name, results in fetcher.map(
+        (name, settings.NOMINATIM_URL, city_search_params(name)) for name in countries
+    ):
+        country_id = countries[country_name]
+        if results is None:
+            failed_countries.add(country_id)
+            continue
+        wanted = {fold(job.city.name): job for job in by_country[country_id]}
+        for result in results:
+            record = parse_city_record(result, country_id)
+            job = wanted.get(fold(record["name"])) if record else None
+            if job and job.city_id not in resolved:
+                record["name"] = job.city.name
+                records.append(record)
+                resolved.add(job.city_id)
+
+    # Targeted lookups for cities the country listing did not include
+    missing = {
+        job.city_id: job for job in jobs
+        if job.city_id not in resolved and job.country_id not in failed_countries
+    }
+    failed_cities = set()
+    for city_id, results in fetcher.map(
+        (city_id, settings.NOMINATIM_URL, _single_city_params(job.city)) for city_id, job in missing.items()
+    ):
+        if results is None:
+            failed_cities.add(city_id)
+        elif results:
+            job = missing[city_id]
+            record = parse_city_record(results[0], job.country_id)
+            if record:
+                record["name"] = job.city.name
+                records.append(record)
+
+    bulk_upsert_cities(records)
+
+    done, failed = [], []
+    for job in jobs:
+        if job.country_id in failed_countries or job.city_id in failed_cities:
+            failed.append(job)
+        else:
+            done.append(job)
+    _finish_jobs(done, failed)
+    logger.info(f"City enrichment batch: {len(done)} done, {len(failed)} to retry, {len(records)} cities updated.")
+    return len(done), len(failed)
+
+
+def _finish_jobs(done, failed):
+    CityEnrichmentJob.objects.filter(id__in=[job.id for job in done]).update(status="Done", last_error=None)
+    for job in failed:
+        # `attempts` was already incremented when the job was claimed
+        attempts = job.attempts + 1
+        if attempts >= MAX_ATTEMPTS:
+            CityEnrichmentJob.objects.filter(id=job.id).update(status="Failed", last_error="Upstream lookup failed.")
+        else:
+            CityEnrichmentJob.objects.filter(id=job.id).update(
+                next_attempt_at=now() + RETRY_BACKOFF * 2 ** (attempts - 1),
+                last_error="Upstream lookup failed.",
+            )
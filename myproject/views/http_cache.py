@@ -0,0 +1,263 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached entry
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+def cache_key(url, params=None):
+    """
+    Canonical request URL (query parameters sorted) used as the cache key.
+    """
+    items = sorted((params or {}).items())
+    return requests.Request("GET", url, params=items).prepare().url
+
+
+def _max_age(headers, default_ttl):
+    """
+    Freshness lifetime from Cache-Control; None means the response must not be stored.
+    """
+    directives = [part.strip().lower() for part in (headers.get("Cache-Control") or "").split(",")]
+    if "no-store" in directives:
+        return None
+    for directive in directives:
+        if directive.startswith("max-age="):
+            try:
+                return max(int(directive[len("max-age="):]), 0)
+            except ValueError:
+                break
+    return default_ttl
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for `requests.Response` built from a cache entry; the body is
+    read from the compressed object file only when asked for.
+    """
+
+    from_cache = True
+
+    def __init__(self, path, headers, status_code=200):
+        self.path = path
+        self.headers = CaseInsensitiveDict(headers)
+        self.status_code = status_code
+
+    @property
+    def content(self):
+        with gzip.open(self.path, "rb") as body:
+            return body.read()
+
+    def iter_content(self, chunk_size=1):
+        with gzip.open(self.path, "rb") as body:
+            while True:
+                chunk = body.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+
+class _StreamingMiss:
+    """
+    Live response whose body is copied into the cache while the caller streams it.
+    """
+
+    def __init__(self, response, cache, key):
+        self._response = response
+        self._cache = cache
+        self._key = key
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def iter_content(self, chunk_size=1):
+        return self._cache.store_stream(self._key, self._response, chunk_size)
+
+
+class HttpResponseCache:
+    """
+    On-disk cache of successful GET responses.
+
+    Entries live under `index/` as small JSON files keyed by the request URL; bodies are
+    stored once under `objects/`, gzip-compressed and named by their SHA-256 digest, so
+    identical payloads fetched through different URLs share one file.
+    """
+
+    def __init__(self, directory, default_ttl):
+        self.directory = str(directory)
+        self.default_ttl = default_ttl
+        self.hits = self.misses = self.revalidated = self.stored = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated, "stored": self.stored}
+
+    def summary(self):
+        stats = self.stats()
+        return ", ".join(f"{count} {name}" for name, count in stats.items())
+
+    def _index_path(self, key):
+        return os.path.join(self.directory, "index", hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest + ".gz")
+
+    def _write(self, path, data):
+        # Write-then-rename so concurrent readers never see a partial file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def lookup(self, key):
+        """
+        The stored entry for `key` (fresh or stale) with the path of its body, or None.
+        """
+        try:
+            with open(self._index_path(key), "rb") as index_file:
+                entry = json.load(index_file)
+            entry["path"] = self._object_path(entry["digest"])
+            return entry if os.path.exists(entry["path"]) else None
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _store_entry(self, key, digest, headers, ttl):
+        entry = {
+            "url": key,
+            "digest": digest,
+            "headers": {name: headers[name] for name in STORED_HEADERS if name in headers},
+            "stored_at": time.time(),
+            "expires_at": time.time() + ttl,
+        }
+        self._write(self._index_path(key), json.dumps(entry).encode())
+        self._count("stored")
+
+    def store(self, key, response):
+        ttl = _max_age(response.headers, self.default_ttl)
+        if ttl is None:
+            return
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        try:
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                self._write(object_path, gzip.compress(content))
+            self._store_entry(key, digest, response.headers, ttl)
+        except OSError as e:
+            logger.warning(f"Could not cache response for {key}: {e}")
+
+    def store_stream(self, key, response, chunk_size):
+        """
+        Yield the response body while compressing it to a temporary file; the entry is
+        only stored once the caller has consumed the whole body.
+        """
+        ttl = _max_age(response.headers, self.default_ttl)
+        if ttl is None:
+            yield from response.iter_content(chunk_size)
+            return
+
+        objects_dir = os.path.join(self.directory, "objects")
+        os.makedirs(objects_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=objects_dir)
+        digest = hashlib.sha256()
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as temp_file, gzip.GzipFile(fileobj=temp_file, mode="wb") as body:
+                for chunk in response.iter_content(chunk_size):
+                    digest.update(chunk)
+                    body.write(chunk)
+                    yield chunk
+            object_path = self._object_path(digest.hexdigest())
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(temp_path, object_path)
+            completed = True
+            self._store_entry(key, digest.hexdigest(), response.headers, ttl)
+        except OSError as e:
+            logger.warning(f"Could not cache response for {key}: {e}")
+        finally:
+            if not completed and os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def refresh(self, key, entry, response):
+        """
+        Extend a stale entry after the origin answered 304 Not Modified.
+        """
+        headers = dict(entry["headers"])
+        headers.update({name: response.headers[name] for name in STORED_HEADERS if name in response.headers})
+        ttl = _max_age(headers, self.default_ttl) or 0
+        updated = {key_: value for key_, value in entry.items() if key_ != "path"}
+        updated.update({"headers": headers, "expires_at": time.time() + ttl})
+        try:
+            self._write(self._index_path(key), json.dumps(updated).encode())
+        except OSError as e:
+            logger.warning(f"Could not refresh cached response for {key}: {e}")
+        return headers
+
+
+class CachingTransport:
+    """
+    Transport wrapper that serves fresh responses from an `HttpResponseCache` and
+    revalidates stale ones with If-None-Match / If-Modified-Since.
+
+    Has the same `get(url, params, headers, timeout)` interface as `RequestsTransport`,
+    so it can be handed to `ConcurrentFetcher`.
+    """
+
+    def __init__(self, transport, cache):
+        self.transport = transport
+        self.cache = cache
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        key = cache_key(url, params)
+        entry = self.cache.lookup(key)
+        if entry and entry["expires_at"] > time.time():
+            self.cache._count("hits")
+            return CachedResponse(entry["path"], entry["headers"])
+
+        request_headers = dict(headers or {})
+        if entry:
+            if "ETag" in entry["headers"]:
+                request_headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                request_headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = self.transport.get(url, params=params, headers=request_headers, **kwargs)
+        if entry and response.status_code == 304:
+            self.cache._count("revalidated")
+            return CachedResponse(entry["path"], self.cache.refresh(key, entry, response))
+
+        self.cache._count("misses")
+        if response.status_code != 200:
+            return response
+        if kwargs.get("stream"):
+            return _StreamingMiss(response, self.cache, key)
+        self.cache.store(key, response)
+        return response
+
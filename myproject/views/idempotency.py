@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from myproject.views.email_filter import filter_key
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# Seconds between checks while a duplicate waits for the first request to finish
+WAIT_POLL_INTERVAL = 0.1
+
+# Request fields naming the student a request is made for (the views allow anonymous access)
+CLIENT_FIELDS = ("email", "user")
+
+
+def _fields(request):
+    """
+    Non-file fields of the request body: the JSON object, or the form fields.
+    """
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+def _client(request, fields):
+    """
+    Who the key belongs to: the credentials sent, else the student the request names,
+    so that two clients choosing the same key never see each other's responses.
+    """
+    authorization = request.headers.get("Authorization")
+    if authorization:
+        return f"auth:{hashlib.sha256(authorization.encode()).hexdigest()}"
+    for field in CLIENT_FIELDS:
+        value = fields.get(field)
+        if value not in (None, ""):
+            return f"{field}:{filter_key(str(value))}"
+    return ""
+
+
+def _store_key(request, key, client):
+    # Hashed: client keys may be long or hold characters some cache backends reject
+    return f"idempotency:{hashlib.sha256(f'{request.path}:{client}:{key}'.encode()).hexdigest()}"
+
+
+def _fingerprint(request, fields):
+    """
+    Hash of what the client asked for, so that a key reused for a different request
+    is refused rather than answered with another request's response. Uploaded files
+    are identified by name and size.
+    """
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    if request.content_type == "multipart/form-data":
+        for name in sorted(fields):
+            digest.update(json.dumps([name, fields.getlist(name)]).encode())
+        for name in sorted(request.FILES):
+            for upload in request.FILES.getlist(name):
+                digest.update(json.dumps([name, upload.name, upload.size]).encode())
+    else:
+        digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _identify(request, key):
+    """
+    `(store key, fingerprint)` for a keyed request, or None for a body too large to read
+    here: the view refuses those from their declared length, before any upload is read.
+    """
+    if int(request.META.get("CONTENT_LENGTH") or 0) > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+        return None
+    fields = _fields(request)
+    return _store_key(request, key, _client(request, fields)), _fingerprint(request, fields)
+
+
+def _invalid_key(key):
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable() or not key.isascii():
+        return JsonResponse(
+            {"error": f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} printable ASCII characters."}, status=400
+        )
+    return None
+
+
+def _replay(entry):
+    response = HttpResponse(entry["content"], status=entry["status"])
+    for header, value in entry["headers"]:
+        response[header] = value
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _existing(entry, fingerprint, deadline):
+    """
+    Answer for a request whose key is already taken, or None to keep waiting for the
+    request that holds it.
+    """
+    if entry is None:
+        # Released (or expired) since we looked; try to take the key again
+        return None
+    if entry["fingerprint"] != fingerprint:
+        logger.warning(f"{IDEMPOTENCY_HEADER} reused for a different request")
+        return JsonResponse(
+            {"error": f"This {IDEMPOTENCY_HEADER} was already used for a different request."}, status=422
+        )
+    if "status" in entry:
+        return _replay(entry)
+    if time.monotonic() >= deadline:
+        return JsonResponse(
+            {"error": "A request with this key is still being processed. Please retry shortly."},
+            status=409,
+            headers={"Retry-After": "1"},
+        )
+    return None
+
+
+def _completed(response, fingerprint):
+    """
+    The entry replayed for later duplicates, or None when the response must not be kept:
+    server errors are left for the client to retry for real.
+    """
+    if hasattr(response, "render"):
+        # DRF responses are rendered after the view returns; the body is needed now
+        response.render()
+    if response.streaming or response.status_code >= 500:
+        return None
+    return {
+        "fingerprint": fingerprint,
+        "status": response.status_code,
+        "content": response.content,
+        "headers": list(response.items()),
+    }
+
+
+def idempotent(view_func):
+    """
+    Make POSTs carrying an `Idempotency-Key` header safe to retry: the first request
+    with a key runs the view and its response is kept for IDEMPOTENCY_KEY_TTL seconds;
+    repeats are answered from the cache without running the view, and a repeat that
+    arrives while the first is still running waits for its response (up to
+    IDEMPOTENCY_LOCK_TIMEOUT seconds). Requests without the header are not affected.
+
+    Wraps a view function (e.g. `idempotent(SomeView.as_view())`), sync or async.
+    """
+    if iscoroutinefunction(view_func):
+        async def _view_wrapper(request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if request.method != "POST" or key is None:
+                return await view_func(request, *args, **kwargs)
+            invalid = _invalid_key(key)
+            if invalid:
+                return invalid
+            identity = _identify(request, key)
+            if identity is None:
+                return await view_func(request, *args, **kwargs)
+            store_key, fingerprint = identity
+            deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_TIMEOUT
+            while not await cache.aadd(store_key, {"fingerprint": fingerprint}, settings.IDEMPOTENCY_KEY_TTL):
+                answer = _existing(await cache.aget(store_key), fingerprint, deadline)
+                if answer is not None:
+                    return answer
+                await asyncio.sleep(WAIT_POLL_INTERVAL)
+
+            try:
+                response = await view_func(request, *args, **kwargs)
+                entry = _completed(response, fingerprint)
+            except BaseException:
+                await cache.adelete(store_key)
+                raise
+            if entry is None:
+                await cache.adelete(store_key)
+            else:
+                await cache.aset(store_key, entry, settings.IDEMPOTENCY_KEY_TTL)
+            return response
+
+    else:
+        def _view_wrapper(request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if request.method != "POST" or key is None:
+                return view_func(request, *args, **kwargs)
+            invalid = _invalid_key(key)
+            if invalid:
+                return invalid
+            identity = _identify(request, key)
+            if identity is None:
+                return view_func(request, *args, **kwargs)
+            store_key, fingerprint = identity
+            deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_TIMEOUT
+            # The first request takes the key; concurrent duplicates wait for its response.
+            # The placeholder outlives any view (it is released when the view ends), so a
+            # slow payment is never run twice by a retry arriving after the wait deadline
+            while not cache.add(store_key, {"fingerprint": fingerprint}, settings.IDEMPOTENCY_KEY_TTL):
+                answer = _existing(cache.get(store_key), fingerprint, deadline)
+                if answer is not None:
+                    return answer
+                time.sleep(WAIT_POLL_INTERVAL)
+
+            try:
+                response = view_func(request, *args, **kwargs)
+                entry = _completed(response, fingerprint)
+            except BaseException:
+                cache.delete(store_key)
+                raise
+            if entry is None:
+                cache.delete(store_key)
+            else:
+                cache.set(store_key, entry, settings.IDEMPOTENCY_KEY_TTL)
+            return response
+
+    return wraps(view_func)(_view_wrapper)
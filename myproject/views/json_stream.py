@@ -0,0 +1,90 @@
+import codecs
+import json
+import re
+
+# Bytes read from the network (or cache) per step of a streamed parse
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"[-+0-9.eE]*")
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a top-level JSON array from an iterable of byte chunks
+    as soon as each one is complete, so the whole document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer, position = "", 0
+    started, expect_value, expect_comma = False, False, False
+
+    chunks = iter(chunks)
+    while True:
+        chunk = next(chunks, None)
+        final = chunk is None
+        buffer = buffer[position:] + utf8.decode(chunk or b"", final=final)
+        position = 0
+
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position >= len(buffer):
+                break
+            char = buffer[position]
+
+            if not started:
+                if char != "[":
+                    raise ValueError("Expected a JSON array.")
+                started = True
+                position += 1
+                continue
+            if expect_comma:
+                if char == "]":
+                    _drain(buffer[position + 1:], utf8, chunks)
+                    return
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}.")
+                expect_comma, expect_value = False, True
+                position += 1
+                continue
+            if char == "]" and not expect_value:
+                _drain(buffer[position + 1:], utf8, chunks)
+                return
+
+            # A number could be cut off anywhere ("2.", "1e"); wait until its delimiter has arrived
+            if not final and _NUMBER.match(buffer, position).end() >= len(buffer):
+                break
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # The element continues in the next chunk
+
+            yield value
+            position = end
+            expect_comma, expect_value = True, False
+
+        if final:
+            raise ValueError("Truncated JSON array.")
+
+
+def _drain(rest, utf8, chunks):
+    """
+    Consume the input after the closing bracket (so that readers teeing the stream,
+    like the response cache, see it end) and check that it is only whitespace.
+    """
+    for chunk in chunks:
+        rest += utf8.decode(chunk)
+        if rest.strip():
+            break
+    rest += utf8.decode(b"", final=True)
+    if rest.strip():
+        raise ValueError("Unexpected data after JSON array.")
+
+
+def iter_response_array(response, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream the elements of a JSON array response fetched with `stream=True`.
+    """
+    return iter_json_array(response.iter_content(chunk_size))
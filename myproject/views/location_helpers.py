@@ -0,0 +1,283 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from myproject.views.http_cache import HttpResponseCache, CachingTransport
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "myproject/1.0"
+REQUEST_TIMEOUT = 30
+
+
+def city_search_params(country_name, limit=100):
+    """
+    Nominatim query parameters for the cities of a country.
+    """
+    return {"country": country_name, "format": "json", "addressdetails": 1, "limit": limit}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker of a fetcher.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        # Nothing is handed out before this (monotonic) time; see `pause`
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        current = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (current - self.updated) * self.rate)
+        self.updated = current
+
+    def acquire(self):
+        """
+        Block until a token is available and take it.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                paused = self.paused_until - self.updated
+                if paused <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = paused if paused > 0 else (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stop every worker from sending anything for the next `seconds`. Pauses overlap
+        rather than add up: workers hitting the same 429 together pause everyone once.
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RequestsTransport:
+    """
+    Default transport: a pooled `requests.Session`.
+
+    Any object with the same `get(url, params, headers, timeout)` method returning a
+    response with `status_code`, `headers`, `json()` and `raise_for_status()` can be
+    passed to `ConcurrentFetcher` instead, e.g. to run against a local fake server.
+    """
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+
+    def get(self, url, params=None, headers=None, timeout=REQUEST_TIMEOUT, stream=False):
+        return self.session.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+
+
+class ConcurrentFetcher:
+    """
+    Runs JSON GET requests on a thread pool behind a shared rate limit,
+    per-host concurrency caps and jittered exponential backoff.
+    """
+
+    def __init__(
+        self, transport=None, max_workers=4, rate=1.0, burst=1, per_host=2,
+        max_retries=3, backoff_base=1.0, backoff_max=60.0, timeout=REQUEST_TIMEOUT,
+    ):
+        self.transport = transport or RequestsTransport()
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, burst)
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.headers = {"User-Agent": USER_AGENT}
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _backoff(self, attempt, retry_after=None):
+        """
+        Honor Retry-After when given, otherwise use full-jitter exponential backoff.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def fetch_json(self, url, params=None, label=None):
+        """
+        Fetch and decode one JSON document, retrying rate limits, 5xx responses and timeouts.
+        Returns None once every attempt has failed.
+        """
+        label = label or url
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            try:
+                with self._host_slot(url):
+                    response = self.transport.get(url, params=params, headers=self.headers, timeout=self.timeout)
+
+                if response.status_code == 429:  # Too Many Requests
+                    delay = self._backoff(attempt, _retry_after(response))
+                    logger.warning(f"Rate limit reached for {label}. Pausing all workers for {delay:.1f}s...")
+                    # Slow every worker down, not just this one
+                    self.bucket.pause(delay)
+                    continue
+                if response.status_code >= 500:
+                    if attempt == self.max_retries - 1:
+                        logger.warning(f"Server error {response.status_code} for {label}.")
+                        continue
+                    delay = self._backoff(attempt)
+                    logger.warning(f"Server error {response.status_code} for {label}. Retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+                    continue
+
+                response.raise_for_status()
+                return response.json()
+            except (requests.RequestException, ValueError) as e:
+                if attempt < self.max_retries - 1:
+                    delay = self._backoff(attempt)
+                    logger.warning(f"Error fetching {label}: {e}. Retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+                else:
+                    logger.error(f"Failed after {self.max_retries} attempts for {label}: {e}")
+                    return None
+
+        logger.error(f"Failed after {self.max_retries} attempts for {label}.")
+        return None
+
+    def map(self, jobs):
+        """
+        Run `(key, url, params)` jobs concurrently and yield `(key, data)` as each finishes.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_json, url, params, str(key)): key
+                for key, url, params in jobs
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def fetch_cities(self, country_names):
+        """
+        Fetch Nominatim city results for many countries, yielding `(country_name, results)`.
+        """
+        jobs = [(name, settings.NOMINATIM_URL, city_search_params(name)) for name in country_names]
+        for name, data in self.map(jobs):
+            yield name, data or []
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the function,
+    the others wait and receive its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+_default_transport = None
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_http_transport():
+    """
+    Process-wide transport for the external geo APIs: one pooled session, wrapped in the
+    on-disk response cache unless GEO_HTTP_CACHE_DIR is empty.
+    """
+    global _default_transport
+    with _default_fetcher_lock:
+        if _default_transport is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(settings.GEO_FETCH_WORKERS, 10))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _default_transport = RequestsTransport(session)
+            if settings.GEO_HTTP_CACHE_DIR:
+                _default_transport = CachingTransport(
+                    _default_transport, HttpResponseCache(settings.GEO_HTTP_CACHE_DIR, settings.GEO_HTTP_CACHE_TTL)
+                )
+        return _default_transport
+
+
+def http_cache_summary():
+    """
+    Hit/miss counters of the shared response cache, or None when caching is disabled.
+    """
+    transport = get_http_transport()
+    return transport.cache.summary() if isinstance(transport, CachingTransport) else None
+
+
+def get_city_fetcher():
+    """
+    Process-wide fetcher configured from settings, so every caller shares one rate limit.
+    """
+    global _default_fetcher
+    transport = get_http_transport()
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = ConcurrentFetcher(
+                transport=transport,
+                max_workers=settings.GEO_FETCH_WORKERS,
+                rate=settings.GEO_FETCH_RATE,
+                burst=settings.GEO_FETCH_BURST,
+                per_host=settings.GEO_FETCH_PER_HOST,
+                max_retries=settings.GEO_FETCH_MAX_RETRIES,
+                backoff_max=settings.GEO_FETCH_BACKOFF_MAX,
+            )
+        return _default_fetcher
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import logging
+import time
+from django.db import connection, transaction
+from myproject.models import Country, City, CountrySyncState
+from myproject.views.city_index import city_indexes
+from myproject.views.reference_data import bump_reference_version
+from myproject.views.spatial_index import spatial_index
+from myproject.views import snapshots
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Rows written per transaction by the bulk upserts
+BULK_BATCH_SIZE = 1000
+
+# Fields refreshed from upstream data on every sync
+COUNTRY_SYNC_FIELDS = ["name", "phone_code", "region", "subregion", "population", "flag_url"]
+CITY_SYNC_FIELDS = ["latitude", "longitude"]
+
+
+class SyncStats:
+    """
+    Row counters and throughput for a bulk sync run.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.unchanged
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (
+            f"{self.total} rows ({self.created} created, {self.updated} updated, "
+            f"{self.unchanged} unchanged) in {self.elapsed:.2f}s, {self.rows_per_second:.0f} rows/s"
+        )
+
+
+def chunked(iterable, size):
+    """
+    Yield lists of at most `size` items from any iterable.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_country_record(country_data):
+    """
+    Convert a RestCountries entry into `Country` field values, or None if it is unusable.
+    """
+    name = country_data.get("name", {}).get("common", "Unknown")
+
+    # Validate country code
+    country_code = country_data.get("cca2", "").upper()
+    if not country_code or len(country_code) != 2:
+        logger.warning(f"Skipping country with invalid/missing code: {name}")
+        return None
+
+    # Extract and clean phone code
+    root = country_data.get("idd", {}).get("root", "")
+    suffixes = country_data.get("idd", {}).get("suffixes") or []
+    # Several suffixes are area codes under a shared root (e.g. "+1"), not one long code
+    phone_code = (root + suffixes[0] if len(suffixes) == 1 else root).strip()
+    if len(phone_code) > 20:
+        logger.warning(f"Trimming phone code for {name} to 20 characters.")
+        phone_code = phone_code[:20]
+
+    return {
+        "code": country_code,
+        "name": name,
+        "phone_code": phone_code,
+        "region": country_data.get("region", ""),
+        "subregion": country_data.get("subregion", ""),
+        "population": country_data.get("population", 0),
+        "flag_url": country_data.get("flags", {}).get("png", ""),
+    }
+
+
+def parse_city_record(city_data, country_id):
+    """
+    Convert a Nominatim search result into `City` field values, or None if it has no name.
+    """
+    name = city_data.get("display_name", "").split(",")[0].strip()
+    if not name:
+        return None
+    return {
+        "name": name,
+        "country_id": country_id,
+        "latitude": _to_float(city_data.get("lat")),
+        "longitude": _to_float(city_data.get("lon")),
+    }
+
+
+def _to_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def content_hash(value):
+    """
+    Stable SHA-1 of a JSON-serializable value, independent of dict key order.
+    """
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def city_batch_hash(records):
+    """
+    Hash of a country's parsed city records, independent of upstream result order.
+    """
+    return content_hash(sorted((record["name"], record["latitude"], record["longitude"]) for record in records))
+
+
+def _apply_changes(obj, record, fields):
+    """
+    Copy changed field values from `record` onto `obj`; return the set of changed fields.
+    """
+    changed = set()
+    for field in fields:
+        if field in record and getattr(obj, field) != record[field]:
+            setattr(obj, field, record[field])
+            changed.add(field)
+    return changed
+
+
+def _bulk_insert(model, objs, unique_fields, update_fields):
+    """
+    Insert new rows, turning a concurrent insert of the same key into an update.
+    """
+    if not objs:
+        return
+    features = connection.features
+    if features.supports_update_conflicts_with_target:
+        model.objects.bulk_create(
+            objs, update_conflicts=True, unique_fields=unique_fields, update_fields=update_fields
+        )
+    elif features.supports_update_conflicts:
+        # MySQL: ON DUPLICATE KEY UPDATE, which does not take a conflict target
+        model.objects.bulk_create(objs, update_conflicts=True, update_fields=update_fields)
+    else:
+        model.objects.bulk_create(objs, ignore_conflicts=True)
+
+
+def bulk_upsert_countries(records, batch_size=BULK_BATCH_SIZE, stats=None, fields=COUNTRY_SYNC_FIELDS):
+    """
+    Upsert parsed country records keyed on `code`, one prefetch and one transaction per batch.
+    Only `fields` are compared and written for existing rows.
+    """
+    stats = stats or SyncStats()
+    for batch in chunked(records, batch_size):
+        # The last record wins when a batch repeats a code
+        by_code = {record["code"]: record for record in batch}
+
+        with transaction.atomic():
+            existing = {country.code: country for country in Country.objects.filter(code__in=list(by_code))}
+            to_create, to_update, changed_fields = [], [], set()
+            for code, record in by_code.items():
+                country = existing.get(code)
+                if country is None:
+                    to_create.append(Country(**record))
+                    continue
+                changes = _apply_changes(country, record, fields)
+                if changes:
+                    to_update.append(country)
+                    changed_fields |= changes
+                else:
+                    stats.unchanged += 1
+
+            _bulk_insert(Country, to_create, ["code"], fields)
+            if to_update:
+                # Only write the columns that actually changed somewhere in this batch
+                Country.objects.bulk_update(to_update, [field for field in fields if field in changed_fields])
+
+        stats.created += len(to_create)
+        stats.updated += len(to_update)
+        logger.info(f"Country batch written: {len(to_create)} created, {len(to_update)} updated.")
+
+    # Bulk writes skip model signals, so invalidate cached reference data here
+    if stats.created or stats.updated:
+        bump_reference_version()
+        snapshots.invalidate("countries")
+    return stats
+
+
+def bulk_upsert_cities(records, batch_size=BULK_BATCH_SIZE, stats=None, fields=CITY_SYNC_FIELDS, should_replace=None):
+    """
+    Upsert parsed city records keyed on `(name, country_id)`, one prefetch and one transaction per batch.
+    Only `fields` are compared and written for existing rows; `should_replace(city, record)`
+    can veto the update of an existing row.
+    """
+    stats = stats or SyncStats()
+    for batch in chunked(records, batch_size):
+        # Nominatim often returns the same place name more than once; the last one wins
+        by_key = {(record["name"], record["country_id"]): record for record in batch}
+        names = {name for name, _ in by_key}
+        country_ids = {country_id for _, country_id in by_key}
+
+        with transaction.atomic():
+            existing = {
+                (city.name, city.country_id): city
+                for city in City.objects.filter(country_id__in=country_ids, name__in=names).only(
+                    "id", "name", "country_id", *fields
+                )
+            }
+            to_create, to_update, changed_fields = [], [], set()
+            for key, record in by_key.items():
+                city = existing.get(key)
+                if city is None:
+                    to_create.append(City(**record))
+                    continue
+                changes = (not should_replace or should_replace(city, record)) and _apply_changes(city, record, fields)
+                if changes:
+                    to_update.append(city)
+                    changed_fields |= changes
+                else:
+                    stats.unchanged += 1
+
+            _bulk_insert(City, to_create, ["name", "country"], fields)
+            if to_update:
+                City.objects.bulk_update(to_update, [field for field in fields if field in changed_fields])
+
+        # Bulk writes skip model signals, so drop the affected indexes here
+        changed_countries = {city.country_id for city in to_create + to_update}
+        city_indexes.invalidate(changed_countries)
+        snapshots.invalidate(*(f"cities/{country_id}" for country_id in changed_countries))
+        if to_create or to_update:
+            spatial_index.invalidate()
+
+        stats.created += len(to_create)
+        stats.updated += len(to_update)
+    return stats
+
+
+def save_sync_states(states):
+    """
+    Persist `CountrySyncState` rows touched by an incremental sync.
+    """
+    states = list(states)
+    with transaction.atomic():
+        CountrySyncState.objects.bulk_create([state for state in states if state.pk is None], batch_size=BULK_BATCH_SIZE)
+        CountrySyncState.objects.bulk_update(
+            [state for state in states if state.pk is not None],
+            ["record_hash", "cities_hash", "cities_synced_at"],
+            batch_size=BULK_BATCH_SIZE,
+        )
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    check_password, get_hasher, identify_hasher, is_password_usable, make_password
+)
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Log a full queue on the first rejection and then every this many
+REJECTION_LOG_INTERVAL = 100
+
+
+class PasswordHashingBusy(Exception):
+    """
+    The hashing queue stayed full for PASSWORD_HASHING_QUEUE_TIMEOUT seconds; the caller
+    should answer 503 rather than pile up more work.
+    """
+
+
+class PasswordHashingExecutor:
+    """
+    Runs password hashing and verification in a per-process pool of `workers` processes,
+    so that a burst of signups or logins is spread over the pool instead of every web
+    thread burning CPU at once. At most `max_pending` hashes are queued or running; a
+    caller that cannot get a slot within `queue_timeout` seconds gets `PasswordHashingBusy`.
+    With `workers=0` everything is hashed inline, in the calling thread, under the same cap.
+    """
+
+    def __init__(self, workers, max_pending, queue_timeout):
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.queue_timeout = queue_timeout
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # Spawned, not forked: web workers are multi-threaded and hold DB connections;
+                # django.setup gives the children the configured hashers
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=django.setup,
+                )
+            return self._pool
+
+    def _reset(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self):
+        """
+        Take a slot, waiting up to `queue_timeout` for one.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.rejected += 1
+            # Once per storm rather than once per request
+            if self.rejected % REJECTION_LOG_INTERVAL == 1:
+                logger.warning(
+                    f"Password hashing queue full ({self.max_pending} pending); {self.rejected} requests rejected so far"
+                )
+            raise PasswordHashingBusy("Too many password operations in progress. Please retry shortly.")
+
+    def _inline(self, fn, *args):
+        self._acquire()
+        try:
+            return fn(*args)
+        finally:
+            self._slots.release()
+
+    def submit(self, fn, *args):
+        """
+        Queue `fn(*args)` on the pool, waiting up to `queue_timeout` for a free slot.
+        """
+        self._acquire()
+        try:
+            pool = self._executor()
+            future = pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        future.pool = pool
+        return future
+
+    def _result(self, future, fn, args):
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            # A hashing process died: start a fresh pool and try once more
+            logger.error("Password hashing pool broke; restarting it")
+            self._reset(future.pool)
+            return self.submit(fn, *args).result()
+
+    def run(self, fn, *args):
+        if not self.workers:
+            return self._inline(fn, *args)
+        return self._result(self.submit(fn, *args), fn, args)
+
+    def map(self, fn, items):
+        """
+        `[fn(item) for item in items]`, with the items spread over the pool.
+        """
+        if not self.workers:
+            return [self._inline(fn, item) for item in items]
+        results = []
+        # A pool's worth of slots at a time, so that a large batch never waits on itself
+        for start in range(0, len(items), self.max_pending):
+            chunk = items[start:start + self.max_pending]
+            futures = [self.submit(fn, item) for item in chunk]
+            results.extend(self._result(future, fn, (item,)) for future, item in zip(futures, chunk))
+        return results
+
+    async def arun(self, fn, *args):
+        if not self.workers:
+            return await sync_to_async(self._inline, thread_sensitive=False)(fn, *args)
+        # Waiting for a slot blocks, so do it off the event loop
+        future = await sync_to_async(self.submit, thread_sensitive=False)(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            return await sync_to_async(self._result, thread_sensitive=False)(future, fn, args)
+
+
+password_executor = PasswordHashingExecutor(
+    workers=settings.PASSWORD_HASHING_WORKERS,
+    max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+    queue_timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT,
+)
+
+
+def hash_password(raw_password):
+    """
+    `make_password` on the hashing pool.
+    """
+    return password_executor.run(make_password, raw_password)
+
+
+async def ahash_password(raw_password):
+    return await password_executor.arun(make_password, raw_password)
+
+
+def hash_passwords(raw_passwords):
+    """
+    Hash many passwords at once, in parallel across the pool.
+    """
+    return password_executor.map(make_password, list(raw_passwords))
+
+
+def verify_password(raw_password, encoded):
+    """
+    `check_password` on the hashing pool (without the rehash setter; see `needs_rehash`).
+    """
+    if raw_password is None or not is_password_usable(encoded):
+        return False
+    return password_executor.run(check_password, raw_password, encoded)
+
+
+async def averify_password(raw_password, encoded):
+    if raw_password is None or not is_password_usable(encoded):
+        return False
+    return await password_executor.arun(check_password, raw_password, encoded)
+
+
+def needs_rehash(encoded):
+    """
+    Whether a (verified) hash should be re-encoded with the preferred hasher and its
+    current work factor, as Django's own `check_password` would do.
+    """
+    preferred = get_hasher("default")
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
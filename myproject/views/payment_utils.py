@@ -2,6 +2,7 @@ from django.conf import settings
 import logging
 from django.utils.timezone import now
 from myproject.models import Payment, CourseSelection, RegistrationStep
+from myproject.views.review_summary import invalidate_review_summary
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -43,6 +44,7 @@ def update_payment_status(user, message, amount):
         )
         # Update CourseSelection
         CourseSelection.objects.filter(user=user).update(payment_status="Completed")
+        invalidate_review_summary(user.id)  # update() skips the model signals
 
         # Update Registration Progress
         RegistrationStep.objects.update_or_create(
@@ -0,0 +1,91 @@
+import re
+from django.core.exceptions import ValidationError
+
+# E.164: at most 15 digits including the country calling code (stored with the "+", so
+# phone number columns need at least 16 characters)
+MAX_PHONE_DIGITS = 15
+MIN_PHONE_DIGITS = 7
+
+_SEPARATORS = re.compile(r"[\s().-]")
+
+
+def normalize_phone_number(value):
+    """
+    Strip common separators ("+1 (876) 555-0100" -> "+18765550100").
+    """
+    return _SEPARATORS.sub("", value or "")
+
+
+class _Node:
+    __slots__ = ("children", "countries")
+
+    def __init__(self):
+        self.children = {}
+        self.countries = None
+
+
+class PhonePrefixTrie:
+    """
+    Digit trie over country calling codes for longest-prefix matching.
+
+    Several countries can share a code (e.g. "+1", "+7"); they are kept together on
+    one node, most populous first.
+    """
+
+    def __init__(self, countries=()):
+        self.root = _Node()
+        self.size = 0
+        for country in sorted(countries, key=lambda country: -(country.get("population") or 0)):
+            self.insert(country["phone_code"], country)
+
+    def insert(self, phone_code, country):
+        digits = normalize_phone_number(phone_code).lstrip("+")
+        if not digits.isdigit():
+            return
+        node = self.root
+        for digit in digits:
+            node = node.children.setdefault(digit, _Node())
+        if node.countries is None:
+            node.countries = []
+        node.countries.append(country)
+        self.size += 1
+
+    def lookup(self, phone_number):
+        """
+        `(prefix, countries)` for the longest calling code `phone_number` starts with,
+        or None when no code matches. Runs in O(len(phone_number)).
+        """
+        node, match = self.root, None
+        digits = normalize_phone_number(phone_number).lstrip("+")
+        for position, digit in enumerate(digits):
+            node = node.children.get(digit)
+            if node is None:
+                break
+            if node.countries:
+                match = ("+" + digits[: position + 1], node.countries)
+        return match
+
+
+def validate_phone_number(value, trie):
+    """
+    Check the format of an international number and that it starts with a known
+    calling code. Returns `(normalized_number, prefix, countries)`.
+    """
+    number = normalize_phone_number(value)
+    if not number.startswith("+") or not number[1:].isdigit():
+        raise ValidationError("Phone number must start with '+' and include only digits after.", code="format")
+    if not MIN_PHONE_DIGITS <= len(number) - 1 <= MAX_PHONE_DIGITS:
+        raise ValidationError(
+            f"Phone number must have between {MIN_PHONE_DIGITS} and {MAX_PHONE_DIGITS} digits.", code="length"
+        )
+
+    # With no country data loaded there is nothing to check the prefix against
+    if not trie.size:
+        return number, None, []
+    match = trie.lookup(number)
+    if match is None:
+        raise ValidationError(
+            "Phone number does not start with a known country calling code.", code="unknown_prefix"
+        )
+    prefix, countries = match
+    return number, prefix, countries
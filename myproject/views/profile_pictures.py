@@ -0,0 +1,240 @@
+import io
+import logging
+import os
+import uuid
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+from PIL import Image, ImageOps, UnidentifiedImageError
+from myproject.models import ProfilePictureJob
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# A claimed job is invisible to other workers for this long
+CLAIM_LEASE = timedelta(minutes=10)
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = timedelta(minutes=1)
+
+# Allowance for the other form fields when judging a request from its declared length
+MAX_FORM_OVERHEAD = 64 * 1024
+
+# Image formats accepted as uploads (as identified from the file header, not the name)
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+
+# (name, longest side, format); largest first, each rendered from the previous one
+VARIANTS = [
+    ("large", 1024, "WEBP"),
+    ("medium", 512, "WEBP"),
+    ("fallback", 512, "JPEG"),
+    ("thumb", 128, "WEBP"),
+]
+DISPLAY_VARIANT = "large"
+ENCODE_OPTIONS = {
+    "WEBP": {"quality": 80, "method": 4},
+    "JPEG": {"quality": 85, "optimize": True, "progressive": True},
+}
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+# Errors that retrying will not fix: the staged file is not a usable image
+INVALID_IMAGE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, SyntaxError)
+
+
+def staged_path(name):
+    return os.path.join(settings.PROFILE_PICTURE_STAGING_DIR, name)
+
+
+def discard_staged(name):
+    try:
+        os.remove(staged_path(name))
+    except FileNotFoundError:
+        pass
+
+
+def variant_urls(variants):
+    """
+    Public URLs of a picture's variants, by variant name.
+    """
+    return {name: default_storage.url(path) for name, path in (variants or {}).items()}
+
+
+def check_image_header(path):
+    """
+    Identify the image at `path` from its header only (Pillow decodes pixels lazily)
+    and enforce the format and pixel-count limits. Returns (format, width, height).
+    """
+    try:
+        with Image.open(path) as image:
+            image_format, (width, height) = image.format, image.size
+    except INVALID_IMAGE_ERRORS + (OSError,):
+        raise ValidationError("Upload a valid image (JPEG, PNG, WebP or GIF).")
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError(f"Unsupported image format: {image_format}.")
+    if width * height > settings.PROFILE_PICTURE_MAX_PIXELS:
+        raise ValidationError(f"Image is too large ({width}x{height} pixels).")
+    return image_format, width, height
+
+
+def stage_upload(upload):
+    """
+    Move (or stream, for in-memory uploads) `upload` into the staging directory without
+    reading it whole, and validate it from its header. Returns the staged file name.
+    """
+    if upload.size > settings.PROFILE_PICTURE_MAX_BYTES:
+        raise ValidationError(
+            f"Profile picture must be at most {settings.PROFILE_PICTURE_MAX_BYTES // (1024 * 1024)}MB."
+        )
+    os.makedirs(settings.PROFILE_PICTURE_STAGING_DIR, exist_ok=True)
+    name = uuid.uuid4().hex
+    path = staged_path(name)
+    if hasattr(upload, "temporary_file_path"):
+        # Django already spooled a large upload to disk: a rename, not a copy
+        file_move_safe(upload.temporary_file_path(), path)
+    else:
+        with open(path, "wb") as staged:
+            for chunk in upload.chunks():
+                staged.write(chunk)
+
+    try:
+        image_format, width, height = check_image_header(path)
+    except ValidationError:
+        discard_staged(name)
+        raise
+    logger.info(f"Staged profile picture {name}: {image_format} {width}x{height}, {upload.size} bytes")
+    return name
+
+
+def enqueue_profile_picture(personal_info, source):
+    """
+    Queue the staged picture `source` for rendering. Call inside the transaction that saves
+    `personal_info`; a picture still waiting from an earlier upload is dropped.
+    """
+    job, created = ProfilePictureJob.objects.select_for_update().get_or_create(
+        personal_info=personal_info, defaults={"source": source}
+    )
+    if not created:
+        if job.status == "Pending" and job.source != source:
+            # Not discarded if the transaction rolls back after this, but then the old one is replaced anyway
+            transaction.on_commit(lambda previous=job.source: discard_staged(previous))
+        job.source, job.status, job.attempts = source, "Pending", 0
+        job.next_attempt_at, job.last_error = now(), None
+        job.save()
+    logger.info(f"Queued profile picture for {personal_info.user_id}")
+    return job
+
+
+def render_variants(path):
+    """
+    Render every variant of the image at `path`. Runs in a worker process and returns
+    {name: (extension, encoded bytes)}.
+    """
+    largest = VARIANTS[0][1]
+    with Image.open(path) as image:
+        # JPEG: let the decoder scale down by up to 8x instead of decoding full size
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+        rendered = {}
+        for name, side, image_format in VARIANTS:
+            image.thumbnail((side, side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            variant = image
+            if image_format == "JPEG" and image.mode == "RGBA":
+                variant = Image.new("RGB", image.size, (255, 255, 255))
+                variant.paste(image, mask=image.getchannel("A"))
+            buffer = io.BytesIO()
+            variant.save(buffer, image_format, **ENCODE_OPTIONS[image_format])
+            rendered[name] = (EXTENSIONS[image_format], buffer.getvalue())
+    return rendered
+
+
+def claim_picture_jobs(limit):
+    """
+    Lease up to `limit` due jobs so that concurrent workers don't render them twice.
+    """
+    with transaction.atomic():
+        due = ProfilePictureJob.objects.filter(status="Pending", next_attempt_at__lte=now()).order_by("next_attempt_at")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        jobs = list(due.select_related("personal_info")[:limit])
+        ProfilePictureJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            next_attempt_at=now() + CLAIM_LEASE, attempts=F("attempts") + 1
+        )
+    return jobs
+
+
+def _store_variants(job, rendered):
+    personal_info = job.personal_info
+    folder = f"profile_pictures/{personal_info.user_id}/{uuid.uuid4().hex[:12]}"
+    variants = {
+        name: default_storage.save(f"{folder}/{name}.{extension}", ContentFile(content))
+        for name, (extension, content) in rendered.items()
+    }
+
+    with transaction.atomic():
+        # A newer upload replaced this job's source while it rendered: drop this result
+        if not ProfilePictureJob.objects.select_for_update().filter(id=job.id, source=job.source).exists():
+            stale, variants = variants, personal_info.profile_picture_variants
+        else:
+            stale = personal_info.profile_picture_variants
+            personal_info.profile_picture = variants[DISPLAY_VARIANT]
+            personal_info.profile_picture_variants = variants
+            personal_info.save(update_fields=["profile_picture", "profile_picture_variants", "updated_at"])
+            ProfilePictureJob.objects.filter(id=job.id).update(status="Done", last_error=None)
+
+    for path in (stale or {}).values():
+        if path not in variants.values():
+            default_storage.delete(path)
+
+
+def run_picture_batch(executor, limit=100):
+    """
+    Claim a batch of jobs, render them on `executor` (a process pool the caller keeps
+    across batches) and store the variants. Returns (done, to retry, failed).
+    """
+    jobs = claim_picture_jobs(limit)
+    futures = {executor.submit(render_variants, staged_path(job.source)): job for job in jobs}
+    done, retry, failed = [], [], []
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            _store_variants(job, future.result())
+            done.append(job)
+        except (FileNotFoundError,) + INVALID_IMAGE_ERRORS as e:
+            logger.error(f"Profile picture {job.source} cannot be rendered: {e}")
+            failed.append((job, str(e)))
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            logger.warning(f"Profile picture {job.source} not rendered (attempt {job.attempts + 1}): {e}")
+            retry.append((job, str(e)))
+
+    _finish_jobs(done, retry, failed)
+    retried = sum(1 for job, _ in retry if job.attempts + 1 < MAX_ATTEMPTS)
+    return len(done), retried, len(failed) + len(retry) - retried
+
+
+def _finish_jobs(done, retry, failed):
+    for job in done:
+        discard_staged(job.source)
+    for job, error in retry:
+        # `attempts` was already incremented when the job was claimed
+        attempts = job.attempts + 1
+        if attempts >= MAX_ATTEMPTS:
+            failed.append((job, error))
+        else:
+            ProfilePictureJob.objects.filter(id=job.id, source=job.source).update(
+                next_attempt_at=now() + RETRY_BACKOFF * 2 ** (attempts - 1), last_error=error
+            )
+    for job, error in failed:
+        if ProfilePictureJob.objects.filter(id=job.id, source=job.source).update(status="Failed", last_error=error):
+            discard_staged(job.source)
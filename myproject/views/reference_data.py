@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from myproject.models import Country
+from myproject.views.phone_prefix import PhonePrefixTrie
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Shared version stamp; every worker drops its in-memory copy when it changes
+REFERENCE_VERSION_KEY = "reference_data:version"
+
+
+def serialize(data):
+    """
+    Encode a payload exactly like `JsonResponse` does and return `(body, etag)`.
+    """
+    body = json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+    return body, hashlib.sha1(body).hexdigest()
+
+
+def bump_reference_version():
+    """
+    Invalidate the reference data held by every worker.
+    """
+    try:
+        cache.incr(REFERENCE_VERSION_KEY)
+    except ValueError:
+        # Key missing or evicted: any new value differs from what workers hold
+        cache.set(REFERENCE_VERSION_KEY, int(time.time() * 1000), None)
+    reference_data.expire()
+
+
+class ReferenceDataCache:
+    """
+    Per-process copy of the serialized country list, the `country_id -> phone_code` map
+    and the calling-code trie.
+
+    The shared version stamp is read at most once per `check_interval` seconds, so
+    steady-state requests are served from memory without touching the database.
+    """
+
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._countries = None
+        self._phone_codes = None
+        self._phone_trie = None
+
+    def expire(self):
+        """
+        Force the next access to re-read the version stamp.
+        """
+        self._checked_at = 0.0
+
+    def _refresh(self):
+        current = time.monotonic()
+        if current - self._checked_at < self.check_interval:
+            return
+        cache.add(REFERENCE_VERSION_KEY, 1, None)
+        version = cache.get(REFERENCE_VERSION_KEY)
+        with self._lock:
+            self._checked_at = current
+            if version != self._version:
+                logger.info(f"Reference data version changed to {version}; dropping cached copies.")
+                self._version = version
+                self._countries = None
+                self._phone_codes = None
+                self._phone_trie = None
+
+    def countries(self):
+        """
+        `(body, etag)` for the country list served by `get_countries`.
+        """
+        self._refresh()
+        if self._countries is None:
+            countries = list(Country.objects.values("id", "name", "phone_code").order_by("name"))
+            with self._lock:
+                self._countries = serialize(countries)
+        return self._countries
+
+    def phone_code(self, country_id):
+        """
+        `(body, etag)` for `get_phone_code`, or None when the country does not exist.
+        """
+        self._refresh()
+        if self._phone_codes is None:
+            phone_codes = {
+                country_id: serialize({"phone_code": phone_code})
+                for country_id, phone_code in Country.objects.values_list("id", "phone_code")
+            }
+            with self._lock:
+                self._phone_codes = phone_codes
+        return self._phone_codes.get(country_id)
+
+    def has_country(self, country_id):
+        return self.phone_code(country_id) is not None
+
+    def phone_trie(self):
+        """
+        `PhonePrefixTrie` over every country's calling code.
+        """
+        self._refresh()
+        if self._phone_trie is None:
+            trie = PhonePrefixTrie(
+                Country.objects.exclude(phone_code__isnull=True).exclude(phone_code="").values(
+                    "id", "name", "code", "phone_code", "population"
+                )
+            )
+            with self._lock:
+                self._phone_trie = trie
+        return self._phone_trie
+
+
+reference_data = ReferenceDataCache(check_interval=settings.REFERENCE_CACHE_CHECK_INTERVAL)
@@ -0,0 +1,397 @@
+import logging
+import re
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.timezone import now
+from myproject.models import (
+    AccountCreation, PersonalInformation, AddressDetails, EducationalBackground,
+    CourseSelection, RegistrationStep, Country, City, CityEnrichmentJob, Course
+)
+from myproject.views import snapshots
+from myproject.views.city_index import city_indexes
+from myproject.views.email_filter import email_filter, filter_key
+from myproject.views.email_outbox import enqueue_emails
+from myproject.views.password_hashing import hash_passwords
+from myproject.views.phone_prefix import validate_phone_number
+from myproject.views.reference_data import reference_data
+from myproject.views.spatial_index import spatial_index
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Step payload keys in registration order, with the step each one completes
+STEPS = [
+    ("account", 1),
+    ("personal_information", 2),
+    ("address_details", 3),
+    ("educational_background", 4),
+    ("course_selection", 5),
+]
+
+GENDERS = {choice for choice, _ in PersonalInformation._meta.get_field("gender").choices}
+DEGREES = {choice for choice, _ in EducationalBackground.DEGREE_CHOICES}
+
+
+def validate_password_strength(password):
+    """
+    Validate password strength.
+    """
+    if len(password) < 8:
+        return False
+    if not re.search(r"[A-Z]", password):  # At least one uppercase
+        return False
+    if not re.search(r"[a-z]", password):  # At least one lowercase
+        return False
+    if not re.search(r"\d", password):  # At least one digit
+        return False
+    if not re.search(r"[@$!%*?&]", password):  # At least one special character
+        return False
+    return True
+
+
+def bundle_discount(course_count, total_fee):
+    """
+    Discount for bundled courses: 10% when more than 3 courses are selected.
+    """
+    discount_percentage = 10 if course_count > 3 else 0
+    return (total_fee * discount_percentage) / 100
+
+
+def existing_email_keys(emails):
+    """
+    Case-folded keys (`filter_key`) of the registered accounts among `emails`. MySQL's
+    unique index on email is case-insensitive, so "Foo@x.com" must count as taken when
+    "foo@x.com" is registered; its collation finds such variants through the index, and
+    the lowercased forms are looked up too for case-sensitive backends.
+    """
+    lookup = set(emails) | {filter_key(email) for email in emails}
+    registered = AccountCreation.objects.filter(email__in=lookup).values_list("email", flat=True)
+    return {filter_key(email) for email in registered}
+
+
+def city_key(country_id, name):
+    """
+    Key of a city in the maps built by `RegistrationBatch`: names compare case-insensitively,
+    like MySQL's collation and the unique (name, country) index, so "paris" is "Paris".
+    """
+    return country_id, name.casefold()
+
+
+def _text(payload, key):
+    return str(payload.get(key) or "").strip()
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RegistrationBatch:
+    """
+    Validates the step payloads of one or more students together and writes them in a
+    single transaction: a handful of reads for all reference lookups, then one bulk
+    insert per table and one `RegistrationStep` row per student.
+
+    Each student is a dict keyed by step name (see `STEPS`) whose values use the same
+    fields as the individual step endpoints. `account` is required; later steps may be
+    omitted, and the student's step is set to the last one submitted.
+    """
+
+    def __init__(self, students):
+        self.students = students
+        self.errors = [{} for _ in students]
+        self._accounts = []
+
+    def validate(self):
+        """
+        Check every step of every student. Returns True when nothing failed; otherwise
+        `errors[i]` maps step name to message for student `i`.
+        """
+        self._load_references()
+        seen_emails = set()
+        for index, student in enumerate(self.students):
+            for step, _ in STEPS:
+                payload = student.get(step)
+                if payload is None:
+                    if step == "account":
+                        self.errors[index][step] = "Account details are required."
+                    continue
+                if not isinstance(payload, dict):
+                    self.errors[index][step] = "Step payload must be an object."
+                    continue
+                try:
+                    getattr(self, f"_check_{step}")(payload, seen_emails)
+                except ValidationError as e:
+                    self.errors[index][step] = e.messages[0]
+        return not any(self.errors)
+
+    def drop_invalid(self):
+        """
+        Remove the students that failed validation so that the rest can be saved on their
+        own. Returns `[(index, errors)]` for the dropped students, by original position.
+        """
+        dropped = [(index, errors) for index, errors in enumerate(self.errors) if errors]
+        self.students = [student for student, errors in zip(self.students, self.errors) if not errors]
+        self.errors = [{} for _ in self.students]
+        self._accounts = []
+        return dropped
+
+    def _load_references(self):
+        emails, country_ids, nationalities, course_ids = set(), set(), set(), set()
+        for student in self.students:
+            account = student.get("account") or {}
+            emails.add(AccountCreation.objects.normalize_email(_text(account, "email")))
+            personal = student.get("personal_information") or {}
+            nationalities.add(_text(personal, "nationality").lower())
+            address = student.get("address_details") or {}
+            country_ids.add(_as_int(address.get("country")))
+            selection = student.get("course_selection") or {}
+            if isinstance(selection.get("courses"), list):
+                course_ids.update(_as_int(course_id) for course_id in selection["courses"])
+
+        self.existing_emails = existing_email_keys(emails)
+        countries = list(
+            Country.objects.annotate(lower_name=Lower("name")).filter(
+                Q(id__in=country_ids - {None}) | Q(lower_name__in=nationalities - {""})
+            )
+        )
+        self.countries_by_id = {country.id: country for country in countries}
+        self.countries_by_name = {country.lower_name: country for country in countries}
+        self.courses = Course.objects.in_bulk(course_ids - {None})
+        self.phone_trie = reference_data.phone_trie()
+
+    def _check_account(self, payload, seen_emails):
+        email = AccountCreation.objects.normalize_email(_text(payload, "email"))
+        password = _text(payload, "password")
+        if not email or not password or not _text(payload, "first_name") or not _text(payload, "last_name"):
+            raise ValidationError("Email, password, first name, and last name are required.")
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValidationError("Invalid email format.")
+        if filter_key(email) in self.existing_emails or filter_key(email) in seen_emails:
+            raise ValidationError("An account with this email already exists.")
+        if not self._password_acceptable(password):
+            raise ValidationError(
+                "Password must be at least 8 characters long, "
+                "contain one uppercase letter, one lowercase letter, "
+                "one number, and one special character."
+            )
+        seen_emails.add(filter_key(email))
+
+    def _password_acceptable(self, password):
+        return validate_password_strength(password)
+
+    def _check_personal_information(self, payload, seen_emails):
+        if _text(payload, "nationality").lower() not in self.countries_by_name:
+            raise ValidationError("Invalid nationality name.")
+        if _text(payload, "gender") not in GENDERS:
+            raise ValidationError(f"Gender must be one of: {', '.join(sorted(GENDERS))}.")
+        validate_phone_number(_text(payload, "phone_number"), self.phone_trie)
+        try:
+            dob = datetime.strptime(_text(payload, "date_of_birth"), "%Y-%m-%d").date()
+        except ValueError:
+            raise ValidationError("Invalid date of birth format. Use 'YYYY-MM-DD'.")
+        if (datetime.now().date() - dob).days // 365 < 18:
+            raise ValidationError("User must be at least 18 years old.")
+
+    def _check_address_details(self, payload, seen_emails):
+        if _as_int(payload.get("country")) not in self.countries_by_id:
+            raise ValidationError("Invalid country ID.")
+        if not _text(payload, "city") or not _text(payload, "streetAddress"):
+            raise ValidationError("Street address and city are required.")
+        postal_code = _text(payload, "postalCode")
+        if not postal_code.isdigit() or len(postal_code) < 4 or len(postal_code) > 10:
+            raise ValidationError("Invalid postal code format.")
+        validate_phone_number(_text(payload, "phoneNumber"), self.phone_trie)
+
+    def _check_educational_background(self, payload, seen_emails):
+        if not _text(payload, "degree") or not _text(payload, "institution") or not payload.get("graduation_year"):
+            raise ValidationError("Degree, Institution, and Graduation Year are required.")
+        if _text(payload, "degree") not in DEGREES:
+            raise ValidationError(f"Degree must be one of: {', '.join(sorted(DEGREES))}.")
+        graduation_year = _text(payload, "graduation_year")
+        if not graduation_year.isdigit() or int(graduation_year) < 1900 or int(graduation_year) > now().year:
+            raise ValidationError("Graduation year must be a valid year between 1900 and the current year.")
+
+    def _check_course_selection(self, payload, seen_emails):
+        course_ids = payload.get("courses")
+        if not isinstance(course_ids, list) or not course_ids:
+            raise ValidationError("At least one course must be selected.")
+        if any(_as_int(course_id) not in self.courses for course_id in course_ids):
+            raise ValidationError("One or more selected courses are invalid.")
+        study_duration = _as_int(payload.get("study_duration", 0))
+        if study_duration is None or study_duration < 0:
+            raise ValidationError("Study duration must be a whole number of months.")
+
+    def prepare(self):
+        """
+        Build unsaved accounts, hashing passwords before the transaction opens so that
+        it only holds locks for the inserts.
+        """
+        self._accounts = []
+        for student, password in zip(self.students, self._hash_passwords()):
+            account = student["account"]
+            user = AccountCreation(
+                email=AccountCreation.objects.normalize_email(_text(account, "email")),
+                first_name=_text(account, "first_name"),
+                last_name=_text(account, "last_name"),
+                is_active=False,
+                email_verified=False,
+                password=password,
+            )
+            self._accounts.append(user)
+
+    def _hash_passwords(self):
+        # All passwords at once, spread over the hashing pool
+        return hash_passwords(_text(student["account"], "password") for student in self.students)
+
+    def save(self):
+        """
+        Insert every student's rows in one transaction. Returns `[(user, current_step)]`.
+        """
+        if not self._accounts:
+            self.prepare()
+
+        with transaction.atomic():
+            AccountCreation.objects.bulk_create(self._accounts)
+            # MySQL does not return primary keys from bulk inserts; read them back
+            users = AccountCreation.objects.in_bulk([user.email for user in self._accounts], field_name="email")
+            users = [users[user.email] for user in self._accounts]
+            cities = self._resolve_cities()
+
+            personal, addresses, educations, selections, steps = [], [], [], [], []
+            for user, student in zip(users, self.students):
+                current_step = max(number for step, number in STEPS if student.get(step) is not None)
+                if student.get("personal_information") is not None:
+                    personal.append(self._personal_information(user, student["personal_information"]))
+                if student.get("address_details") is not None:
+                    addresses.append(self._address_details(user, student["address_details"], cities))
+                if student.get("educational_background") is not None:
+                    educations.append(self._educational_background(user, student["educational_background"]))
+                if student.get("course_selection") is not None:
+                    selections.append(self._course_selection(user, student["course_selection"]))
+                step = RegistrationStep(user=user, current_step=current_step, last_visited=now())
+                step.update_progress()
+                steps.append(step)
+
+            PersonalInformation.objects.bulk_create(personal)
+            AddressDetails.objects.bulk_create(addresses)
+            EducationalBackground.objects.bulk_create(educations)
+            self._insert_course_selections(selections)
+            RegistrationStep.objects.bulk_create(steps)
+
+            # Verification emails go through the outbox, committed with the accounts
+            enqueue_emails([user.verification_email() for user in users])
+            AccountCreation.objects.bulk_update(users, ["verification_token"])
+
+        # Bulk inserts skip the signal that records new emails
+        email_filter.add(*(user.email for user in users))
+        logger.info(f"Registered {len(users)} students in one batch.")
+        return [(user, step.current_step) for user, step in zip(users, steps)]
+
+    def _resolve_cities(self):
+        """
+        `city_key(country_id, name) -> City` for every address, creating missing cities
+        and queueing their enrichment.
+        """
+        wanted = {
+            (int(student["address_details"]["country"]), _text(student["address_details"], "city"))
+            for student in self.students if student.get("address_details") is not None
+        }
+        return self._cities_for(wanted) if wanted else {}
+
+    def _cities_for(self, wanted):
+        def lookup():
+            return {
+                city_key(city.country_id, city.name): city
+                for city in City.objects.annotate(lower_name=Lower("name")).filter(
+                    country_id__in={country_id for country_id, _ in wanted},
+                    lower_name__in={name.lower() for _, name in wanted},
+                )
+            }
+
+        cities = lookup()
+        # `city_key -> (country_id, name)`, one spelling per city to create
+        missing = {city_key(*city): city for city in wanted if city_key(*city) not in cities}
+        if missing:
+            City.objects.bulk_create(
+                [City(country_id=country_id, name=name) for country_id, name in missing.values()], ignore_conflicts=True
+            )
+            cities = lookup()
+            CityEnrichmentJob.objects.bulk_create(
+                [CityEnrichmentJob(city=cities[key], country_id=key[0]) for key in missing], ignore_conflicts=True
+            )
+            # Bulk inserts skip the model signals that maintain these
+            country_ids = {country_id for country_id, _ in missing}
+            city_indexes.invalidate(country_ids)
+            spatial_index.invalidate()
+            snapshots.invalidate(*(f"cities/{country_id}" for country_id in country_ids))
+            logger.info(f"Created {len(missing)} cities from batch registration.")
+        return cities
+
+    def _personal_information(self, user, payload):
+        phone_number, _, _ = validate_phone_number(_text(payload, "phone_number"), self.phone_trie)
+        return PersonalInformation(
+            user=user,
+            date_of_birth=datetime.strptime(_text(payload, "date_of_birth"), "%Y-%m-%d").date(),
+            gender=_text(payload, "gender"),
+            phone_number=phone_number,
+            nationality=self.countries_by_name[_text(payload, "nationality").lower()],
+        )
+
+    def _address_details(self, user, payload, cities):
+        phone_number, _, _ = validate_phone_number(_text(payload, "phoneNumber"), self.phone_trie)
+        country = self.countries_by_id[int(payload["country"])]
+        return AddressDetails(
+            user=user,
+            street_address=_text(payload, "streetAddress"),
+            city=cities[city_key(country.id, _text(payload, "city"))],
+            country=country,
+            state=_text(payload, "state"),
+            postal_code=_text(payload, "postalCode"),
+            phone_number=phone_number,
+        )
+
+    def _educational_background(self, user, payload):
+        return EducationalBackground(
+            user=user,
+            degree=_text(payload, "degree"),
+            institution=_text(payload, "institution"),
+            field_of_study=_text(payload, "field_of_study"),
+            graduation_year=int(_text(payload, "graduation_year")),
+            certifications_honors=_text(payload, "honors") or None,
+        )
+
+    def _course_selection(self, user, payload):
+        # "1" and 1 are the same course; a repeat would break the through-table insert
+        courses = [self.courses[course_id] for course_id in dict.fromkeys(int(course_id) for course_id in payload["courses"])]
+        total_fee = sum(course.fee for course in courses)
+        selection = CourseSelection(
+            user=user,
+            study_duration=int(payload.get("study_duration", 0)),
+            # bulk_create skips `CourseSelection.save`, which would recompute this from the M2M
+            total_fee=total_fee - bundle_discount(len(courses), total_fee),
+        )
+        selection.selected = courses
+        return selection
+
+    def _insert_course_selections(self, selections):
+        if not selections:
+            return
+        CourseSelection.objects.bulk_create(selections)
+        saved = dict(
+            CourseSelection.objects.filter(user__in=[selection.user for selection in selections]).values_list("user_id", "id")
+        )
+        through = CourseSelection.courses.through
+        through.objects.bulk_create([
+            through(courseselection_id=saved[selection.user.id], course_id=course.id)
+            for selection in selections
+            for course in selection.selected
+        ])
@@ -0,0 +1,130 @@
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+from myproject.models import AccountCreation, EducationalBackground, CourseSelection, Payment
+from myproject.views.profile_pictures import variant_urls
+from myproject.views.user_context import cached_user_id, normalize_email, related_object, remember_user_id
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Columns of each section, in response order
+PERSONAL_FIELDS = [
+    "id", "user_id", "date_of_birth", "gender", "phone_number", "profile_picture", "profile_picture_variants",
+    "nationality_id",
+]
+ADDRESS_FIELDS = [
+    "id", "user_id", "country_id", "city_id", "street_address", "apartment_suite", "state", "postal_code", "phone_number",
+]
+EDUCATION_FIELDS = ["id", "degree", "institution", "field_of_study", "graduation_year", "certifications_honors"]
+PAYMENT_FIELDS = ["id", "payment_method", "transaction_id", "amount", "payment_status", "payment_date"]
+SELECTION_FIELDS = ["id", "study_duration", "total_fee", "payment_status"]
+
+_datetime_field = serializers.DateTimeField()
+
+
+def _summary_key(user_id):
+    return f"review_summary:{user_id}"
+
+
+def _plain(model, field, value):
+    """
+    JSON-ready form of a column value, formatted like the DRF serializers format it.
+    """
+    if isinstance(value, datetime):
+        return _datetime_field.to_representation(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # Some backends drop trailing zeros; DRF always shows the column's decimal places
+        return f"{value:.{model._meta.get_field(field).decimal_places}f}"
+    if isinstance(value, FieldFile):
+        return value.url if value else None
+    if field == "profile_picture_variants":
+        return variant_urls(value)
+    return value
+
+
+def _section(obj, fields):
+    # `*_id` columns are reported under the relation name, as the serializers do
+    return {field.removesuffix("_id"): _plain(type(obj), field, getattr(obj, field)) for field in fields} if obj else {}
+
+
+def _first_row(model, fields, prefix):
+    """
+    Subquery annotations for the columns of the user's first `model` row (in the model's
+    default ordering), so that they ride along on the user query.
+    """
+    rows = model.objects.filter(user=OuterRef("pk")).order_by(*(model._meta.ordering or ["pk"]))
+    return {f"{prefix}_{field}": Subquery(rows.values(field)[:1]) for field in fields}
+
+
+def _annotated_section(user, model, fields, prefix):
+    if getattr(user, f"{prefix}_id") is None:
+        return {}
+    section = {"user": user.id}
+    section.update({field: _plain(model, field, getattr(user, f"{prefix}_{field}")) for field in fields})
+    return section
+
+
+def build_review_summary(email):
+    """
+    Assemble the review summary for `email` in two queries: the user with its one-to-one
+    rows joined and its first education and payment rows as subqueries, then its course
+    selections with their course ids. Raises `AccountCreation.DoesNotExist`.
+    """
+    user = (
+        AccountCreation.objects.filter(email=email)
+        .select_related("personal_info", "address_details")
+        .annotate(**_first_row(EducationalBackground, EDUCATION_FIELDS, "education"))
+        .annotate(**_first_row(Payment, PAYMENT_FIELDS, "payment"))
+        .get()
+    )
+
+    # One row per (selection, course); selections without courses come back with None
+    selections = {}
+    for row in CourseSelection.objects.filter(user_id=user.id).values(*SELECTION_FIELDS, "courses"):
+        selection = selections.setdefault(row["id"], {
+            "id": row["id"],
+            "user": user.id,
+            "courses": [],
+            **{field: _plain(CourseSelection, field, row[field]) for field in SELECTION_FIELDS[1:]},
+        })
+        if row["courses"] is not None:
+            selection["courses"].append(row["courses"])
+
+    return user.id, {
+        "personal_information": _section(related_object(user, "personal_info"), PERSONAL_FIELDS),
+        "address_details": _section(related_object(user, "address_details"), ADDRESS_FIELDS),
+        "educational_background": _annotated_section(user, EducationalBackground, EDUCATION_FIELDS, "education"),
+        "selected_courses": list(selections.values()),
+        "payment_confirmation": _annotated_section(user, Payment, PAYMENT_FIELDS, "payment"),
+    }
+
+
+def review_summary(email):
+    """
+    The review summary for `email`, served from the shared cache when the user id is
+    known there, otherwise built and cached for REVIEW_SUMMARY_CACHE_TTL seconds.
+    """
+    email = normalize_email(email)
+    user_id = cached_user_id(email)
+    if user_id is not None:
+        cached = cache.get(_summary_key(user_id))
+        # The email -> id mapping can outlive an email change; the summary records its email
+        if cached is not None and cached[0] == email:
+            return cached[1]
+
+    user_id, summary = build_review_summary(email)
+    cache.set(_summary_key(user_id), (email, summary), settings.REVIEW_SUMMARY_CACHE_TTL)
+    remember_user_id(email, user_id, settings.REVIEW_SUMMARY_CACHE_TTL)
+    return summary
+
+
+def invalidate_review_summary(user_id):
+    cache.delete(_summary_key(user_id))
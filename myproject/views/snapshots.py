@@ -0,0 +1,297 @@
+import fcntl
+import gzip
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from myproject.models import Country, City, Course
+from myproject.serializers import CourseSerializer
+from myproject.views.reference_data import serialize
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip variants are published
+    brotli = None
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Snapshot names are "countries", "courses" and "cities/<country_id>"
+VERSION_LENGTH = 16
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Bodies above this size are brotli-compressed at a faster quality level
+BROTLI_MAX_QUALITY_SIZE = 2 ** 20
+
+# Encodings in order of preference, with the file suffix of their variant
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Marker file of a snapshot waiting to be republished
+STALE_SUFFIX = ".stale"
+
+
+def render_countries():
+    return list(Country.objects.values("id", "name", "phone_code").order_by("name"))
+
+
+def render_cities(country_id):
+    # Empty lists are not published so that `get_cities` can still fill them lazily
+    return list(City.objects.filter(country_id=country_id).values("id", "name").order_by("name")) or None
+
+
+def render_courses():
+    courses = Course.objects.all()
+    if not courses.exists():
+        return None
+    return {"courses": CourseSerializer(courses, many=True).data, "message": "Courses fetched successfully."}
+
+
+def renderer_for(name):
+    """
+    The function that renders the payload of snapshot `name`.
+    """
+    if name == "countries":
+        return render_countries
+    if name == "courses":
+        return render_courses
+    country_id = int(name.split("/")[1])
+    return lambda: render_cities(country_id)
+
+
+def _path(name, suffix=""):
+    return os.path.join(str(settings.SNAPSHOT_ROOT), *name.split("/")) + suffix
+
+
+def _write(path, data):
+    # Write-then-rename so that readers never see a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(data)
+        # mkstemp creates owner-only files; the front-end server may read these directly
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@contextmanager
+def _publish_lock(name):
+    # An OS lock in the shared snapshot directory: publishes of one name never overlap,
+    # whichever process (worker or deploy command) runs them
+    path = _path(name, ".lock")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def current_version(name):
+    """
+    Version of the published snapshot, "" when the last publish had nothing to publish,
+    or None when `name` was never published.
+    """
+    try:
+        with open(_path(name, ".current")) as pointer:
+            return pointer.read().strip()
+    except OSError:
+        return None
+
+
+def stale_age(name):
+    """
+    Seconds since `name` was first marked stale without being republished, or None.
+    """
+    try:
+        return max(time.time() - os.path.getmtime(_path(name, STALE_SUFFIX)), 0)
+    except OSError:
+        return None
+
+
+def _mark_stale(name):
+    path = _path(name, STALE_SUFFIX)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        # Created once: its age is that of the oldest change still unpublished
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+    except FileExistsError:
+        pass
+
+
+def stale_names():
+    """
+    Names of the snapshots marked stale, oldest first.
+    """
+    root = str(settings.SNAPSHOT_ROOT)
+    marked = []
+    for directory, _, files in os.walk(root):
+        for file_name in files:
+            if file_name.endswith(STALE_SUFFIX):
+                path = os.path.join(directory, file_name)
+                name = os.path.relpath(path, root)[:-len(STALE_SUFFIX)].replace(os.sep, "/")
+                try:
+                    marked.append((os.path.getmtime(path), name))
+                except OSError:
+                    continue
+    return [name for _, name in sorted(marked)]
+
+
+def publish(name, stale_only=False):
+    """
+    Render `name` and write it as `<name>.<version>.json` plus gzip and brotli variants,
+    then point `<name>.current` at it and prune old versions. Returns the version, or None
+    if there was nothing to publish (or, with `stale_only`, `name` was not stale).
+
+    The stale mark is cleared before rendering: a change committed meanwhile marks it
+    again, so at worst this publish is superseded by the next one, never left current.
+    """
+    with _publish_lock(name):
+        try:
+            os.remove(_path(name, STALE_SUFFIX))
+        except FileNotFoundError:
+            if stale_only:
+                return None
+
+        try:
+            data = renderer_for(name)()
+            if data is None:
+                _write(_path(name, ".current"), b"")
+                return None
+
+            body, etag = serialize(data)
+            version = etag[:VERSION_LENGTH]
+            base = _path(name, f".{version}.json")
+            if os.path.exists(base):
+                # Published again unchanged: keep it among the newest when pruning
+                os.utime(base)
+            else:
+                _write(base + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    # Quality 11 takes seconds on multi-megabyte city lists
+                    quality = 11 if len(body) < BROTLI_MAX_QUALITY_SIZE else 9
+                    _write(base + ".br", brotli.compress(body, quality=quality))
+                _write(base, body)
+            _write(_path(name, ".current"), version.encode())
+        except BaseException:
+            # Still stale: left for the next publish
+            _mark_stale(name)
+            raise
+        _prune(name, version)
+    logger.info(f"Published snapshot {name} version {version} ({len(body)} bytes)")
+    return version
+
+
+def _prune(name, current):
+    """
+    Delete all but the SNAPSHOT_KEEP_VERSIONS newest versions of `name`: clients holding a
+    recent versioned URL keep it working without every version piling up on disk.
+    """
+    prefix = os.path.basename(_path(name)) + "."
+    directory = os.path.dirname(_path(name))
+    versions = []
+    for file_name in os.listdir(directory):
+        version = file_name[len(prefix):-len(".json")]
+        if file_name.startswith(prefix) and file_name.endswith(".json") and len(version) == VERSION_LENGTH:
+            versions.append((os.path.getmtime(os.path.join(directory, file_name)), version))
+    versions.sort(reverse=True)
+    for _, version in versions[settings.SNAPSHOT_KEEP_VERSIONS:]:
+        if version == current:
+            continue
+        base = _path(name, f".{version}.json")
+        for path in (base + ".gz", base + ".br", base):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def invalidate(*names):
+    """
+    Mark snapshots stale once the current transaction commits. The `publish_snapshots
+    --watch` worker republishes them; reads keep getting the previous version meanwhile
+    (for up to SNAPSHOT_MAX_STALE_SECONDS).
+    """
+    def mark():
+        for name in names:
+            _mark_stale(name)
+
+    transaction.on_commit(mark)
+
+
+def versioned_url(name, version):
+    return f"/api/snapshots/{name}.{version}.json"
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def snapshot_response(request, name, version, immutable=False):
+    """
+    Serve the stored bytes of a snapshot version in the best encoding the client accepts
+    (304 when the client already holds that variant), or None if that version does not exist.
+    Each encoding has its own ETag, since the variants differ byte for byte.
+    """
+    base = _path(name, f".{version}.json")
+    accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING"))
+    variants = [
+        (base + suffix, encoding, f'"{version}-{suffix[1:]}"')
+        for encoding, suffix in ENCODINGS if encoding in accepted or "*" in accepted
+    ]
+    for path, encoding, etag in variants + [(base, None, f'"{version}"')]:
+        if not os.path.exists(path):
+            continue
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                with open(path, "rb") as variant:
+                    response = HttpResponse(variant.read(), content_type="application/json")
+            except OSError:
+                continue
+            if encoding:
+                response["Content-Encoding"] = encoding
+        break
+    else:
+        return None
+
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    return response
+
+
+def serve_current(request, name):
+    """
+    Serve the current snapshot of `name`. Nothing is rendered here: returns None when
+    there is no snapshot (it is queued for the publish worker) or it has been stale for
+    longer than SNAPSHOT_MAX_STALE_SECONDS, so that the caller falls back to its live path.
+    """
+    version = current_version(name)
+    if version is None:
+        _mark_stale(name)
+        return None
+    if not version:
+        return None
+    age = stale_age(name)
+    if age is not None and age > settings.SNAPSHOT_MAX_STALE_SECONDS:
+        return None
+    response = snapshot_response(request, name, version)
+    if response is not None and response.status_code == 200:
+        # Clients can switch to the immutable URL of this exact version
+        response["Content-Location"] = versioned_url(name, version)
+    return response
@@ -0,0 +1,232 @@
+import logging
+import math
+import threading
+import time
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from myproject.models import City
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 64
+MAX_NEIGHBOURS = 50
+
+# Shared version stamp; workers rebuild their index when it changes
+SPATIAL_VERSION_KEY = "city_spatial_index:version"
+
+
+def to_unit_vectors(latitudes, longitudes):
+    """
+    Map degrees to points on the unit sphere, where straight-line (chord) distance
+    grows monotonically with great-circle distance.
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in kilometres; works on scalars and NumPy arrays.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class CitySpatialIndex:
+    """
+    k-d tree over city coordinates stored as 3-D unit vectors.
+
+    Points are reordered so each node owns a contiguous slice; leaves are scanned
+    with vectorized NumPy distance computations.
+    """
+
+    def __init__(self, ids, latitudes, longitudes, leaf_size=LEAF_SIZE):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        points = to_unit_vectors(self.latitudes, self.longitudes)
+        order = np.arange(len(self.ids))
+
+        # Node arrays: slice bounds, split dimension/value and children (-1 for leaves)
+        self.starts, self.ends, self.dims, self.splits, self.lefts, self.rights = [], [], [], [], [], []
+        stack = [(0, len(order), None, None)] if len(order) else []
+        while stack:
+            start, end, parent, side = stack.pop()
+            node = len(self.starts)
+            if parent is not None:
+                (self.lefts if side == 0 else self.rights)[parent] = node
+            self.starts.append(start)
+            self.ends.append(end)
+            self.lefts.append(-1)
+            self.rights.append(-1)
+            if end - start <= leaf_size:
+                self.dims.append(-1)
+                self.splits.append(0.0)
+                continue
+
+            segment = points[order[start:end]]
+            dim = int(np.argmax(segment.max(axis=0) - segment.min(axis=0)))
+            middle = (end - start) // 2
+            partition = np.argpartition(segment[:, dim], middle)
+            order[start:end] = order[start:end][partition]
+            self.dims.append(dim)
+            self.splits.append(float(points[order[start + middle], dim]))
+            stack.append((start + middle, end, node, 1))
+            stack.append((start, start + middle, node, 0))
+
+        self.points = points[order]
+        self.ids = self.ids[order]
+        self.latitudes = self.latitudes[order]
+        self.longitudes = self.longitudes[order]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, latitude, longitude, k=5):
+        """
+        The k nearest cities as `[(city_id, distance_km), ...]`, closest first.
+        """
+        k = min(k, len(self.ids))
+        if k <= 0:
+            return []
+        query = to_unit_vectors([latitude], [longitude])[0]
+        best_d2 = np.full(k, np.inf)
+        best_rows = np.full(k, -1, dtype=np.int64)
+
+        worst = np.inf
+        # (node, squared distance from the query to the node's side of every split above it)
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= worst:
+                continue
+            dim = self.dims[node]
+            if dim == -1:
+                start, end = self.starts[node], self.ends[node]
+                d2 = ((self.points[start:end] - query) ** 2).sum(axis=1)
+                if len(d2) > k:
+                    nearest = np.argpartition(d2, k - 1)[:k]
+                    d2 = d2[nearest]
+                    rows = nearest + start
+                else:
+                    rows = np.arange(start, end)
+                candidates_d2 = np.concatenate((best_d2, d2))
+                candidates_rows = np.concatenate((best_rows, rows))
+                keep = np.argpartition(candidates_d2, k - 1)[:k]
+                best_d2, best_rows = candidates_d2[keep], candidates_rows[keep]
+                worst = best_d2.max()
+                continue
+
+            offset = query[dim] - self.splits[node]
+            near, far = (self.rights[node], self.lefts[node]) if offset >= 0 else (self.lefts[node], self.rights[node])
+            # The far side is only worth visiting if the splitting plane is closer than the k-th best
+            stack.append((far, max(bound, offset * offset)))
+            stack.append((near, bound))
+
+        rows = best_rows[np.argsort(best_d2)]
+        distances = haversine_km(latitude, longitude, self.latitudes[rows], self.longitudes[rows])
+        return [(int(city_id), float(distance)) for city_id, distance in zip(self.ids[rows], distances)]
+
+
+class SpatialIndexRegistry:
+    """
+    One process-wide index over every city with coordinates. After a change the
+    old index keeps serving while a single background thread builds the new one.
+    """
+
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self._index = None
+        self._version = None
+        self._checked_at = 0.0
+        self._building = False
+        self._lock = threading.Lock()
+
+    def _build(self, version):
+        started = time.monotonic()
+        rows = np.array(
+            City.objects.filter(latitude__isnull=False, longitude__isnull=False).values_list(
+                "id", "latitude", "longitude"
+            ),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        index = CitySpatialIndex(rows[:, 0], rows[:, 1], rows[:, 2])
+        with self._lock:
+            self._index, self._version, self._building = index, version, False
+        logger.info(f"Built city spatial index: {len(index)} cities in {time.monotonic() - started:.2f}s")
+        return index
+
+    def _build_in_background(self, version):
+        def run():
+            try:
+                self._build(version)
+            except Exception as e:
+                logger.error(f"Error rebuilding city spatial index: {e}")
+                with self._lock:
+                    self._building = False
+            finally:
+                # The thread got its own database connection; don't leak it
+                connection.close()
+
+        threading.Thread(target=run, name="city-spatial-index", daemon=True).start()
+
+    def get(self):
+        current = time.monotonic()
+        if self._index is not None and current - self._checked_at < self.check_interval:
+            return self._index
+
+        cache.add(SPATIAL_VERSION_KEY, 1, None)
+        version = cache.get(SPATIAL_VERSION_KEY)
+        self._checked_at = current
+        if self._index is None:
+            return self._build(version)
+        if version != self._version:
+            with self._lock:
+                start_build = not self._building
+                self._building = True
+            if start_build:
+                self._build_in_background(version)
+        return self._index
+
+    def invalidate(self):
+        try:
+            cache.incr(SPATIAL_VERSION_KEY)
+        except ValueError:
+            cache.set(SPATIAL_VERSION_KEY, int(time.time() * 1000), None)
+        self._checked_at = 0.0
+
+
+spatial_index = SpatialIndexRegistry(check_interval=settings.REFERENCE_CACHE_CHECK_INTERVAL)
+
+
+def nearest_cities(latitude, longitude, k=5):
+    """
+    Resolve the k nearest cities to `{"id", "name", "country", "distance_km"}` dicts.
+    """
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0) or math.isnan(latitude + longitude):
+        raise ValueError("Latitude must be within [-90, 90] and longitude within [-180, 180].")
+    neighbours = spatial_index.get().nearest(latitude, longitude, min(k, MAX_NEIGHBOURS))
+    details = {
+        city["id"]: city
+        for city in City.objects.filter(id__in=[city_id for city_id, _ in neighbours]).values(
+            "id", "name", "country_id", "country__name"
+        )
+    }
+    return [
+        {
+            "id": city_id,
+            "name": details[city_id]["name"],
+            "country_id": details[city_id]["country_id"],
+            "country": details[city_id]["country__name"],
+            "distance_km": round(distance, 3),
+        }
+        for city_id, distance in neighbours
+        if city_id in details
+    ]
@@ -0,0 +1,209 @@
+import csv
+import gzip
+import json
+from django.contrib.auth.hashers import identify_hasher
+from myproject.models import AccountCreation, Country, Course
+from myproject.views.password_hashing import hash_passwords
+from myproject.views.reference_data import reference_data
+from myproject.views.email_filter import filter_key
+from myproject.views.registration_batch import RegistrationBatch, _text, city_key, existing_email_keys
+
+# Flat (CSV) column -> step payload key, per registration step
+FLAT_COLUMNS = {
+    "account": {
+        "email": "email", "password": "password", "first_name": "first_name", "last_name": "last_name",
+    },
+    "personal_information": {
+        "date_of_birth": "date_of_birth", "gender": "gender", "phone_number": "phone_number",
+        "nationality": "nationality",
+    },
+    "address_details": {
+        "street_address": "streetAddress", "city": "city", "country": "country", "state": "state",
+        "postal_code": "postalCode", "address_phone_number": "phoneNumber",
+    },
+    "educational_background": {
+        "degree": "degree", "institution": "institution", "field_of_study": "field_of_study",
+        "graduation_year": "graduation_year", "honors": "honors",
+    },
+    "course_selection": {
+        "courses": "courses", "study_duration": "study_duration",
+    },
+}
+
+# Students validated and written per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# Separator between course IDs/names in the flat `courses` column
+COURSE_SEPARATOR = ";"
+
+
+def open_import(path):
+    """Open a plain or .gz student file as a text stream."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def detect_format(path):
+    """Guess the file format from its name: JSON lines or (by default) CSV."""
+    name = path.lower().removesuffix(".gz")
+    return "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_csv(stream):
+    """Yield `(line number, row)` from a CSV file with a header row of `FLAT_COLUMNS` names."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    """
+    Yield `(line number, row)` from a JSON-lines file; the row is None for a line that
+    is not a JSON object.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def row_to_student(row):
+    """
+    Step payloads for one imported row. A row keyed by step name (as accepted by the
+    batch registration endpoint) is used as is; a flat row is split by `FLAT_COLUMNS`,
+    leaving out the steps whose columns are all empty.
+    """
+    if "account" in row:
+        return row
+    student = {}
+    for step, columns in FLAT_COLUMNS.items():
+        payload = {key: row[column] for column, key in columns.items() if row.get(column) not in (None, "")}
+        if payload or step == "account":
+            student[step] = payload
+    address = student.get("address_details")
+    if address is not None and "phoneNumber" not in address and row.get("phone_number"):
+        # One phone number is usually all a school has
+        address["phoneNumber"] = row["phone_number"]
+    selection = student.get("course_selection")
+    if selection is not None and isinstance(selection.get("courses"), str):
+        selection["courses"] = [course.strip() for course in selection["courses"].split(COURSE_SEPARATOR) if course.strip()]
+    return student
+
+
+def is_encoded_password(password):
+    """Whether an imported password is already a Django password hash."""
+    try:
+        identify_hasher(password)
+    except ValueError:
+        return False
+    return True
+
+
+class ImportReferences:
+    """
+    Countries, courses and cities for a whole import, loaded once and shared by every
+    chunk instead of being queried per chunk. Countries resolve by ID, ISO code or name
+    and courses by ID or name, case-insensitively.
+    """
+
+    def __init__(self):
+        countries = list(Country.objects.all())
+        self.countries_by_id = {country.id: country for country in countries}
+        self.countries_by_name = {}
+        for country in countries:
+            self.countries_by_name[country.code.lower()] = country
+            self.countries_by_name[country.name.lower()] = country
+        self.courses = Course.objects.in_bulk()
+        self.course_ids = {}
+        for course in self.courses.values():
+            self.course_ids[str(course.id)] = course.id
+            self.course_ids[course.name.lower()] = course.id
+        self.phone_trie = reference_data.phone_trie()
+        # `city_key(country_id, name) -> City`, filled as chunks create or look up cities
+        self.cities = {}
+        # Case-folded emails accepted from earlier chunks, so that repeats across chunks are
+        # caught before their chunk is written (and in a dry run, where nothing is)
+        self.emails = set()
+
+    def country(self, value):
+        if isinstance(value, int):
+            return self.countries_by_id.get(value)
+        value = str(value).strip()
+        if value.isdigit():
+            return self.countries_by_id.get(int(value))
+        return self.countries_by_name.get(value.lower())
+
+    def resolve(self, student):
+        """
+        Replace country and course names in `student` with the IDs the step validators
+        expect. Returns `{step: message}` for references that do not exist.
+        """
+        errors = {}
+        address = student.get("address_details")
+        if isinstance(address, dict) and address.get("country") not in (None, ""):
+            country = self.country(address["country"])
+            if country is None:
+                errors["address_details"] = f"Unknown country: {address['country']}."
+            else:
+                address["country"] = country.id
+        selection = student.get("course_selection")
+        if isinstance(selection, dict) and isinstance(selection.get("courses"), list):
+            course_ids = [self.course_ids.get(str(course).strip().lower()) for course in selection["courses"]]
+            unknown = [str(course) for course, course_id in zip(selection["courses"], course_ids) if course_id is None]
+            if unknown:
+                errors["course_selection"] = f"Unknown courses: {', '.join(unknown)}."
+            else:
+                selection["courses"] = course_ids
+        return errors
+
+
+class StudentImportBatch(RegistrationBatch):
+    """
+    A `RegistrationBatch` for one chunk of a bulk import: references come from the
+    import's `ImportReferences`, so only the chunk's emails are queried, and accounts
+    may carry passwords that are already hashed (stored as is, without the strength
+    check that only applies to plain text).
+    """
+
+    def __init__(self, students, references):
+        super().__init__(students)
+        self.references = references
+
+    def _load_references(self):
+        references = self.references
+        emails = {
+            AccountCreation.objects.normalize_email(_text(student.get("account") or {}, "email"))
+            for student in self.students
+        }
+        self.existing_emails = existing_email_keys(emails)
+        self.existing_emails |= {filter_key(email) for email in emails} & references.emails
+        self.countries_by_id = references.countries_by_id
+        self.countries_by_name = references.countries_by_name
+        self.courses = references.courses
+        self.phone_trie = references.phone_trie
+
+    def _password_acceptable(self, password):
+        # The strength rules can only be checked on plain text
+        return is_encoded_password(password) or super()._password_acceptable(password)
+
+    def _hash_passwords(self):
+        passwords = [_text(student["account"], "password") for student in self.students]
+        # Only plain-text passwords go to the hashing pool
+        hashed = iter(hash_passwords(password for password in passwords if not is_encoded_password(password)))
+        return [password if is_encoded_password(password) else next(hashed) for password in passwords]
+
+    def _cities_for(self, wanted):
+        cities = self.references.cities
+        missing = {city for city in wanted if city_key(*city) not in cities}
+        if missing:
+            cities.update(super()._cities_for(missing))
+        return {city_key(*city): cities[city_key(*city)] for city in wanted}
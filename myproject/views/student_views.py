@@ -1,6 +1,5 @@
 # Django Imports
 from django.conf import settings
-import requests
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.http import JsonResponse
@@ -10,13 +9,12 @@ from django.utils.encoding import force_str, force_bytes
 from django.contrib.auth.tokens import default_token_generator
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
 
 # Logging
 import logging
 
 # Utilities
-import re
 from datetime import datetime
 
 # Third-Party Imports
@@ -35,15 +33,29 @@ from myproject.models import (
 # Project Serializers
 from myproject.serializers import (
     PersonalInformationSerializer, EducationalBackgroundSerializer,
-    AddressDetailsSerializer, CourseSelectionSerializer, PaymentSerializer
+    AddressDetailsSerializer, CourseSelectionSerializer, CourseSerializer, PaymentSerializer
 )
 
 # Utility Views
 from myproject.views.utility_views import (
-    fetch_countries_from_api, fetch_cities_from_nominatim,
-    fetch_states_from_nominatim, fetch_and_save_cities,
-    get_countries, get_cities, update_countries_and_cities,
-    get_phone_code
+    fetch_countries_from_api, fetch_states_from_nominatim,
+    fetch_and_save_cities, get_countries, get_cities,
+    update_countries_and_cities, get_phone_code
+)
+from myproject.views.enrichment_utils import enqueue_city_enrichment
+from myproject.views.phone_prefix import validate_phone_number
+from myproject.views.reference_data import reference_data
+from myproject.views import snapshots
+from myproject.views.user_context import find_user, related_object, resolve_user
+from myproject.views.review_summary import review_summary
+from myproject.views.profile_pictures import (
+    MAX_FORM_OVERHEAD, discard_staged, enqueue_profile_picture, stage_upload
+)
+from myproject.views.email_outbox import enqueue_email
+from myproject.views.email_filter import email_available
+from myproject.views.password_hashing import PasswordHashingBusy
+from myproject.views.registration_batch import (
+    RegistrationBatch, bundle_discount, validate_password_strength
 )
 
 # Payment Views and Utilities
@@ -60,9 +72,6 @@ from myproject.views.payment_utils import (
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Disable SSL verification for local development
-requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
-
 
 # Check Email Availability
 def check_email_availability(request):
@@ -74,8 +83,8 @@ def check_email_availability(request):
         if not email:
             return JsonResponse({"available": False, "error": "Email parameter is missing."}, status=400)
 
-        # Check email existence in database
-        is_available = not AccountCreation.objects.filter(email=email).exists()
+        # Bloom filter first; only emails it cannot rule out reach the database
+        is_available = email_available(email)
         return JsonResponse({"available": is_available}, status=200)
 
     except Exception as e:
@@ -133,29 +142,20 @@ class AccountCreationView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Create the user and save to database
-            user = AccountCreation.objects.create_user(
-                email=email,
-                password=password,
-                first_name=first_name,
-                last_name=last_name
-            )
-
-            # Send email verification
-            self._send_email_verification(user)
-
-            # Initialize registration step
-            RegistrationStep.objects.create(
-                user=user,
-                current_step=1,
-                last_visited=now()
-            )
+            # Create the user, queue its verification email and initialize the registration step together
+            create_student_account(email, password, first_name, last_name)
 
             return Response(
                 {"message": "Account created successfully. Verification email sent."},
                 status=status.HTTP_201_CREATED
             )
 
+        except PasswordHashingBusy as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"}
+            )
         except Exception as e:
             logger.error(f"Error during account creation: {e}")
             return Response(
@@ -177,37 +177,117 @@ class AccountCreationView(APIView):
         """
         Validate password strength.
         """
-        if len(password) < 8:
-            return False
-        if not re.search(r"[A-Z]", password):  # At least one uppercase
-            return False
-        if not re.search(r"[a-z]", password):  # At least one lowercase
-            return False
-        if not re.search(r"\d", password):  # At least one digit
-            return False
-        if not re.search(r"[@$!%*?&]", password):  # At least one special character
-            return False
-        return True
+        return validate_password_strength(password)
 
-    def _send_email_verification(self, user):
-        """
-        Simulates sending an email verification (Disable SSL verification for local development).
-        """
+
+def create_student_account(email, password, first_name, last_name):
+    """
+    Create the user, queue its verification email and start its registration at step 1,
+    in one transaction. The verification token travels in the queued email; the
+    `send_outbox_emails` worker delivers it, so signup never waits on mail or HTTP.
+    """
+    with transaction.atomic():
+        user = AccountCreation.objects.create_user(
+            email=email,
+            password=password,
+            first_name=first_name,
+            last_name=last_name
+        )
+        user.send_verification_email()
+        logger.info(f"Email verification queued for {user.email}")
+        RegistrationStep.objects.create(
+            user=user,
+            current_step=1,
+            last_visited=now()
+        )
+    return user
+
+
+# One-shot Registration
+@method_decorator(csrf_exempt, name='dispatch')
+class BatchRegistrationView(APIView):
+    """
+    Registers one or more students in a single request: every step payload is validated
+    together and written in one transaction. Either `{"students": [...]}` or a single
+    student object keyed by step name ("account", "personal_information", ...).
+    Nothing is written unless every step of every student is valid.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
         try:
-            email_verification_url = f"https://localhost:8000/api/verify-email?email={user.email}"
-            response = requests.get(email_verification_url, verify=False)  # SSL verification disabled
-            if response.status_code == 200:
-                logger.info(f"Email verification sent to {user.email}")
-            else:
-                logger.warning(f"Failed to send email verification to {user.email}: {response.status_code}")
+            data = request.data
+            students = data.get("students") if "students" in data else [data]
+            if not isinstance(students, list) or not students or not all(isinstance(s, dict) for s in students):
+                return Response(
+                    {"error": "Provide a non-empty list of students."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if len(students) > settings.REGISTRATION_BATCH_MAX_STUDENTS:
+                return Response(
+                    {"error": f"At most {settings.REGISTRATION_BATCH_MAX_STUDENTS} students per request."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            batch = RegistrationBatch(students)
+            if not batch.validate():
+                return Response(
+                    {"error": "Validation failed; nothing was saved.", "errors": batch.errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                batch.prepare()
+            except PasswordHashingBusy as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={"Retry-After": "1"}
+                )
+            try:
+                registered = batch.save()
+            except IntegrityError as e:
+                # Another request registered one of these emails after validation
+                logger.warning(f"Batch registration conflicted with a concurrent write: {e}")
+                return Response(
+                    {"error": "One or more accounts were created concurrently; nothing was saved."},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            return Response(
+                {
+                    "message": f"{len(registered)} students registered successfully.",
+                    "students": [
+                        {"email": user.email, "user_id": user.id, "current_step": current_step}
+                        for user, current_step in registered
+                    ],
+                },
+                status=status.HTTP_201_CREATED
+            )
+
         except Exception as e:
-            logger.error(f"Error sending email verification: {e}")
+            logger.exception(f"Unexpected error in BatchRegistrationView: {e}")
+            return Response(
+                {"error": "An unexpected error occurred during batch registration."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 # Step 2: Personal Information
 class PersonalInformationView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
         try:
+            # Refuse an oversized upload from its declared length, before the body is read
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+            if content_length > settings.PROFILE_PICTURE_MAX_BYTES + MAX_FORM_OVERHEAD:
+                logger.error(f"Personal information request too large: {content_length} bytes")
+                return Response(
+                    {"error": "Profile picture is too large."},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+
             # Extract data from the request
             data = request.data
             email = data.get("email")
@@ -219,7 +299,7 @@ class PersonalInformationView(APIView):
 
             # Validate user existence
             try:
-                user = AccountCreation.objects.get(email=email)
+                user = resolve_user(request, email)
             except AccountCreation.DoesNotExist:
                 logger.error(f"User with email {email} not found.")
                 return Response(
@@ -237,11 +317,13 @@ class PersonalInformationView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Validate phone number format
-            if not phone_number.startswith("+") or not phone_number[1:].isdigit():
-                logger.error(f"Invalid phone number format: {phone_number}")
+            # Validate phone number format and country calling code
+            try:
+                phone_number, _, _ = validate_phone_number(phone_number, reference_data.phone_trie())
+            except ValidationError as e:
+                logger.error(f"Invalid phone number: {phone_number}")
                 return Response(
-                    {"error": "Phone number must start with '+' and include only digits after."},
+                    {"error": e.messages[0]},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
@@ -262,34 +344,36 @@ class PersonalInformationView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Use serializer for data validation and creation/update
-            serializer = PersonalInformationSerializer(data={
+            # Stage the picture (checked from its header only); variants are rendered off-request
+            staged_picture = None
+            if profile_picture:
+                try:
+                    staged_picture = stage_upload(profile_picture)
+                except ValidationError as e:
+                    logger.error(f"Invalid profile picture for {email}: {e.messages[0]}")
+                    return Response(
+                        {"error": e.messages[0]},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+            errors = save_personal_information(user, {
                 "user": user.id,
                 "date_of_birth": date_of_birth,
                 "gender": gender,
                 "phone_number": phone_number,
-                "profile_picture": profile_picture,
                 "nationality": nationality.id,
-            })
-
-            if serializer.is_valid():
-                serializer.save()  # Save valid data
-                logger.info(f"Personal information saved for user: {email}")
-            else:
-                logger.error(f"Validation errors: {serializer.errors}")
+            }, staged_picture)
+            if errors:
                 return Response(
-                    {"error": serializer.errors},
+                    {"error": errors},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Update registration step to Step 2
-            RegistrationStep.objects.update_or_create(
-                user=user, defaults={"current_step": 2, "last_visited": now()}
-            )
-            logger.info(f"Registration step updated for user: {email}")
-
             return Response(
-                {"message": "Personal information saved successfully."},
+                {
+                    "message": "Personal information saved successfully.",
+                    "profile_picture_status": "Pending" if staged_picture else None,
+                },
                 status=status.HTTP_201_CREATED,
             )
 
@@ -315,7 +399,7 @@ class PersonalInformationView(APIView):
 
             # Validate user existence
             try:
-                user = AccountCreation.objects.get(email=email)
+                user = resolve_user(request, email, related=True)
             except AccountCreation.DoesNotExist:
                 logger.error(f"User with email {email} not found.")
                 return Response(
@@ -324,7 +408,7 @@ class PersonalInformationView(APIView):
                 )
 
             # Fetch personal information
-            personal_info = PersonalInformation.objects.filter(user=user).first()
+            personal_info = related_object(user, "personal_info")
             if not personal_info:
                 logger.info(f"No personal information found for user: {email}")
                 return Response(
@@ -342,6 +426,41 @@ class PersonalInformationView(APIView):
                 {"error": "An unexpected error occurred. Please contact support."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+def save_personal_information(user, data, staged_picture=None):
+    """
+    Validate and save a user's personal information through the serializer, queue its
+    staged picture and move the user to step 2. Returns the serializer errors, if any;
+    the staged picture is discarded unless it was queued.
+    """
+    # Use serializer for data validation and creation/update
+    serializer = PersonalInformationSerializer(PersonalInformation.objects.filter(user=user).first(), data=data)
+    if not serializer.is_valid():
+        logger.error(f"Validation errors: {serializer.errors}")
+        if staged_picture:
+            discard_staged(staged_picture)
+        return serializer.errors
+
+    try:
+        with transaction.atomic():
+            personal_info = serializer.save()  # Save valid data
+            if staged_picture:
+                enqueue_profile_picture(personal_info, staged_picture)
+    except Exception:
+        if staged_picture:
+            discard_staged(staged_picture)
+        raise
+    logger.info(f"Personal information saved for user: {user.email}")
+
+    # Update registration step to Step 2
+    RegistrationStep.objects.update_or_create(
+        user=user, defaults={"current_step": 2, "last_visited": now()}
+    )
+    logger.info(f"Registration step updated for user: {user.email}")
+    return None
+
+
 # Step 3: Address Details Step
 class AddressDetailsView(APIView):
     permission_classes = [AllowAny]
@@ -359,7 +478,7 @@ class AddressDetailsView(APIView):
 
             # Validate user existence
             try:
-                user = AccountCreation.objects.get(email=email)
+                user = resolve_user(request, email)
             except AccountCreation.DoesNotExist:
                 return Response(
                     {"error": "User not found. Complete account creation first."},
@@ -380,10 +499,10 @@ class AddressDetailsView(APIView):
                 name=city_name.strip(), country=country
             )
 
-            # If city is newly created, optionally fetch additional details (e.g., latitude/longitude)
+            # If city is newly created, queue a background lookup of its details (e.g., latitude/longitude)
             if created:
                 logger.info(f"New city created: {city_name} in {country.name}")
-                fetch_cities_from_nominatim(country.name)
+                enqueue_city_enrichment(city)
 
             # Validate postal code format
             if not postal_code.isdigit() or len(postal_code) < 4 or len(postal_code) > 10:
@@ -392,10 +511,12 @@ class AddressDetailsView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Validate phone number format
-            if not phone_number.startswith("+") or not phone_number[1:].isdigit():
+            # Validate phone number format and country calling code
+            try:
+                phone_number, _, _ = validate_phone_number(phone_number, reference_data.phone_trie())
+            except ValidationError as e:
                 return Response(
-                    {"error": "Phone number must start with '+' and include only digits after."},
+                    {"error": e.messages[0]},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
@@ -462,7 +583,7 @@ class EducationalBackgroundView(APIView):
 
             # Validate user existence
             try:
-                user = AccountCreation.objects.get(email=email)
+                user = resolve_user(request, email)
             except AccountCreation.DoesNotExist:
                 return Response(
                     {"error": "User not found. Complete account creation first."},
@@ -491,7 +612,7 @@ class EducationalBackgroundView(APIView):
                     "institution": institution,
                     "field_of_study": field_of_study,
                     "graduation_year": graduation_year,
-                    "honors": honors,
+                    "certifications_honors": honors or None,
                 },
             )
 
@@ -520,7 +641,7 @@ class EducationalBackgroundView(APIView):
             email = request.GET.get("email")
 
             # Validate user existence
-            user = AccountCreation.objects.get(email=email)
+            user = resolve_user(request, email)
 
             # Fetch the educational background details
             educational_background = EducationalBackground.objects.filter(user=user).first()
@@ -563,7 +684,7 @@ class CourseSelectionView(APIView):
 
             # Validate user existence
             try:
-                user = AccountCreation.objects.get(email=email)
+                user = resolve_user(request, email)
             except AccountCreation.DoesNotExist:
                 return Response(
                     {"error": "User not found. Complete account creation first."},
@@ -607,7 +728,7 @@ class CourseSelectionView(APIView):
             # Prepare response
             response_data = {
                 "message": "Course selection saved successfully.",
-                "selected_courses": CourseSelectionSerializer(courses, many=True).data,  # Updated
+                "selected_courses": CourseSerializer(courses, many=True).data,
                 "study_duration": study_duration,
                 "total_fee": total_fee - discount,
                 "discount_applied": discount,
@@ -626,13 +747,7 @@ class CourseSelectionView(APIView):
         """
         Applies a discount for bundled courses.
         """
-        discount_percentage = 0
-        if len(selected_courses) > 3:  # Apply a 10% discount if 3+ courses are selected
-            discount_percentage = 10
-        elif len(selected_courses) > 5:  # Apply a 20% discount for 5+ courses
-            discount_percentage = 20
-
-        return (total_fee * discount_percentage) / 100
+        return bundle_discount(len(selected_courses), total_fee)
 
 
 # GET All Available Courses Function
@@ -644,6 +759,11 @@ class GetCoursesView(APIView):
     """
     def get(self, request):
         try:
+            # Serve the precompressed catalog snapshot when one can be published
+            response = snapshots.serve_current(request, "courses")
+            if response is not None:
+                return response
+
             # Fetch all available courses from the database
             courses = Course.objects.all()
 
@@ -654,7 +774,7 @@ class GetCoursesView(APIView):
                 )
 
             # Serialize course data
-            serialized_courses = CourseSelectionSerializer(courses, many=True).data  # Updated
+            serialized_courses = CourseSerializer(courses, many=True).data
 
             return Response(
                 {"courses": serialized_courses, "message": "Courses fetched successfully."},
@@ -679,38 +799,21 @@ class ReviewSummaryView(APIView):
     - Selected Courses
     - Payment Confirmation
     """
-    def get(self, request, email):
+    def get(self, request, email=None):
         try:
-            # Validate if the user exists
-            user = AccountCreation.objects.get(email=email)
-            
-            # Fetch data from respective models
-            personal_info = PersonalInformation.objects.filter(user=user).first()
-            address_details = AddressDetails.objects.filter(user=user).first()
-            education_background = EducationalBackground.objects.filter(user=user).first()
-            course_selection = CourseSelection.objects.filter(user=user)
-            payment = Payment.objects.filter(user=user).first()
-            
-            # Serialize the data
-            personal_info_data = PersonalInformationSerializer(personal_info).data if personal_info else {}
-            address_data = AddressDetailsSerializer(address_details).data if address_details else {}
-            education_data = EducationalBackgroundSerializer(education_background).data if education_background else {}
-            course_data = CourseSelectionSerializer(course_selection, many=True).data if course_selection else []
-            payment_data = PaymentSerializer(payment).data if payment else {}
-
-            # Combine all data into a unified structure
-            review_summary = {
-                "personal_information": personal_info_data,
-                "address_details": address_data,
-                "educational_background": education_data,
-                "selected_courses": course_data,
-                "payment_confirmation": payment_data,
-            }
+            email = email or request.GET.get("email")
+            if not email:
+                return Response({
+                    "error": "Email is required to fetch the review summary."
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Assembled in at most two queries and cached until any contributing row changes
+            summary = review_summary(email)
 
             # Return the summary
             return Response({
                 "message": "Review summary fetched successfully.",
-                "data": review_summary
+                "data": summary
             }, status=status.HTTP_200_OK)
 
         except AccountCreation.DoesNotExist:
@@ -742,7 +845,7 @@ class ConfirmationView(APIView):
                 )
 
             # Validate user existence
-            user = AccountCreation.objects.filter(email=email).first()
+            user = find_user(request, email, related=True)
             if not user:
                 return Response(
                     {"error": "User not found."},
@@ -756,18 +859,17 @@ class ConfirmationView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Finalize registration
-            RegistrationStep.objects.update_or_create(
-                user=user,
-                defaults={
-                    "current_step": 8,
-                    "last_visited": now(),
-                    "progress_notes": "Registration successfully completed."
-                },
-            )
-
-            # Send success email
-            self._send_success_email(user)
+            # Finalize registration and queue the success email together
+            with transaction.atomic():
+                RegistrationStep.objects.update_or_create(
+                    user=user,
+                    defaults={
+                        "current_step": 8,
+                        "last_visited": now(),
+                        "progress_notes": "Registration successfully completed."
+                    },
+                )
+                self._send_success_email(user)
 
             return Response(
                 {"message": "Registration completed successfully!"},
@@ -785,31 +887,25 @@ class ConfirmationView(APIView):
         """
         Validates if all steps (1 to 7) are completed for the user.
         """
-        registration_step = RegistrationStep.objects.filter(user=user).first()
+        registration_step = related_object(user, "registration_step")
         return registration_step and registration_step.current_step >= 7
 
     def _send_success_email(self, user):
         """
-        Sends a success email after registration completion.
+        Queues a success email after registration completion (sent by `send_outbox_emails`).
         """
-        try:
-            logger.info(f"Sending confirmation email to {user.email}")
-            send_mail(
-                subject="Registration Completed Successfully!",
-                message=(
-                    f"Hi {user.first_name} {user.last_name},\n\n"
-                    "Your registration has been successfully completed.\n"
-                    "You can now log in and start your journey.\n\n"
-                    "Thank you for registering!"
-                ),
-                from_email="no-reply@yourplatform.com",
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
-            logger.info("Success email sent successfully.")
-        except Exception as e:
-            logger.error(f"Failed to send success email: {e}")
-            raise ValueError("Failed to send confirmation email.")
+        logger.info(f"Queueing confirmation email to {user.email}")
+        enqueue_email(
+            subject="Registration Completed Successfully!",
+            message=(
+                f"Hi {user.first_name} {user.last_name},\n\n"
+                "Your registration has been successfully completed.\n"
+                "You can now log in and start your journey.\n\n"
+                "Thank you for registering!"
+            ),
+            from_email="no-reply@yourplatform.com",
+            recipient_list=[user.email],
+        )
 
 
 # Final Submission View
@@ -824,12 +920,12 @@ class FinalSubmissionView(APIView):
             if not email:
                 return Response({"error": "Email is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-            user = AccountCreation.objects.filter(email=email).first()
+            user = find_user(request, email, related=True)
             if not user:
                 return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
             # Check all registration steps are completed
-            registration_step = RegistrationStep.objects.filter(user=user).first()
+            registration_step = related_object(user, "registration_step")
             if not registration_step or registration_step.current_step < 8:
                 return Response(
                     {"error": "Complete all registration steps first."},
@@ -841,24 +937,22 @@ class FinalSubmissionView(APIView):
             if not payment:
                 return Response({"error": "Payment not completed."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Mark registration as completed
-            RegistrationStatus.objects.update_or_create(
-                user=user,
-                defaults={"is_completed": True, "last_updated": now()}
-            )
-
-            # Send completion email
-            send_mail(
-                subject="Registration Completed",
-                message=(
-                    f"Dear {user.first_name},\n\n"
-                    "Your registration is now complete.\n\n"
-                    "Thank you for choosing us!"
-                ),
-                from_email="no-reply@yourplatform.com",
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
+            # Mark registration as completed and queue the completion email together
+            with transaction.atomic():
+                RegistrationStatus.objects.update_or_create(
+                    user=user,
+                    defaults={"is_completed": True, "last_updated": now()}
+                )
+                enqueue_email(
+                    subject="Registration Completed",
+                    message=(
+                        f"Dear {user.first_name},\n\n"
+                        "Your registration is now complete.\n\n"
+                        "Thank you for choosing us!"
+                    ),
+                    from_email="no-reply@yourplatform.com",
+                    recipient_list=[user.email],
+                )
 
             return Response(
                 {"message": "Registration completed successfully."},
@@ -927,7 +1021,7 @@ class GetRegistrationProgressView(APIView):
 
             # Check if the user exists
             try:
-                user = AccountCreation.objects.get(email=email)
+                user = resolve_user(request, email, related=True)
             except AccountCreation.DoesNotExist:
                 return Response(
                     {"error": "User not found. Complete account creation first."},
@@ -935,7 +1029,7 @@ class GetRegistrationProgressView(APIView):
                 )
 
             # Fetch registration progress
-            registration_step = RegistrationStep.objects.filter(user=user).first()
+            registration_step = related_object(user, "registration_step")
             if not registration_step:
                 return Response(
                     {
@@ -995,7 +1089,7 @@ class GetRegistrationStatusView(APIView):
 
             # Check if the user exists
             try:
-                user = AccountCreation.objects.get(email=email)
+                user = resolve_user(request, email, related=True)
             except AccountCreation.DoesNotExist:
                 return Response(
                     {"error": "User not found. Complete account creation first."},
@@ -1003,7 +1097,7 @@ class GetRegistrationStatusView(APIView):
                 )
 
             # Fetch registration completion status
-            registration_status = RegistrationStatus.objects.filter(user=user).first()
+            registration_status = related_object(user, "registration_status")
             if not registration_status:
                 return Response(
                     {
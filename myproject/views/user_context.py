@@ -0,0 +1,204 @@
+import hashlib
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.fields.files import FieldFile
+from myproject.models import AccountCreation
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Reverse one-to-one relations fetched alongside the user when `related=True`
+USER_RELATIONS = ("personal_info", "address_details", "registration_step", "registration_status")
+
+# Account fields kept in the shared cache: what the views read. The password hash and the
+# tokens stay out; they load from the database if ever read from a cached user.
+USER_FIELDS = ("id", "email", "first_name", "last_name")
+
+# Attribute on the underlying HttpRequest that holds the per-request memo
+REQUEST_MEMO_ATTR = "_user_context_memo"
+
+
+def normalize_email(email):
+    return AccountCreation.objects.normalize_email((email or "").strip())
+
+
+def _email_key(email):
+    return f"user_context:email:{hashlib.sha1(email.encode('utf-8')).hexdigest()}"
+
+
+def _user_key(user_id, related):
+    return f"user_context:fields:{user_id}:{'related' if related else 'plain'}"
+
+
+def _request_memo(request):
+    # DRF's Request wraps the HttpRequest; memoize on the one both layers share
+    request = getattr(request, "_request", request)
+    memo = getattr(request, REQUEST_MEMO_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(request, REQUEST_MEMO_ATTR, memo)
+    return memo
+
+
+def _load(email, related):
+    queryset = AccountCreation.objects.all()
+    if related:
+        queryset = queryset.select_related(*USER_RELATIONS)
+    user = queryset.get(email=email)
+    if related:
+        # Touch each relation so that missing rows are remembered too
+        for name in USER_RELATIONS:
+            related_object(user, name)
+    return user
+
+
+def _pack(user, related):
+    """
+    The shared cache entry for `user`: `USER_FIELDS` and, with `related`, the field
+    values of each relation (None for a missing one).
+    """
+    entry = {"user": {name: getattr(user, name) for name in USER_FIELDS}, "relations": {}}
+    if related:
+        for name in USER_RELATIONS:
+            obj = related_object(user, name)
+            entry["relations"][name] = None if obj is None else {
+                field.attname: _plain(getattr(obj, field.attname)) for field in obj._meta.concrete_fields
+            }
+    return entry
+
+
+def _plain(value):
+    # Files are stored by name; a FieldFile would pickle its whole instance
+    return value.name if isinstance(value, FieldFile) else value
+
+
+def _unpack(entry):
+    """
+    Rebuild the user (and its cached relations) from a `_pack` entry without a query.
+    """
+    user = AccountCreation.from_db(None, list(entry["user"]), list(entry["user"].values()))
+    for name, values in entry["relations"].items():
+        relation = AccountCreation._meta.get_field(name)
+        obj = None
+        if values is not None:
+            obj = relation.related_model.from_db(None, list(values), list(values.values()))
+            relation.field.set_cached_value(obj, user)
+        relation.set_cached_value(user, obj)
+    return user
+
+
+def _cached(entry, email):
+    # The email may have changed since the mapping was stored
+    if entry is None or normalize_email(entry["user"]["email"]) != email:
+        return None
+    return _unpack(entry)
+
+
+def resolve_user(request, email, related=False):
+    """
+    The `AccountCreation` for `email`, raising `AccountCreation.DoesNotExist` like a plain
+    `get()`. Memoized for the rest of the request and shared across workers for
+    USER_CONTEXT_CACHE_TTL seconds. With `related=True` the one-to-one relations in
+    `USER_RELATIONS` are fetched in the same query; read them with `related_object`.
+    """
+    email = normalize_email(email)
+    if not email:
+        raise AccountCreation.DoesNotExist("Email is required.")
+
+    memo = _request_memo(request)
+    for key in ((email, True), (email, related)):
+        if key in memo:
+            return memo[key]
+
+    user = None
+    ttl = settings.USER_CONTEXT_CACHE_TTL
+    user_id = cache.get(_email_key(email)) if ttl else None
+    if user_id is not None:
+        user = _cached(cache.get(_user_key(user_id, related)), email)
+
+    if user is None:
+        user = _load(email, related)
+        if ttl:
+            cache.set_many({_email_key(email): user.id, _user_key(user.id, related): _pack(user, related)}, ttl)
+
+    memo[(email, related)] = user
+    return user
+
+
+async def aresolve_user(request, email, related=False):
+    """
+    Async `resolve_user` for async views: the same memo and shared cache, with the
+    database read through the async ORM.
+    """
+    email = normalize_email(email)
+    if not email:
+        raise AccountCreation.DoesNotExist("Email is required.")
+
+    memo = _request_memo(request)
+    for key in ((email, True), (email, related)):
+        if key in memo:
+            return memo[key]
+
+    user = None
+    ttl = settings.USER_CONTEXT_CACHE_TTL
+    user_id = await cache.aget(_email_key(email)) if ttl else None
+    if user_id is not None:
+        user = _cached(await cache.aget(_user_key(user_id, related)), email)
+
+    if user is None:
+        queryset = AccountCreation.objects.all()
+        if related:
+            queryset = queryset.select_related(*USER_RELATIONS)
+        user = await queryset.aget(email=email)
+        if related:
+            for name in USER_RELATIONS:
+                related_object(user, name)
+        if ttl:
+            await cache.aset_many({_email_key(email): user.id, _user_key(user.id, related): _pack(user, related)}, ttl)
+
+    memo[(email, related)] = user
+    return user
+
+
+def related_object(user, name):
+    """
+    The related object `name` of `user`, or None when it does not exist.
+    """
+    try:
+        return getattr(user, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def invalidate_user(user_id, email=None):
+    """
+    Drop the shared copies of a user; `email` also drops its email -> id mapping.
+    """
+    keys = [_user_key(user_id, False), _user_key(user_id, True)]
+    if email:
+        keys.append(_email_key(normalize_email(email)))
+    cache.delete_many(keys)
+
+
+def cached_user_id(email):
+    """
+    The user id last resolved for `email`, if the shared cache still has it. Callers must
+    check it against the data they load, since the email may have changed since.
+    """
+    return cache.get(_email_key(normalize_email(email)))
+
+
+def remember_user_id(email, user_id, timeout):
+    cache.set(_email_key(normalize_email(email)), user_id, timeout)
+
+
+def find_user(request, email, related=False):
+    """
+    Like `resolve_user`, but returns None when there is no such user.
+    """
+    try:
+        return resolve_user(request, email, related=related)
+    except AccountCreation.DoesNotExist:
+        return None
@@ -1,20 +1,40 @@
 import requests
-import time
 import logging
-from django.http import JsonResponse
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
 from myproject.models import Country, City
+from myproject.views.location_helpers import (
+    get_city_fetcher, get_http_transport, http_cache_summary, city_search_params, SingleFlight,
+)
+from myproject.views.city_index import city_indexes, MAX_RESULTS
+from myproject.views.reference_data import reference_data
+from myproject.views.phone_prefix import validate_phone_number
+from myproject.views.json_stream import iter_response_array
+from myproject.views import snapshots
+from myproject.views.spatial_index import nearest_cities
+from myproject.views.location_utils import (
+    parse_country_record, parse_city_record,
+    bulk_upsert_countries, bulk_upsert_cities,
+)
 
 # API URLs
-RESTCOUNTRIES_URL = "https://restcountries.com/v3.1/all"
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+RESTCOUNTRIES_URL = settings.RESTCOUNTRIES_URL
+NOMINATIM_URL = settings.NOMINATIM_URL
 
 # Logger setup
 logger = logging.getLogger("myproject.utility_views")
 
-# Default timeout and retry settings
+# Default timeout settings
 REQUEST_TIMEOUT = 30
-MAX_RETRIES = 3
-RETRY_DELAY = 60  # in seconds
+
+# Coalesces concurrent lazy city fills within this process
+city_fills = SingleFlight()
 
 
 ### LOCATION DATA UTILITIES ###
@@ -25,13 +45,26 @@ def fetch_countries_from_api():
     """
     try:
         logger.info("Fetching countries from RestCountries API...")
-        response = requests.get(RESTCOUNTRIES_URL, timeout=REQUEST_TIMEOUT)
+        response = get_http_transport().get(RESTCOUNTRIES_URL, timeout=REQUEST_TIMEOUT, stream=True)
         response.raise_for_status()
-        countries_data = response.json()
 
-        for country_data in countries_data:
-            process_country(country_data)
+        # Parse countries as they arrive, keeping only the fields we store
+        records = [record for record in map(parse_country_record, iter_response_array(response)) if record]
+
+        # Write all countries in bulk, then fill in their cities
+        stats = bulk_upsert_countries(records)
+        logger.info(f"Countries written: {stats.summary()}")
+
+        # Fetch cities for all countries concurrently, within the shared rate limit
+        countries = {
+            country_obj.name: country_obj
+            for country_obj in Country.objects.filter(code__in=[record["code"] for record in records])
+        }
+        for country_name, cities_data in get_city_fetcher().fetch_cities(countries):
+            save_cities(countries[country_name], cities_data)
         logger.info("Countries updated successfully.")
+        if http_cache_summary():
+            logger.info(f"Geo API response cache: {http_cache_summary()}")
     except requests.RequestException as e:
         logger.error(f"Error fetching countries: {e}")
     except Exception as e:
@@ -42,7 +75,7 @@ def fetch_cities_from_nominatim(country_name):
     Fetch cities for a given country using the Nominatim API.
     """
     try:
-        response = requests.get(
+        response = get_http_transport().get(
             NOMINATIM_URL,
             params={"country": country_name, "format": "json", "addressdetails": 1, "limit": 100},
             headers={"User-Agent": "myproject/1.0"},
@@ -60,42 +93,13 @@ def process_country(country_data):
     Process individual country data and update/create the database records.
     """
     try:
-        # Validate country code
-        country_code = country_data.get("cca2", "").upper()
-        if not country_code or len(country_code) != 2:
-            logger.warning(f"Skipping country with invalid/missing code: {country_data.get('name', {}).get('common', 'Unknown')}")
+        record = parse_country_record(country_data)
+        if not record:
             return
 
-        # Extract and clean phone code
-        root = country_data.get("idd", {}).get("root", "")
-        suffixes = "".join(country_data.get("idd", {}).get("suffixes", [""]))
-        phone_code = (root + suffixes).strip()
-
-        # Trim long phone codes
-        if len(phone_code) > 20:
-            logger.warning(f"Trimming phone code for {country_data.get('name', {}).get('common')} to 20 characters.")
-            phone_code = phone_code[:20]
-
-        # Extract additional details
-        name = country_data.get("name", {}).get("common", "Unknown")
-        region = country_data.get("region", "")
-        subregion = country_data.get("subregion", "")
-        population = country_data.get("population", 0)
-        flag_url = country_data.get("flags", {}).get("png", "")
-
-        # Update or create country
-        country_obj, created = Country.objects.update_or_create(
-            code=country_code,
-            defaults={
-                "name": name,
-                "phone_code": phone_code,
-                "region": region,
-                "subregion": subregion,
-                "population": population,
-                "flag_url": flag_url,
-            },
-        )
-        if created:
+        stats = bulk_upsert_countries([record])
+        country_obj = Country.objects.get(code=record["code"])
+        if stats.created:
             logger.info(f"Added country: {country_obj.name}")
         else:
             logger.info(f"Updated country: {country_obj.name}")
@@ -103,8 +107,6 @@ def process_country(country_data):
         # Fetch and save cities for the country
         fetch_and_save_cities(country_obj)
 
-    except KeyError as key_err:
-        logger.error(f"KeyError for country {country_data.get('name', {}).get('common', 'Unknown')}: {key_err}")
     except Exception as e:
         logger.error(f"Unexpected error while processing country: {e}")
 
@@ -112,32 +114,11 @@ def process_country(country_data):
 def fetch_cities_with_retry(country_name):
     """
     Fetch cities with retry logic to handle rate limits and temporary errors.
+    Requests go through the shared fetcher, so concurrent callers respect one rate limit.
     """
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = requests.get(
-                NOMINATIM_URL,
-                params={"country": country_name, "format": "json", "addressdetails": 1, "limit": 100},
-                headers={"User-Agent": "myproject/1.0"},
-                timeout=REQUEST_TIMEOUT,
-            )
-            if response.status_code == 429:  # Too Many Requests
-                logger.warning("Rate limit reached. Retrying after delay...")
-                time.sleep(RETRY_DELAY)
-                continue
-            response.raise_for_status()
-            return response.json()
-        except requests.Timeout:
-            logger.warning(f"Request timed out for {country_name}. Retrying...")
-            time.sleep(RETRY_DELAY)
-        except requests.RequestException as e:
-            if attempt < MAX_RETRIES - 1:
-                logger.warning(f"Error fetching cities for {country_name}: {e}. Retrying...")
-                time.sleep(RETRY_DELAY)
-            else:
-                logger.error(f"Failed after {MAX_RETRIES} attempts for {country_name}: {e}")
-                return []
-    return []
+    return get_city_fetcher().fetch_json(
+        NOMINATIM_URL, params=city_search_params(country_name), label=country_name
+    ) or []
 
 
 def fetch_and_save_cities(country_obj):
@@ -145,27 +126,24 @@ def fetch_and_save_cities(country_obj):
     Fetch cities for a given country and save them to the database.
     """
     logger.info(f"Fetching cities for {country_obj.name}...")
-    cities_data = fetch_cities_with_retry(country_obj.name)
+    save_cities(country_obj, fetch_cities_with_retry(country_obj.name))
+
 
+def save_cities(country_obj, cities_data):
+    """
+    Bulk upsert fetched Nominatim results as cities of the given country.
+    """
     if not cities_data:
         logger.warning(f"No cities found for {country_obj.name}.")
         return
 
     try:
-        for city_data in cities_data:
-            city_name = city_data.get("display_name", "").split(",")[0]
-            lat = city_data.get("lat", None)
-            lon = city_data.get("lon", None)
-
-            City.objects.update_or_create(
-                name=city_name.strip(),
-                country=country_obj,
-                defaults={
-                    "latitude": lat,
-                    "longitude": lon,
-                },
-            )
-            logger.info(f"Saved city: {city_name} in {country_obj.name}")
+        records = [
+            record for record in (parse_city_record(city_data, country_obj.id) for city_data in cities_data)
+            if record
+        ]
+        stats = bulk_upsert_cities(records)
+        logger.info(f"Saved cities for {country_obj.name}: {stats.summary()}")
     except Exception as e:
         logger.error(f"Unexpected error while saving cities for {country_obj.name}: {e}")
 
@@ -184,11 +162,14 @@ def update_countries_and_cities(request):
 
 def get_countries(request):
     """
-    Retrieve all countries from the database.
+    Retrieve all countries, served from the precompressed snapshot (or from the in-process
+    reference data cache while no snapshot can be published).
     """
     try:
-        countries = Country.objects.values("id", "name", "phone_code").order_by("name")
-        return JsonResponse(list(countries), safe=False, status=200)
+        response = snapshots.serve_current(request, "countries")
+        if response is None:
+            response = _revalidated_response(request, *reference_data.countries())
+        return response
     except Exception as e:
         logger.error(f"Error fetching countries: {e}")
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
@@ -196,18 +177,18 @@ def get_countries(request):
 
 def get_cities(request, country_id):
     """
-    Retrieve cities for a given country from the database.
+    Retrieve cities for a given country, from its precompressed snapshot when one exists.
     """
     try:
+        response = snapshots.serve_current(request, f"cities/{country_id}")
+        if response is not None:
+            return response
+
         country = Country.objects.get(id=country_id)
         cities = City.objects.filter(country=country).values("id", "name").order_by("name")
         if not cities.exists():
-            # Fetch cities dynamically if not found
-            cities_data = fetch_cities_with_retry(country.name)
-            for city_data in cities_data:
-                city_name = city_data.get("display_name", "").split(",")[0]
-                City.objects.get_or_create(name=city_name.strip(), country=country)
-            cities = City.objects.filter(country=country).values("id", "name").order_by("name")
+            # Fetch cities dynamically if not found; concurrent requests share one fill
+            return JsonResponse(city_fills.do(country.id, lambda: populate_cities(country)), safe=False, status=200)
         return JsonResponse(list(cities), safe=False, status=200)
     except Country.DoesNotExist:
         return JsonResponse({"error": "Country not found."}, status=404)
@@ -216,12 +197,110 @@ def get_cities(request, country_id):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+def _no_cities_key(country_id):
+    return f"cities:none:{country_id}"
+
+
+def _city_list(country):
+    return list(City.objects.filter(country=country).values("id", "name").order_by("name"))
+
+
+def populate_cities(country):
+    """
+    Fill an empty country from Nominatim and return its city list.
+
+    Only one worker fills a country at a time (the others wait for it and read the
+    result), and countries the upstream has no data for are remembered for a while.
+    """
+    if cache.get(_no_cities_key(country.id)):
+        return []
+
+    lock_key = f"cities:fill:{country.id}"
+    if not cache.add(lock_key, 1, settings.CITY_FILL_LOCK_TIMEOUT):
+        # Another worker is filling this country; wait for it to finish
+        deadline = time.monotonic() + settings.CITY_FILL_LOCK_TIMEOUT
+        while cache.get(lock_key) and time.monotonic() < deadline:
+            time.sleep(0.2)
+        return _city_list(country)
+
+    try:
+        # Re-check now that we hold the lock; a fill may have just completed
+        cities = _city_list(country)
+        if cities:
+            return cities
+
+        cities_data = get_city_fetcher().fetch_json(
+            NOMINATIM_URL, params=city_search_params(country.name), label=country.name
+        )
+        if not cities_data:
+            ttl = settings.CITY_ERROR_CACHE_TTL if cities_data is None else settings.CITY_EMPTY_CACHE_TTL
+            cache.set(_no_cities_key(country.id), True, ttl)
+            logger.warning(f"No cities found for {country.name}; not retrying for {ttl}s.")
+            return []
+
+        records = [
+            record for record in (parse_city_record(city_data, country.id) for city_data in cities_data)
+            if record
+        ]
+        bulk_upsert_cities(records)
+        return _city_list(country)
+    finally:
+        cache.delete(lock_key)
+
+
+def search_cities(request, country_id):
+    """
+    Autocomplete city names for a country from the in-memory prefix index,
+    capitals and larger cities first.
+    """
+    try:
+        query = request.GET.get("q", "").strip()
+        if not query:
+            return JsonResponse({"error": "Query parameter 'q' is required."}, status=400)
+        try:
+            limit = max(1, min(int(request.GET.get("limit", 10)), MAX_RESULTS))
+        except ValueError:
+            return JsonResponse({"error": "Query parameter 'limit' must be a number."}, status=400)
+
+        if not reference_data.has_country(country_id):
+            return JsonResponse({"error": "Country not found."}, status=404)
+
+        results = city_indexes.get(country_id).search(query, limit)
+        return JsonResponse(results, safe=False, status=200)
+    except Exception as e:
+        logger.error(f"Error searching cities: {e}")
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def get_nearest_cities(request):
+    """
+    Reverse lookup: the cities closest to a coordinate (e.g. from browser geolocation),
+    with great-circle distances in kilometres.
+    """
+    try:
+        try:
+            latitude = float(request.GET["lat"])
+            longitude = float(request.GET["lon"])
+            k = max(1, int(request.GET.get("k", 5)))
+        except (KeyError, ValueError):
+            return JsonResponse({"error": "Numeric 'lat' and 'lon' query parameters are required."}, status=400)
+
+        try:
+            results = nearest_cities(latitude, longitude, k)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        return JsonResponse(results, safe=False, status=200)
+    except Exception as e:
+        logger.error(f"Error finding nearest cities: {e}")
+        return JsonResponse({"error": str(e)}, status=500)
+
+
 def fetch_states_from_nominatim(country_name):
     """
     Fetch states/provinces for a given country using OpenStreetMap (Nominatim API).
     """
     try:
-        response = requests.get(
+        response = get_http_transport().get(
             NOMINATIM_URL,
             params={"country": country_name, "state": "*", "format": "json", "limit": 50},
             headers={"User-Agent": "myproject/1.0"},
@@ -234,15 +313,84 @@ def fetch_states_from_nominatim(country_name):
         return []
 
 
+def _phone_code_etag(request, country_id):
+    cached = reference_data.phone_code(country_id)
+    return cached[1] if cached else None
+
+
+@condition(etag_func=_phone_code_etag)
 def get_phone_code(request, country_id):
     """
-    Retrieve the phone code for a specific country.
+    Retrieve the phone code for a specific country, served from the in-process reference data cache.
     """
     try:
-        country = Country.objects.get(id=country_id)
-        return JsonResponse({"phone_code": country.phone_code}, status=200)
-    except Country.DoesNotExist:
-        return JsonResponse({"error": "Country not found."}, status=404)
+        cached = reference_data.phone_code(country_id)
+        if cached is None:
+            return JsonResponse({"error": "Country not found."}, status=404)
+        return _reference_response(cached[0])
     except Exception as e:
         logger.error(f"Error fetching phone code: {e}")
-        return JsonResponse({"error": str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def lookup_phone_number(request):
+    """
+    Detect the country of an international phone number by its longest matching calling code.
+    """
+    try:
+        number = request.GET.get("number", "").strip()
+        if not number:
+            return JsonResponse({"error": "Query parameter 'number' is required."}, status=400)
+        # An unencoded '+' in the query string arrives as a space
+        if not number.startswith("+"):
+            number = "+" + number
+
+        try:
+            number, prefix, countries = validate_phone_number(number, reference_data.phone_trie())
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=404 if e.code == "unknown_prefix" else 400)
+
+        return JsonResponse({
+            "number": number,
+            "prefix": prefix,
+            "countries": [
+                {"id": country["id"], "name": country["name"], "code": country["code"]} for country in countries
+            ],
+        }, status=200)
+    except Exception as e:
+        logger.error(f"Error looking up phone number: {e}")
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def get_snapshot(request, name, version):
+    """
+    Serve one immutable, precompressed version of a reference data snapshot.
+    """
+    try:
+        response = snapshots.snapshot_response(request, name, version, immutable=True)
+        if response is None:
+            return JsonResponse({"error": "Snapshot not found."}, status=404)
+        return response
+    except Exception as e:
+        logger.error(f"Error serving snapshot {name}: {e}")
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def _reference_response(body):
+    """
+    JSON response for cached reference data; clients revalidate with If-None-Match.
+    """
+    response = HttpResponse(body, content_type="application/json")
+    response["Cache-Control"] = "public, no-cache"
+    return response
+
+
+def _revalidated_response(request, body, etag):
+    """
+    `_reference_response` carrying its ETag, or a 304 when the client already holds `body`.
+    """
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag) or _reference_response(body)
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, no-cache"
+    return response